@@ -1,5 +1,52 @@
+import mmap
+import os
 import re
 
+import output_sink
+
+KEYWORDS = {
+    'let', 'in', 'where', 'within', 'and', 'nil', 'aug',
+    'rec', 'fn', 'lambda', 'true', 'false', 'dummy',
+}
+
+WORD_OPERATORS = {'eq', 'ne', 'gr', 'ge', 'ls', 'le', 'or', 'not'}
+
+# Token type of every identifier-shaped word that is not a plain identifier
+WORD_TYPES = {keyword: keyword for keyword in KEYWORDS}
+WORD_TYPES.update((operator, 'operator') for operator in WORD_OPERATORS)
+
+# Whitespace and comments are consumed as a prefix of the following token,
+# so they never cost a match of their own. Whole words are matched first and
+# classified with WORD_TYPES, so keywords and word operators are never split
+# out of a longer identifier.
+TOKEN_PATTERN = r"""
+    (?:\s+|//[^\n]*)*
+    (?:
+        (?P<WORD>[a-zA-Z][a-zA-Z0-9_]*)
+      | (?P<INTEGER>\d+)
+      | (?P<OPERATOR><=|>=|->|\*\*|=>|[+\-*/=<>&|@])
+      | (?P<STRING>'(?:[^'\\]|\\.)*')
+      | (?P<PUNCTION>[()\[\]{},;.])
+      | (?P<END>\Z)
+      | (?P<UNKNOWN>.)
+    )
+"""
+
+TOKEN_REGEX = re.compile(TOKEN_PATTERN, re.VERBOSE | re.DOTALL)
+BYTES_TOKEN_REGEX = re.compile(TOKEN_PATTERN.encode(), re.VERBOSE | re.DOTALL)
+
+TOKEN_TYPES = {
+    'INTEGER': 'integer',
+    'OPERATOR': 'operator',
+    'STRING': 'string',
+    'PUNCTION': 'punction',
+}
+
+def reportUnknown(value):
+    """Note a character that is not part of any token; it goes where the program's output goes."""
+    output_sink.write(f"Unknown token: {value}\n")
+
+
 class Token:
     def __init__(self, type_, value):
         self.type = type_
@@ -12,46 +59,79 @@ class Token:
         return self.__str__()
 
 
+def scan(source):
+    """
+    Yield the tokens of source, which is either a str or a bytes-like
+    object such as an mmap (decoded as utf-8 token by token).
+    """
+    binary = not isinstance(source, str)
+    regex = BYTES_TOKEN_REGEX if binary else TOKEN_REGEX
+    wordTypes = WORD_TYPES
+    tokenTypes = TOKEN_TYPES
+
+    for match in regex.finditer(source):
+        kind = match.lastgroup
+        value = match.group(kind)
+        if binary:
+            value = value.decode('utf-8', errors='replace')
+
+        if kind == 'WORD':
+            yield Token(wordTypes.get(value, 'identifier'), value)
+        elif kind == 'END':
+            return
+        elif kind == 'UNKNOWN':
+            reportUnknown(value)
+        else:
+            yield Token(tokenTypes[kind], value)
+
+
+def scanSpans(source, pos=0):
+    """
+    Like scan, for a str starting at offset pos, but yields (token, end) pairs
+    where end is the offset just past the token, and yields unknown characters
+    as 'unknown' tokens instead of printing them. Used to relex an edited
+    region of a source (see incremental.Document).
+    """
+    wordTypes = WORD_TYPES
+    tokenTypes = TOKEN_TYPES
+
+    for match in TOKEN_REGEX.finditer(source, pos):
+        kind = match.lastgroup
+        value = match.group(kind)
+
+        if kind == 'WORD':
+            yield Token(wordTypes.get(value, 'identifier'), value), match.end()
+        elif kind == 'END':
+            return
+        elif kind == 'UNKNOWN':
+            yield Token('unknown', value), match.end()
+        else:
+            yield Token(tokenTypes[kind], value), match.end()
+
+
 class Lexer:
     def __init__(self, code):
         self.code = code
         self.tokens = []
-        self.keywords = {
-            'let', 'in', 'where', 'within', 'and', 'nil', 'aug',
-            'rec', 'fn', 'lambda', 'true', 'false', 'dummy',
-        }
-
-        self.token_specification = [
-            ('KEYWORD',   r'\b(?:' + '|'.join(self.keywords) + r')\b'),
-            ('COMMENT',    r'//.*'),
-            ('STRING',     r"'([^'\\]|\\.)*'"),
-            ('INTEGER',    r'\d+'),
-            ('OPERATOR',   r'eq|ne|gr|ge|ls|le|<=|>=|or|not|->|\*\*|=>|[+\-*/=<>&|@]'),
-            ('IDENTIFIER', r'[a-zA-Z][a-zA-Z0-9_]*'),
-            ('PUNCTION',  r'[()\[\]{},;.]'),
-            ('WHITESPACE', r'\s+'),
-            ('UNKNOWN',    r'.'),
-        ]
-
-        self.regex = re.compile(
-            '|'.join(f'(?P<{name}>{pattern})' for name, pattern in self.token_specification),
-            re.DOTALL
-        )
 
     def tokenize(self):
-        for match in self.regex.finditer(self.code):
-            kind = match.lastgroup
-            value = match.group()
-
-            if kind == 'WHITESPACE' or kind == 'COMMENT':
-                continue
+        self.tokens.extend(scan(self.code))
 
-            if kind == 'KEYWORD':
-                self.tokens.append(Token(value, value))
-            elif kind == 'UNKNOWN':
-                print(f"Unknown token: {value}")
-            else:
-                self.tokens.append(Token(kind.lower(), value))
 
+class StreamingLexer:
+    """
+    Tokenizes a file lazily. The file is memory-mapped and scanned as bytes,
+    so neither the decoded source nor a token list is ever held in memory;
+    use it with parser.StreamParser.
+    """
 
+    def __init__(self, filename):
+        with open(filename, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                self.source = b''  # an empty file cannot be mapped
+            else:
+                self.source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
 
+    def tokenize(self):
+        """Yield the tokens of the file one at a time."""
+        return scan(self.source)
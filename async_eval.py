@@ -0,0 +1,43 @@
+import asyncio
+
+from Lexer import Lexer
+from parser import Parser
+from environment import Environment
+from vm import Compiler, VirtualMachine
+from output_sink import capture
+
+DEFAULT_SLICE = 1000
+
+
+async def run_async(source, slice=DEFAULT_SLICE, env=None):
+    """
+    Run an RPAL program without blocking the event loop and return what it
+    printed.
+
+    The program is compiled for the VM, which hands control back to the loop
+    every slice instructions, so many programs can be interleaved in one
+    process. Output is captured per program. Cancelling the awaiting task
+    stops the program at its next yield.
+    """
+    lexer = Lexer(source)
+    lexer.tokenize()
+    st = Parser(lexer.tokens).parse_E().standardize()
+    if env is None:
+        env = Environment()
+        env.defineBuiltInFunctions()
+
+    compiler = Compiler(env)
+    steps = VirtualMachine(compiler).steps(compiler.compile(st), slice)
+    # The sink belongs to this task's context, so programs interleaved on
+    # the loop never write into each other's output
+    with capture() as output:
+        try:
+            while True:
+                try:
+                    next(steps)
+                except StopIteration:
+                    break
+                await asyncio.sleep(0)
+        finally:
+            steps.close()
+    return output.getvalue()
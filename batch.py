@@ -0,0 +1,79 @@
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from myrpal import LIMIT_OPTIONS, standardizedTree, evaluate, optionValue
+from output_sink import capture
+
+
+def programFiles(pattern):
+    """Files of a batch, sorted by path: every file in a directory, or the files matching a glob."""
+    if os.path.isdir(pattern):
+        paths = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+    else:
+        paths = glob.glob(pattern)
+    return sorted(path for path in paths if os.path.isfile(path))
+
+
+def runProgram(job):
+    """Run one program, capturing its output; errors are reported, not raised."""
+    filename, flags = job
+    error = None
+    start = time.perf_counter()
+    with capture() as output:
+        try:
+            evaluate(standardizedTree(filename, flags), flags)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+    return {
+        'file': filename,
+        'output': output.getvalue(),
+        'error': error,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def runBatch(files, flags=(), workers=None):
+    """Run programs on a pool of worker processes; results are in the order of files."""
+    jobs = [(filename, tuple(flags)) for filename in files]
+    if workers == 1:
+        return [runProgram(job) for job in jobs]
+    with multiprocessing.Pool(workers) as pool:
+        # imap yields in submission order whatever order the workers finish in
+        return list(pool.imap(runProgram, jobs, chunksize=1))
+
+
+def main(flags):
+    pattern = optionValue(flags, '--batch')
+    workers = optionValue(flags, '--workers')
+    workers = int(workers) if workers is not None else os.cpu_count()
+    reportFile = optionValue(flags, '--report')
+    # Only flags that change how each program runs are passed to the workers
+    programFlags = [flag for flag in flags if flag in ('-O', '-dag', '-cse', '-vm', '--no-cache')]
+    for option in LIMIT_OPTIONS:
+        if option in flags:
+            programFlags += [option, optionValue(flags, option)]
+
+    files = programFiles(pattern)
+    start = time.perf_counter()
+    results = runBatch(files, programFlags, workers)
+    report = {
+        'programs': results,
+        'total': len(results),
+        'failed': sum(1 for result in results if result['error'] is not None),
+        'workers': workers,
+        'seconds': time.perf_counter() - start,
+    }
+
+    if reportFile:
+        with open(reportFile, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"{report['total']} programs, {report['failed']} failed, "
+              f"{report['seconds']:.2f}s; report written to {reportFile}")
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return report
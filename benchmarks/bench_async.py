@@ -0,0 +1,81 @@
+"""
+Runs many RPAL programs concurrently with run_async and measures how late a
+1 ms ticker on the same event loop wakes up, against running the same
+programs synchronously inside the loop. With run_async the lateness is
+bounded by programs x slice instructions, whatever the length of the
+programs; when blocking it grows with the length of a program.
+
+    python benchmarks/bench_async.py [programs] [iterations ...]
+"""
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from async_eval import run_async
+from Lexer import Lexer
+from parser import Parser
+from environment import Environment
+import vm
+
+TICK = 0.001
+
+
+def loop_program(n):
+    return f"let rec Loop (N, Acc) = N eq 0 -> Acc | Loop (N - 1, Acc + 1) in Print (Loop ({n}, 0))"
+
+
+async def ticker(lateness, done):
+    while not done.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lateness.append(time.perf_counter() - start - TICK)
+
+
+def run_blocking(source):
+    lexer = Lexer(source)
+    lexer.tokenize()
+    env = Environment()
+    env.defineBuiltInFunctions()
+    with contextlib.redirect_stdout(io.StringIO()):
+        vm.execute(Parser(lexer.tokens).parse_E().standardize(), env)
+
+
+async def measure(programs, iterations, slice):
+    lateness = []
+    done = asyncio.Event()
+    tick = asyncio.create_task(ticker(lateness, done))
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    if slice is None:
+        for _ in range(programs):
+            run_blocking(loop_program(iterations))
+            await asyncio.sleep(0)
+    else:
+        await asyncio.gather(*(run_async(loop_program(iterations), slice) for _ in range(programs)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await tick
+    return elapsed, lateness
+
+
+def main():
+    programs = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    lengths = [int(arg) for arg in sys.argv[2:]] or [1000, 4000]
+    print(f"{programs} concurrent programs, {TICK * 1000:.0f} ms ticker")
+    print(f"{'iterations':>10} {'mode':<12} {'total (s)':>10} {'p50 late (ms)':>14} {'max late (ms)':>14}")
+    for iterations in lengths:
+        for slice in (None, 1000, 100):
+            elapsed, lateness = asyncio.run(measure(programs, iterations, slice))
+            name = 'blocking' if slice is None else f'slice {slice}'
+            print(f"{iterations:>10} {name:<12} {elapsed:>10.2f} "
+                  f"{statistics.median(lateness) * 1000:>14.2f} {max(lateness) * 1000:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Times calls of the Print, Conc, Order and Isinteger builtins through
+execute, as the evaluators make them, against the previous implementation:
+an if/elif chain on the name and a list copy plus a new BuiltInFunction for
+every partial application.
+
+    python benchmarks/bench_builtins.py [calls] [repeats]
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from data_types import Tuple, TruthValue
+from environment import Closure, BuiltInFunction
+
+
+class ChainBuiltInFunction:
+    """BuiltInFunction as it was before the builtin registry, unchanged."""
+    def __init__(self, name, arity=1, args_received=None):
+        self.name = name
+        self.arity = arity
+        self.args_received = args_received if args_received is not None else []
+
+    def execute(self, arg_value):
+        # Implement the logic for each built-in function here
+        current_args = self.args_received + [arg_value]
+        if len(current_args) < self.arity:
+            return ChainBuiltInFunction(self.name, self.arity, current_args)
+        else:
+            if self.name == "Print":
+                # print("Executing Print built-in function with argument:")
+                if type(current_args[0]) == str:
+                    escape_char = False
+                    for char in current_args[0]:
+                        if escape_char:
+                            if char == "n":
+                                print("\n", end="")
+                            elif char == "t":
+                                print("\t", end="")
+                            elif char == "\\":
+                                print("\\", end="")
+                            else:
+                                print("\\"+char, end="")
+                            escape_char = False
+                        elif char == "\\":
+                            escape_char = True
+                        else:
+                            print(char, end="")
+
+                else:
+                    print(current_args[0], end="")
+                return "dummy"
+            
+            elif self.name == "Isinteger":
+                if type(current_args[0]) == int:
+                    return TruthValue(True)
+                else:
+                    return TruthValue(False)
+                
+            elif self.name == "Istruthvalue":
+                if isinstance(current_args[0], TruthValue):
+                    return TruthValue(True)
+                else:
+                    return TruthValue(False)
+                
+            elif self.name == "Isstring":
+                if type(current_args[0]) == str:
+                    return TruthValue(True)
+                else:
+                    return TruthValue(False)
+                
+            elif self.name == "Istuple":
+                if isinstance(current_args[0], Tuple):
+                    return TruthValue(True)
+                else:
+                    return TruthValue(False)
+            
+            elif self.name == "Isfunction":
+                if isinstance(current_args[0], ChainBuiltInFunction) or isinstance(current_args[0], Closure):
+                    return TruthValue(True)
+                else:
+                    return TruthValue(False)
+                
+            elif self.name == "Isdummy":
+                if current_args[0] == "dummy":
+                    return TruthValue(True)
+                else:
+                    return TruthValue(False)
+                
+            elif self.name == "ItoS":
+                if type(current_args[0]) == int:
+                    return str(current_args[0])
+                else:
+                    raise TypeError("ItoS built-in function expects an integer argument.")
+                
+            elif self.name == "Stem":
+                if type(current_args[0]) == str:
+                    if len(current_args[0]) == 0:
+                        raise ValueError("Stem built-in function expects a non-empty string argument.")
+                    return current_args[0][0]
+                else:
+                    raise TypeError("Stem built-in function expects a string argument.")
+            
+            elif self.name == "Stern":
+                if type(current_args[0]) == str:
+                    if len(current_args[0]) == 0:
+                        raise ValueError("Stern built-in function expects a non-empty string argument.")
+                    return current_args[0][1:]
+                else:
+                    raise TypeError("Stern built-in function expects a string argument.")
+                
+            elif self.name == "Conc":
+                if len(current_args) != 2:
+                    raise TypeError("Conc function expects exactly two string arguments.")
+                
+                str1 = current_args[0]
+                str2 = current_args[1]
+                
+                if not isinstance(str1, str) or not isinstance(str2, str):
+                    raise TypeError("Conc function expects two string arguments.")
+                
+                return str1 + str2
+            
+            elif self.name == "Order":
+                if isinstance(current_args[0],Tuple):
+                    return len(current_args[0])
+                else:
+                    raise TypeError("Order built-in function expects a tuple argument.")
+                
+            elif self.name == "Null":
+                if isinstance(current_args[0],tuple) and len(current_args[0]) == 0:
+                    return TruthValue(True)
+                else:   
+                    return TruthValue(False)
+
+            elif self.name == 'Y*':
+                from nodes import IdentifierNode # Local import to resolve circular dependency
+                if len(current_args) != 1:
+                    raise TypeError("Y* combinator expects exactly one argument.")
+                
+                if not isinstance(current_args[0], Closure):
+                    raise TypeError("Y* combinator expects a function (closure) as its argument.")
+                
+                rec_lambda_node = current_args[0].lambdaNode 
+                
+                if not isinstance(rec_lambda_node.Vb, IdentifierNode):
+                    raise TypeError("Recursive function name for Y* must be a single identifier.")
+                
+                func_name = rec_lambda_node.Vb.value
+                actual_function_body_node = rec_lambda_node.E
+
+                rec_def_env = current_args[0].env
+
+                recursive_call_env = rec_def_env.child()
+                recursive_call_env.define(func_name, None)
+                
+                actual_recursive_closure = Closure(actual_function_body_node, recursive_call_env)
+                recursive_call_env.define(func_name, actual_recursive_closure)
+                return actual_recursive_closure
+            
+            else:
+                raise NotImplementedError(f"Built-in function '{self.name}' not yet implemented.")
+
+
+
+def best_of(repeats, function):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def workloads(make):
+    """The calls to time, given a function that makes a builtin from its name and arity."""
+    printer = make("Print", 1)
+    conc = make("Conc", 2)
+    order = make("Order", 1)
+    isInteger = make("Isinteger", 1)
+    pair = Tuple([1, 2])
+    return {
+        'Print 42': lambda: printer.execute(42),
+        "Conc 'ab' 'cd'": lambda: conc.execute('ab').execute('cd'),
+        'Order (1, 2)': lambda: order.execute(pair),
+        'Isinteger 7': lambda: isInteger.execute(7),
+    }
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    chain = workloads(ChainBuiltInFunction)
+    table = workloads(lambda name, arity: BuiltInFunction(name))
+
+    print(f"{calls} calls each")
+    print(f"{'call':<16} {'if/elif (ns)':>13} {'table (ns)':>11} {'speedup':>8}")
+    for name in chain:
+        def timed(call):
+            def run():
+                with contextlib.redirect_stdout(io.StringIO()):
+                    for _ in range(calls):
+                        call()
+            return best_of(repeats, run) / calls * 1e9
+        before = timed(chain[name])
+        after = timed(table[name])
+        print(f"{name:<16} {before:>13.0f} {after:>11.0f} {before / after:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Compares the recursive tree walker (Node.interpret) with the CSE machine on
+testcode.rpal scaled to larger tuples.
+
+    python benchmarks/bench_cse.py [sizes...]
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from Lexer import Lexer
+from parser import Parser
+from environment import Environment
+from cse_machine import CSEMachine
+
+
+def sum_program(n):
+    elements = ",".join(str(i) for i in range(1, n + 1))
+    return f"""
+    let Sum(A) = Psum (A,Order A )
+    where rec Psum (T,N) = N eq 0 -> 0
+     | Psum(T,N-1)+T N
+    in Sum ({elements})
+    """
+
+
+def standardized(code):
+    lexer = Lexer(code)
+    lexer.tokenize()
+    return Parser(lexer.tokens).parse_E().standardize()
+
+
+def global_env():
+    env = Environment()
+    env.defineBuiltInFunctions()
+    return env
+
+
+def time_tree_walker(st):
+    # The tree walker needs one Python frame per nested call, so give it a big stack
+    outcome = {}
+
+    def target():
+        sys.setrecursionlimit(10 ** 7)
+        start = time.perf_counter()
+        try:
+            outcome['result'] = st.interpret(global_env())
+            outcome['time'] = time.perf_counter() - start
+        except RecursionError:
+            outcome['time'] = None
+
+    threading.stack_size(1024 * 1024 * 1024)
+    thread = threading.Thread(target=target)
+    thread.start()
+    thread.join()
+    return outcome.get('time')
+
+
+def time_cse(st):
+    start = time.perf_counter()
+    CSEMachine().run(st, global_env())
+    return time.perf_counter() - start
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]
+    print(f"{'elements':>10} {'tree walker (s)':>16} {'cse (s)':>10} {'speedup':>8}")
+    for n in sizes:
+        st = standardized(sum_program(n))
+        cse = time_cse(st)
+        tree = time_tree_walker(st)
+        if tree is None:
+            print(f"{n:>10} {'RecursionError':>16} {cse:>10.3f} {'-':>8}")
+        else:
+            print(f"{n:>10} {tree:>16.3f} {cse:>10.3f} {tree / cse:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Node counts of standardized trees before and after hash-consing, on the
+bench_phases corpus and on a program with many repeated expressions, with
+the time taken to intern each tree and the memory the tree keeps alive:
+
+    nodes         nodes of the fully standardized tree
+    distinct      nodes left after interning
+    intern        hashCons(st)
+    tree, dag     bytes allocated by standardizing and printing the whole
+                  tree (which standardizes everything deferred), and by
+                  doing that and then interning, still alive afterwards
+
+Each result is checked against the expected output on the VM.
+
+    python benchmarks/bench_hashcons.py [size] [repeats]
+"""
+import contextlib
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from Lexer import Lexer
+from parser import Parser
+from myrpal import evaluate
+from hashcons import hashCons
+from output_sink import capture
+from bench_phases import WORKLOADS
+
+
+def repetitive(n):
+    """n functions whose bodies repeat the same guards and arithmetic."""
+    definitions = []
+    for i in range(n):
+        definitions.append(
+            f"let F{i} X = (X ls 0 -> 0 - X | X) + (X * X + 2 * X + 1) + (X ls 0 -> 0 - X | X) in\n")
+    calls = " + ".join(f"F{i} {i % 7}" for i in range(n))
+    expected = sum(abs(i % 7) * 2 + (i % 7 + 1) ** 2 for i in range(n))
+    return ''.join(definitions) + f"Print ({calls})", str(expected)
+
+
+CORPUS = dict(WORKLOADS, repetitive=repetitive)
+
+
+class Discard:
+    def write(self, text):
+        pass
+
+
+def fullyStandardized(code):
+    lexer = Lexer(code)
+    lexer.tokenize()
+    st = Parser(lexer.tokens).parse_E().standardize()
+    with contextlib.redirect_stdout(Discard()):
+        st.print()
+    return st
+
+
+def retained(function):
+    tracemalloc.start()
+    kept = function()  # kept alive while measuring
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return allocated
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 50 * size + 1000))
+
+    print(f"{'workload':<14} {'nodes':>8} {'distinct':>9} {'ratio':>6} {'intern':>10} {'tree':>9} {'dag':>9}")
+    for name, workload in CORPUS.items():
+        code, expected = workload(size)
+        best = None
+        for _ in range(repeats):
+            st = fullyStandardized(code)
+            start = time.perf_counter()
+            dag, nodes, distinct = hashCons(st)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        with capture() as output:
+            evaluate(dag, ['-vm'])
+        assert output.getvalue() == expected, (name, output.getvalue())
+
+        treeMemory = retained(lambda: fullyStandardized(code))
+        dagMemory = retained(lambda: hashCons(fullyStandardized(code))[0])
+        print(f"{name:<14} {nodes:>8} {distinct:>9} {distinct / nodes:>6.2f} {best * 1000:>8.2f}ms "
+              f"{treeMemory / 1024:>7.0f}KB {dagMemory / 1024:>7.0f}KB")
+
+
+if __name__ == "__main__":
+    main()
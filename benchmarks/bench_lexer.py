@@ -0,0 +1,81 @@
+"""
+Reports lexing throughput in MB/s on synthetic RPAL sources, for the
+shared scanner on a str (Lexer), on a memory-mapped file (StreamingLexer)
+and for the previous per-instance master regex as a baseline.
+
+    python benchmarks/bench_lexer.py [size in MB ...]    (default: 1 10)
+"""
+import os
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from Lexer import KEYWORDS, Token, StreamingLexer, scan
+
+CHUNK = """
+// Sums the elements of a tuple
+let Sum(A) = Psum (A, Order A)
+where rec Psum (T, N) = N eq 0 -> 0 | Psum (T, N - 1) + T N
+in let length = 'abc' and order = (1, 2, 3) aug 4
+in Print (Sum (1, 2, 3, 4, 5), length, order, not true or false & N ls 10)
+"""
+
+# The master regex Lexer used to rebuild for every instance
+LEGACY_SPECIFICATION = [
+    ('KEYWORD',   r'\b(?:' + '|'.join(KEYWORDS) + r')\b'),
+    ('COMMENT',    r'//[^\n]*'),
+    ('STRING',     r"'([^'\\]|\\.)*'"),
+    ('INTEGER',    r'\d+'),
+    ('OPERATOR',   r'eq|ne|gr|ge|ls|le|<=|>=|or|not|->|\*\*|=>|[+\-*/=<>&|@]'),
+    ('IDENTIFIER', r'[a-zA-Z][a-zA-Z0-9_]*'),
+    ('PUNCTION',  r'[()\[\]{},;.]'),
+    ('WHITESPACE', r'\s+'),
+    ('UNKNOWN',    r'.'),
+]
+
+
+def legacy_scan(code):
+    regex = re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in LEGACY_SPECIFICATION), re.DOTALL)
+    for match in regex.finditer(code):
+        kind = match.lastgroup
+        value = match.group()
+        if kind == 'WHITESPACE' or kind == 'COMMENT':
+            continue
+        if kind == 'KEYWORD':
+            yield Token(value, value)
+        else:
+            yield Token(kind.lower(), value)
+
+
+def synthetic_source(megabytes):
+    return CHUNK * (megabytes * 1024 * 1024 // len(CHUNK) + 1)
+
+
+def throughput(size, tokens):
+    start = time.perf_counter()
+    count = sum(1 for _ in tokens)
+    elapsed = time.perf_counter() - start
+    return count, size / (1024 * 1024) / elapsed
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1, 10]
+    print(f"{'size (MB)':>9} {'tokens':>10} {'legacy MB/s':>12} {'Lexer MB/s':>11} {'stream MB/s':>12}")
+    for megabytes in sizes:
+        code = synthetic_source(megabytes)
+        _, legacy = throughput(len(code), legacy_scan(code))
+        count, lexer = throughput(len(code), scan(code))
+        with tempfile.NamedTemporaryFile('w', suffix='.rpal', delete=False) as f:
+            f.write(code)
+        try:
+            _, stream = throughput(len(code), StreamingLexer(f.name).tokenize())
+        finally:
+            os.unlink(f.name)
+        print(f"{megabytes:>9} {count:>10} {legacy:>12.2f} {lexer:>11.2f} {stream:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
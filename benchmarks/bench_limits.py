@@ -0,0 +1,122 @@
+"""
+Measures the cost of resource accounting. Every program is run with a plain
+global environment, with fuel and depth budgets, and with a tuple cap
+as well, none of them ever reached; for the tree walker it is also run the
+way closures were applied before Environment.child() existed, which is the
+cost of the hook on the default path. Runs of the variants are interleaved;
+times are the fastest of each, and overheads the median over the rounds of
+each metered run against the plain run next to it, which is steadier than
+comparing the fastest runs on a noisy machine.
+
+    python benchmarks/bench_limits.py [repeats]
+"""
+import contextlib
+import gc
+import io
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from Lexer import Lexer
+from parser import Parser
+from environment import Environment
+from cse_machine import CSEMachine
+from limits import Limits
+import nodes
+
+PROGRAMS = {
+    'loop 50000': "let rec Loop (N, Acc) = N eq 0 -> Acc | Loop (N - 1, Acc + 2) in Loop (50000, 0)",
+    'fib 18': "let rec Fib N = N ls 2 -> N | Fib (N-1) + Fib (N-2) in Fib 18",
+    'tuples 5000': "let rec Build (T, N) = N eq 0 -> Order T | Build (T aug N, N - 1) in Build (nil, 5000)",
+}
+
+
+def standardized(code):
+    lexer = Lexer(code)
+    lexer.tokenize()
+    return Parser(lexer.tokens).parse_E().standardize()
+
+
+def plain():
+    env = Environment()
+    env.defineBuiltInFunctions()
+    return env
+
+
+def metered():
+    return Limits(fuel=10**9, maxDepth=10**6).environment()
+
+
+def capped():
+    return Limits(fuel=10**9, maxDepth=10**6, maxTupleElements=10**9).environment()
+
+
+def applyClosureWithoutChild(closure, rand, caller):
+    newEnv = Environment(parent=closure.env)
+    closure.lambdaNode.bind(newEnv, rand)
+    return closure.lambdaNode.E.interpret(newEnv)
+
+
+@contextlib.contextmanager
+def withoutChild():
+    original = nodes.applyClosure
+    nodes.applyClosure = applyClosureWithoutChild
+    try:
+        yield
+    finally:
+        nodes.applyClosure = original
+
+
+def measure(repeats, variants):
+    """Fastest time of each variant, and the median ratio of each to the plain run of the same round."""
+    best = {name: float('inf') for name in variants}
+    ratios = {name: [] for name in variants}
+    names = list(variants)
+    for round in range(repeats):
+        times = {}
+        # Rotated every round, so no variant always runs first or after the same one
+        for name in names[round % len(names):] + names[:round % len(names)]:
+            function = variants[name]
+            gc.collect()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                function()
+            times[name] = time.perf_counter() - start
+            best[name] = min(best[name], times[name])
+        for name in variants:
+            ratios[name].append(times[name] / times['plain'])
+    return best, {name: statistics.median(values) for name, values in ratios.items()}
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    sys.setrecursionlimit(100000)
+    print(f"{'program':<12} {'evaluator':<10} {'no child()':>11} {'plain':>9} "
+          f"{'fuel+depth':>10} {'+tuples':>9}")
+    for name, code in PROGRAMS.items():
+        st = standardized(code)
+
+        def beforeChild():
+            with withoutChild():
+                st.interpret(plain())
+
+        for evaluator, run in (('interpret', st.interpret), ('cse', lambda env: CSEMachine().run(st, env))):
+            variants = {
+                'plain': lambda: run(plain()),
+                'metered': lambda: run(metered()),
+                'capped': lambda: run(capped()),
+            }
+            if evaluator == 'interpret':
+                variants['before'] = beforeChild
+            times, ratios = measure(repeats, variants)
+            before = f"{times['before']:>11.4f}" if 'before' in times else f"{'-':>11}"
+            print(f"{name:<12} {evaluator:<10} {before} {times['plain']:>9.4f} "
+                  f"{(ratios['metered'] - 1) * 100:>9.1f}% "
+                  f"{(ratios['capped'] - 1) * 100:>8.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Memory per node of ASTs and standardized trees of large generated
+programs, and the time to compile the standardized tree for each
+evaluator, which dispatches on the class of every node:
+
+    nodes         nodes of the AST, and of the AST and the fully
+                  standardized tree together (subtrees they share are
+                  counted once)
+    bytes/node    size of the nodes (sys.getsizeof), with their attribute
+                  dictionaries and lists of children, per node
+    cse, vm       flattening the program and every lambda body into CSE
+                  control structures, and compiling the tree to VM code
+
+    python benchmarks/bench_nodes.py [size] [repeats]
+
+The script runs unchanged against earlier commits, for comparison.
+"""
+import contextlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from Lexer import Lexer
+from parser import Parser
+from nodes import STLambdaNode
+from environment import Environment
+from cse_machine import CSEMachine
+import vm
+
+
+def expressions(n):
+    """One n-element tuple of arithmetic, comparisons and conditionals over a few names."""
+    elements = ", ".join(f"(X * {i} + Y ls {i} -> X - {i} | not (Y eq 'y{i}') & true)" for i in range(n))
+    return f"let X = 1 and Y = 2 in Order ({elements})"
+
+
+def library(n):
+    """n simultaneous function definitions with tuples, strings and where clauses."""
+    definitions = "\nand ".join(
+        f"F{i} (A, B) = A gr B -> (Conc 'f{i}' S, A aug B) | F{(i + 1) % n} (B, A) where S = ItoS (A + {i})"
+        for i in range(n))
+    return f"let rec {definitions}\nin F0 (2, 1)"
+
+
+def nesting(n):
+    """n definitions nested alternately with let and where."""
+    source = "X0"
+    for i in range(n):
+        if i % 2:
+            source = f"(let X{i} = X{i + 1} + {i} in {source})"
+        else:
+            source = f"({source} where X{i} = X{i + 1} - {i})"
+    return f"let X{n} = 0 in {source}"
+
+
+WORKLOADS = {'expressions': expressions, 'library': library, 'nesting': nesting}
+
+
+class Discard:
+    def write(self, text):
+        pass
+
+
+def tokens(code):
+    lexer = Lexer(code)
+    lexer.tokenize()
+    return lexer.tokens
+
+
+def standardizeAll(ast):
+    """The standardized tree of ast, with every deferred body and branch standardized by printing it."""
+    st = ast.standardize()
+    with contextlib.redirect_stdout(Discard()):
+        st.print()
+    return st
+
+
+def reachable(*roots):
+    """Every node under roots, once."""
+    seen = {}
+    pending = list(roots)
+    while pending:
+        node = pending.pop()
+        if id(node) in seen:
+            continue
+        seen[id(node)] = node
+        for field in node.fields:
+            child = getattr(node, field)
+            pending.extend(child if type(child) is list else (child,))
+    return seen.values()
+
+
+def nodeBytes(nodes):
+    """Bytes taken by nodes, their attribute dictionaries and their lists of children."""
+    total = 0
+    for node in nodes:
+        total += sys.getsizeof(node)
+        if hasattr(node, '__dict__'):
+            total += sys.getsizeof(node.__dict__)
+        for field in node.fields:
+            child = getattr(node, field)
+            if type(child) is list:
+                total += sys.getsizeof(child)
+    return total
+
+
+def best_of(repeats, function):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 50 * size + 1000))
+
+    print(f"{'workload':<12} {'AST nodes':>10} {'bytes/node':>11} {'+ST nodes':>10} {'bytes/node':>11} {'cse':>10} {'vm':>10}")
+    for name, workload in WORKLOADS.items():
+        code = workload(size)
+        ast = Parser(tokens(code)).parse_E()
+        astNodes = list(reachable(ast))
+        st = standardizeAll(ast)
+        bothNodes = list(reachable(ast, st))
+        lambdas = [node for node in reachable(st) if type(node) is STLambdaNode]
+
+        env = Environment()
+        env.defineBuiltInFunctions()
+        cse = best_of(repeats, lambda: [CSEMachine().delta(node) for node in [st] + [lambdaNode.E for lambdaNode in lambdas]])
+        compiled = best_of(repeats, lambda: vm.Compiler(env).compile(st))
+        print(f"{name:<12} {len(astNodes):>10} {nodeBytes(astNodes) / len(astNodes):>11.1f} "
+              f"{len(bothNodes):>10} {nodeBytes(bothNodes) / len(bothNodes):>11.1f} "
+              f"{cse * 1000:>8.2f}ms {compiled * 1000:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Times a loop written the way our program templates write them, with
+constant configuration and literal arithmetic, with and without constant
+folding, on every evaluator.
+
+    python benchmarks/bench_optimizer.py [iterations] [repeats]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from Lexer import Lexer
+from parser import Parser
+from myrpal import evaluate
+from optimizer import optimize
+
+TEMPLATE = """
+let Hour = 60 * 60 and Day = 24 * 60 * 60 and Debug = false
+in let rec Loop (N, Acc) =
+    N eq 0 -> Acc
+    | Loop (N - 1, Acc + (Debug -> 0 | Day / Hour) + Order (1, 2, 3) * (4, 5, 6) 2 + N * 2 ** 3)
+in Loop ({iterations}, 0)
+"""
+
+
+def standardized(code):
+    lexer = Lexer(code)
+    lexer.tokenize()
+    return Parser(lexer.tokens).parse_E().standardize()
+
+
+def best_of(repeats, function):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    code = TEMPLATE.format(iterations=iterations)
+
+    plain = standardized(code)
+    start = time.perf_counter()
+    folded, folder = optimize(standardized(code))
+    foldTime = time.perf_counter() - start
+    assert evaluate(plain, []) == evaluate(folded, [])
+
+    # Folding is mostly done as the first run standardizes the loop body
+    print(f"{folder.folded} nodes folded, {foldTime * 1000:.2f} ms of it before running; {iterations} iterations")
+    print(f"{'evaluator':<10} {'plain (s)':>10} {'folded (s)':>11} {'speedup':>8}")
+    for name, flags in (('interpret', []), ('cse', ['-cse']), ('vm', ['-vm'])):
+        before = best_of(repeats, lambda: evaluate(plain, flags))
+        after = best_of(repeats, lambda: evaluate(folded, flags))
+        print(f"{name:<10} {before:>10.4f} {after:>11.4f} {before / after:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Times programs that print many short lines and one long string, writing to
+a file, through the buffered output sink against the previous Print
+implementations: one print() per character, and one print() per call.
+
+    python benchmarks/bench_output.py [lines] [repeats]
+"""
+import contextlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from Lexer import Lexer
+from parser import Parser
+from myrpal import evaluate
+from environment import BUILTINS
+from data_types import DUMMY
+from output_sink import outputTo
+
+PROGRAMS = {
+    'lines': "let rec P N = N eq 0 -> dummy | (let D = Print N in let E = Print '\\n' in P (N - 1)) in P {lines}",
+    # 10 * 2 ** 14 characters
+    'long string': "let rec S N = N eq 0 -> 'abcdefghij' | (let H = S (N - 1) in Conc H H) in Print (S 14)",
+}
+
+
+def printPerCharacter(value):
+    """Print as it was before string literals were decoded, escape handling aside."""
+    if type(value) == str:
+        for char in value:
+            print(char, end="")
+    else:
+        print(value, end="")
+    return DUMMY
+
+
+def printPerCall(value):
+    print(value, end="")
+    return DUMMY
+
+
+def standardized(code):
+    lexer = Lexer(code)
+    lexer.tokenize()
+    return Parser(lexer.tokens).parse_E().standardize()
+
+
+def best_of(repeats, function):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 50 * lines + 1000))
+    registered = BUILTINS['Print']
+
+    with tempfile.TemporaryFile('w') as f:
+        def viaStdout(st, function):
+            BUILTINS['Print'] = (1, function)
+            try:
+                with contextlib.redirect_stdout(f):
+                    evaluate(st, ['-vm'])
+            finally:
+                BUILTINS['Print'] = registered
+
+        def viaSink(st):
+            with outputTo(f):
+                evaluate(st, ['-vm'])
+
+        print(f"{'program':<12} {'per char (s)':>13} {'per call (s)':>13} {'sink (s)':>10}")
+        for name, template in PROGRAMS.items():
+            st = standardized(template.format(lines=lines))
+            perCharacter = best_of(repeats, lambda: viaStdout(st, printPerCharacter))
+            perCall = best_of(repeats, lambda: viaStdout(st, printPerCall))
+            buffered = best_of(repeats, lambda: viaSink(st))
+            print(f"{name:<12} {perCharacter:>13.4f} {perCall:>13.4f} {buffered:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
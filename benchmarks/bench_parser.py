@@ -0,0 +1,73 @@
+"""
+Times Parser.parse_E on large generated programs against a baseline that
+ends application chains by catching SyntaxError from parse_Rn, as
+parse_R used to.
+
+    python benchmarks/bench_parser.py [definitions] [repeats]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from Lexer import Lexer
+from parser import Parser
+from nodes import GammaNode
+
+
+class ExceptionParser(Parser):
+    def parse_R(self):
+        operands = []
+        while True:
+            try:
+                operands.append(self.parse_Rn())
+            except SyntaxError:
+                break
+        if not operands:
+            raise SyntaxError("Expected at least one operand")
+        node = operands[0]
+        for Rn in operands[1:]:
+            node = GammaNode(node, Rn)
+        return node
+
+
+def generated_program(definitions):
+    """A chain of lets whose bodies are application chains with nested parentheses."""
+    lines = [
+        f"let F{i} A B = Conc (Stem A) (Stern (Conc B (ItoS ({i} + Order (A, B, (F A) (G B))))))"
+        for i in range(definitions)
+    ]
+    return " in\n".join(lines) + " in\nPrint (F0 'a' 'b')"
+
+
+def best_of(repeats, function):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    definitions = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 20 * definitions + 1000))
+
+    lexer = Lexer(generated_program(definitions))
+    lexer.tokenize()
+    tokens = lexer.tokens
+
+    baseline = best_of(repeats, lambda: ExceptionParser(tokens).parse_E())
+    lookahead = best_of(repeats, lambda: Parser(tokens).parse_E())
+    print(f"{len(tokens)} tokens, {definitions} definitions")
+    print(f"{'parser':<22} {'time (s)':>9} {'tokens/s':>11}")
+    print(f"{'exception-driven':<22} {baseline:>9.4f} {len(tokens) / baseline:>11.0f}")
+    print(f"{'FIRST-set lookahead':<22} {lookahead:>9.4f} {len(tokens) / lookahead:>11.0f}")
+    print(f"speedup {baseline / lookahead:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
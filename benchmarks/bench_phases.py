@@ -0,0 +1,224 @@
+"""
+Times each phase of the front end and the tree walker separately on a
+corpus of representative workloads at several input sizes:
+
+    lex           Lexer(source).tokenize()
+    parse         Parser(tokens).parse_E()
+    standardize   ast.standardize() of a freshly parsed AST, with every
+                  lambda body and '->' branch it defers standardized too
+    interpret     st.interpret(env) of that fully standardized tree
+
+    python benchmarks/bench_phases.py [--sizes 100,300,1000] [--repeats N]
+                                      [--workloads a,b] [--output FILE]
+                                      [--compare BASELINE]
+
+--output writes the results as JSON; --compare prints the ratio of every
+timing to the same timing in a JSON file written by an earlier run, e.g.
+one from the previous commit. Ratios above 1 are slowdowns.
+"""
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from Lexer import Lexer
+from parser import Parser
+from environment import Environment
+
+PHASES = ('lex', 'parse', 'standardize', 'interpret')
+
+
+def recursive_sum(n):
+    """testcode.rpal with an n-element tuple: non-tail recursion over a tuple."""
+    elements = ", ".join(str(i) for i in range(1, n + 1))
+    source = (f"let Sum(A) = Psum (A,Order A )\n"
+              f"where rec Psum (T,N) = N eq 0 -> 0\n"
+              f" | Psum(T,N-1)+T N\n"
+              f"in Print ( Sum ({elements}) )")
+    return source, str(n * (n + 1) // 2)
+
+
+def strings(n):
+    """Reverse an n-character string with Stem, Stern and Conc."""
+    text = ''.join(chr(ord('a') + i % 26) for i in range(n))
+    source = (f"let rec Rev S = S eq '' -> '' | Conc (Rev (Stern S)) (Stem S)\n"
+              f"in Print (Rev '{text}')")
+    return source, text[::-1]
+
+
+def tuples(n):
+    """Build an n-element tuple with aug, then sum it."""
+    source = (f"let rec Build (T, I) = I gr {n} -> T | Build (T aug (I * I), I + 1)\n"
+              f"and rec Total (T, I, Acc) = I gr Order T -> Acc | Total (T, I + 1, Acc + T I)\n"
+              f"in Print (Total (Build (nil, 1), 1, 0))")
+    return source, str(sum(i * i for i in range(1, n + 1)))
+
+
+def nesting(n):
+    """n definitions nested alternately with let and where."""
+    source = "Print X0"
+    for i in range(n):
+        if i % 2:
+            source = f"(let X{i} = X{i + 1} + {i} in {source})"
+        else:
+            source = f"({source} where X{i} = X{i + 1} - {i})"
+    source = f"let X{n} = 0 in {source}"
+    total = 0
+    for i in range(n - 1, -1, -1):
+        total = total + i if i % 2 else total - i
+    return source, str(total)
+
+
+def higher_order(n):
+    """Fold a curried function built with composition over an n-element tuple."""
+    elements = ", ".join(str(i) for i in range(1, n + 1))
+    source = (f"let Compose F G X = F (G X)\n"
+              f"in let rec Fold F A T I = I gr Order T -> A | Fold F (F A (T I)) T (I + 1)\n"
+              f"in let Twice F = Compose F F\n"
+              f"in let Inc X = X + 1\n"
+              f"in Print (Fold (fn A X. A + Twice Inc X) 0 ({elements}) 1)")
+    return source, str(n * (n + 1) // 2 + 2 * n)
+
+
+WORKLOADS = {
+    'recursive_sum': recursive_sum,
+    'strings': strings,
+    'tuples': tuples,
+    'nesting': nesting,
+    'higher_order': higher_order,
+}
+
+
+def timings(repeats, function):
+    """Result of the last call and the times of every call."""
+    times = []
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return result, times
+
+
+def standardizeFully(ast):
+    """Standardized tree of ast with nothing left deferred: reading every child standardizes it."""
+    st = ast.standardize()
+    pending = [st]
+    while pending:
+        node = pending.pop()
+        # Nodes of commits that standardize eagerly have no fields, and nothing to force
+        for field in getattr(node, 'fields', ()):
+            child = getattr(node, field)
+            pending.extend(child if type(child) is list else (child,))
+    return st
+
+
+def runWorkload(name, size, repeats):
+    source, expected = WORKLOADS[name](size)
+
+    def lex():
+        lexer = Lexer(source)
+        lexer.tokenize()
+        return lexer.tokens
+
+    def interpret():
+        env = Environment()
+        env.defineBuiltInFunctions()
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            st.interpret(env)
+        return output.getvalue()
+
+    tokens, lexTimes = timings(repeats, lex)
+    _, parseTimes = timings(repeats, lambda: Parser(tokens).parse_E())
+    # Standardizing is memoized, so every repeat gets an AST of its own
+    standardizeTimes = []
+    for _ in range(repeats):
+        ast = Parser(tokens).parse_E()
+        start = time.perf_counter()
+        st = standardizeFully(ast)
+        standardizeTimes.append(time.perf_counter() - start)
+    output, interpretTimes = timings(repeats, interpret)
+    if output != expected:
+        raise AssertionError(f"{name} {size} printed {output[:40]!r}, expected {expected[:40]!r}")
+
+    results = []
+    for phase, times in zip(PHASES, (lexTimes, parseTimes, standardizeTimes, interpretTimes)):
+        results.append({
+            'workload': name,
+            'size': size,
+            'tokens': len(tokens),
+            'phase': phase,
+            'min': min(times),
+            'median': statistics.median(times),
+        })
+    return results
+
+
+def commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baselineFile):
+    with open(baselineFile) as f:
+        baseline = json.load(f)
+    before = {(r['workload'], r['size'], r['phase']): r['min'] for r in baseline['results']}
+    print(f"\nagainst {baselineFile} (commit {baseline.get('commit')}), ratio of fastest runs")
+    print(f"{'workload':<14} {'size':>6} " + " ".join(f"{phase:>11}" for phase in PHASES))
+    rows = {}
+    for r in results:
+        key = (r['workload'], r['size'], r['phase'])
+        if key in before:
+            rows.setdefault(key[:2], {})[r['phase']] = r['min'] / before[key]
+    for (workload, size), ratios in rows.items():
+        cells = " ".join(f"{ratios[phase]:>10.2f}x" if phase in ratios else f"{'-':>11}" for phase in PHASES)
+        print(f"{workload:<14} {size:>6} {cells}")
+
+
+def main():
+    flags = sys.argv
+    sizes = [int(size) for size in flags[flags.index('--sizes') + 1].split(',')] if '--sizes' in flags else [100, 300, 1000]
+    repeats = int(flags[flags.index('--repeats') + 1]) if '--repeats' in flags else 5
+    names = flags[flags.index('--workloads') + 1].split(',') if '--workloads' in flags else list(WORKLOADS)
+    outputFile = flags[flags.index('--output') + 1] if '--output' in flags else None
+    baselineFile = flags[flags.index('--compare') + 1] if '--compare' in flags else None
+    # Non-tail recursion in the programs and the recursive standardizer go deep at large sizes
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 50 * max(sizes) + 1000))
+
+    results = []
+    print(f"{'workload':<14} {'size':>6} {'tokens':>7} " + " ".join(f"{phase:>11}" for phase in PHASES))
+    for name in names:
+        for size in sizes:
+            rows = runWorkload(name, size, repeats)
+            results += rows
+            cells = " ".join(f"{row['min'] * 1000:>9.3f}ms" for row in rows)
+            print(f"{name:<14} {size:>6} {rows[0]['tokens']:>7} {cells}")
+
+    report = {
+        'commit': commit(),
+        'python': platform.python_version(),
+        'repeats': repeats,
+        'results': results,
+    }
+    if outputFile:
+        with open(outputFile, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nresults written to {outputFile}")
+    if baselineFile:
+        compare(results, baselineFile)
+
+
+if __name__ == "__main__":
+    main()
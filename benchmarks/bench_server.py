@@ -0,0 +1,66 @@
+"""
+Compares request latency of a warm rpal_server.py with starting
+python myrpal.py for every program.
+
+    python benchmarks/bench_server.py [requests]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from rpal_client import request
+
+PROGRAM = "let rec F N = N eq 0 -> 0 | N + F (N - 1) in Print (F 50)"
+
+
+def latencies(count, function):
+    times = []
+    for _ in range(count):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def summary(name, times):
+    times = sorted(times)
+    p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+    print(f"{name:<22} {statistics.median(times) * 1000:>10.2f} {p95 * 1000:>10.2f}")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    directory = tempfile.mkdtemp()
+    source = os.path.join(directory, 'program.rpal')
+    path = os.path.join(directory, 'rpal.sock')
+    with open(source, 'w') as f:
+        f.write(PROGRAM)
+
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, 'rpal_server.py'), '--socket', path,
+                               '--workers', '2'], stdout=subprocess.DEVNULL)
+    try:
+        while not os.path.exists(path):
+            time.sleep(0.05)
+        cli = latencies(count, lambda: subprocess.run(
+            [sys.executable, os.path.join(ROOT, 'myrpal.py'), '--no-cache', source],
+            stdout=subprocess.DEVNULL, check=True))
+        warm = latencies(count, lambda: request(PROGRAM, path))
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"{count} requests")
+    print(f"{'mode':<22} {'p50 (ms)':>10} {'p95 (ms)':>10}")
+    summary('one-shot myrpal.py', cli)
+    summary('rpal_server.py', warm)
+    print(f"speedup (p50) {statistics.median(cli) / statistics.median(warm):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
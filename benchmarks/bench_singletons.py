@@ -0,0 +1,87 @@
+"""
+Counts the truth values a comparison-heavy recursive program allocates, and
+times it on every evaluator. Comparisons and 'not' return the shared TRUE
+and FALSE, so the count should be 2 however many comparisons run.
+
+    python benchmarks/bench_singletons.py [limit] [repeats]
+
+The count comes from the tree walker: every result of ConditionNode.apply
+and NotNode.apply is kept alive until the end of the run, so distinct
+results are distinct allocations. The script runs unchanged against earlier
+commits, which allocated a TruthValue per comparison.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from Lexer import Lexer
+from parser import Parser
+from myrpal import evaluate
+from nodes import ConditionNode, NotNode
+
+# Total Collatz steps of 1..limit
+PROGRAM = """
+let rec Steps (N, Acc) =
+    N eq 1 -> Acc
+    | Steps (not (N - (N / 2) * 2 ne 0) -> N / 2 | 3 * N + 1, Acc + 1)
+in let rec Total (I, Acc) =
+    I gr {limit} or I ls 1 -> Acc
+    | Total (I + 1, Acc + Steps (I, 0))
+in Total (1, 0)
+"""
+
+
+def standardized(code):
+    lexer = Lexer(code)
+    lexer.tokenize()
+    return Parser(lexer.tokens).parse_E().standardize()
+
+
+def countResults(st):
+    """Run st with the tree walker; the number of comparison and 'not' results, and of distinct objects among them."""
+    results = []
+    originals = [(cls, cls.__dict__['apply']) for cls in (ConditionNode, NotNode)]
+
+    def keeping(apply):
+        def kept(*args):
+            result = apply(*args)
+            results.append(result)
+            return result
+        return kept
+
+    for cls, apply in originals:
+        cls.apply = keeping(apply)
+    try:
+        evaluate(st, [])
+    finally:
+        for cls, apply in originals:
+            cls.apply = apply
+    return len(results), len({id(result) for result in results})
+
+
+def best_of(repeats, function):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    st = standardized(PROGRAM.format(limit=limit))
+
+    results, allocated = countResults(st)
+    print(f"{results} comparison and 'not' results, {allocated} truth values allocated")
+    print(f"{'evaluator':<10} {'time (s)':>10}")
+    for name, flags in (('interpret', []), ('cse', ['-cse']), ('vm', ['-vm'])):
+        print(f"{name:<10} {best_of(repeats, lambda: evaluate(st, flags)):>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Time and memory of standardizing large ASTs, and of running them on the
+tree walker, for a library of many functions of which the program calls
+only a few, and for deep let/where nesting that is all evaluated:
+
+    standardize   ast.standardize()
+    run           ast.standardize() then interpret
+    full          ast.standardize() then printing the whole ST, which
+                  standardizes everything that was deferred
+    memory        bytes allocated by standardize and still alive
+                  afterwards (tracemalloc), and by full
+
+    python benchmarks/bench_standardize.py [functions] [repeats]
+
+The script runs unchanged against earlier commits, for comparison.
+"""
+import contextlib
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from Lexer import Lexer
+from parser import Parser
+from environment import Environment
+
+
+def library(n):
+    """n definitions with let, where and '->' in their bodies; the program uses two of them."""
+    definitions = []
+    for i in range(n):
+        definitions.append(
+            f"let rec F{i} (N, Acc) = N eq 0 -> Acc | F{i} (N - 1, Acc + Step)"
+            f" where Step = (let K = {i} in K ls 10 -> K * 2 | (K aug 1) {i % 3 + 1}) in\n")
+    return ''.join(definitions) + "F0 (10, 0) + F1 (10, 0)"
+
+
+def nesting(n):
+    """n definitions nested alternately with let and where, all evaluated."""
+    source = "X0"
+    for i in range(n):
+        if i % 2:
+            source = f"(let X{i} = X{i + 1} + {i} in {source})"
+        else:
+            source = f"({source} where X{i} = X{i + 1} - {i})"
+    return f"let X{n} = 0 in {source}"
+
+
+WORKLOADS = {'library': library, 'nesting': nesting}
+
+
+def parse(code):
+    lexer = Lexer(code)
+    lexer.tokenize()
+    return Parser(lexer.tokens).parse_E()
+
+
+def best_of(repeats, code, function):
+    """Fastest run of function on a freshly parsed AST of code."""
+    best = None
+    for _ in range(repeats):
+        ast = parse(code)
+        start = time.perf_counter()
+        function(ast)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run(ast):
+    env = Environment()
+    env.defineBuiltInFunctions()
+    return ast.standardize().interpret(env)
+
+
+class Discard:
+    def write(self, text):
+        pass
+
+
+def full(ast):
+    st = ast.standardize()
+    with contextlib.redirect_stdout(Discard()):
+        st.print()
+    return st
+
+
+def memory(code, function):
+    ast = parse(code)
+    tracemalloc.start()
+    st = function(ast)  # kept alive while measuring
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return allocated
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 50 * size + 1000))
+
+    print(f"{'workload':<10} {'standardize':>12} {'run':>10} {'full':>10} {'memory':>10} {'full memory':>12}")
+    for name, workload in WORKLOADS.items():
+        code = workload(size)
+        standardize = best_of(repeats, code, lambda ast: ast.standardize())
+        runTime = best_of(repeats, code, run)
+        fullTime = best_of(repeats, code, full)
+        standardizeMemory = memory(code, lambda ast: ast.standardize())
+        fullMemory = memory(code, full)
+        print(f"{name:<10} {standardize * 1000:>10.2f}ms {runTime * 1000:>8.2f}ms {fullTime * 1000:>8.2f}ms "
+              f"{standardizeMemory / 1024:>8.0f}KB {fullMemory / 1024:>10.0f}KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Runs a tail-recursive RPAL loop on each evaluator and reports time and
+peak resident memory. Tail calls keep both the Python stack and the
+number of live environments constant, so the iteration count is not
+limited by the recursion limit.
+
+    python benchmarks/bench_tail_calls.py [iterations]
+"""
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from Lexer import Lexer
+from parser import Parser
+from environment import Environment
+from cse_machine import CSEMachine
+import vm
+
+
+def loop_program(n):
+    return f"""
+    let rec Loop (N, Acc) = N eq 0 -> Acc | Loop (N - 1, Acc + 2)
+    in Loop ({n}, 0)
+    """
+
+
+def standardized(code):
+    lexer = Lexer(code)
+    lexer.tokenize()
+    return Parser(lexer.tokens).parse_E().standardize()
+
+
+def global_env():
+    env = Environment()
+    env.defineBuiltInFunctions()
+    return env
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    st = standardized(loop_program(n))
+    evaluators = {
+        'interpret': lambda: st.interpret(global_env()),
+        'cse': lambda: CSEMachine().run(st, global_env()),
+        'vm': lambda: vm.execute(st, global_env()),
+    }
+    print(f"{n} iterations, recursion limit {sys.getrecursionlimit()}")
+    print(f"{'evaluator':<10} {'time (s)':>9} {'peak rss (MB)':>14}")
+    for name, run in evaluators.items():
+        start = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - start
+        assert result == 2 * n
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"{name:<10} {elapsed:>9.2f} {peak:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
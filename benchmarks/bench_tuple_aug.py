@@ -0,0 +1,78 @@
+"""
+Builds n-element tuples with the idiomatic tail-recursive `aug` loop and
+compares the persistent Tuple with the previous copy-on-append Tuple.add.
+
+    python benchmarks/bench_tuple_aug.py [sizes...]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from Lexer import Lexer
+from parser import Parser
+from environment import Environment
+from data_types import Tuple
+import nodes
+
+
+def build_program(n):
+    return f"""
+    let rec Build (T, N) = N eq 0 -> T | Build (T aug N, N - 1)
+    in Order (Build (nil, {n}))
+    """
+
+
+class CopyingTuple(Tuple):
+    """Tuple as it was before the persistent representation: aug copies every element."""
+
+    def __init__(self, elements=None):
+        self.list = elements if elements is not None else []
+
+    def __len__(self):
+        return len(self.list)
+
+    def __getitem__(self, index):
+        return self.list[index]
+
+    def __iter__(self):
+        return iter(self.list)
+
+    def add(self, other):
+        return CopyingTuple(self.list + [other])
+
+
+def standardized(code):
+    lexer = Lexer(code)
+    lexer.tokenize()
+    return Parser(lexer.tokens).parse_E().standardize()
+
+
+def run(st):
+    env = Environment()
+    env.defineBuiltInFunctions()
+    start = time.perf_counter()
+    st.interpret(env)
+    return time.perf_counter() - start
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]
+    print(f"{'elements':>10} {'persistent (s)':>15} {'copying (s)':>12}")
+    for n in sizes:
+        st = standardized(build_program(n))
+        persistent = run(st)
+        if n <= 50000:
+            nodes.Tuple = CopyingTuple
+            try:
+                copying = f"{run(st):>12.3f}"
+            finally:
+                nodes.Tuple = Tuple
+        else:
+            copying = f"{'skipped':>12}"
+        print(f"{n:>10} {persistent:>15.3f} {copying}")
+
+
+if __name__ == "__main__":
+    main()
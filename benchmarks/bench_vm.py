@@ -0,0 +1,81 @@
+"""
+Compares the bytecode VM with the recursive tree walker (Node.interpret)
+and reports VM instructions per second.
+
+    python benchmarks/bench_vm.py [repeats]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from Lexer import Lexer
+from parser import Parser
+from environment import Environment
+import vm
+
+PROGRAMS = {
+    'sum 500': """
+        let Sum(A) = Psum (A,Order A )
+        where rec Psum (T,N) = N eq 0 -> 0 | Psum(T,N-1)+T N
+        in Sum ({elements})
+    """.replace('{elements}', ",".join(str(i) for i in range(1, 501))),
+    'fib 18': """
+        let rec Fib N = N ls 2 -> N | Fib (N-1) + Fib (N-2)
+        in Fib 18
+    """,
+    'strings 200': """
+        let rec Rev S = S eq '' -> '' | Conc (Rev (Stern S)) (Stem S)
+        in Rev '{text}'
+    """.replace('{text}', 'abcdefghij' * 20),
+    'nested 40': (
+        "".join(f"let v{i} = {i} in " for i in range(40)) +
+        "let rec Loop N = N eq 0 -> 0 | Loop (N-1) + v0 + Order (v1, v2) in Loop 300"
+    ),
+}
+
+
+def standardized(code):
+    lexer = Lexer(code)
+    lexer.tokenize()
+    return Parser(lexer.tokens).parse_E().standardize()
+
+
+def global_env():
+    env = Environment()
+    env.defineBuiltInFunctions()
+    return env
+
+
+def best_of(repeats, function):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    sys.setrecursionlimit(100000)
+    print(f"{'program':<12} {'interpret (s)':>14} {'vm (s)':>10} {'speedup':>8} {'instructions':>13} {'instr/s':>12}")
+    for name, code in PROGRAMS.items():
+        st = standardized(code)
+        compiler = vm.Compiler(global_env())
+        program = compiler.compile(st)
+
+        tree = best_of(repeats, lambda: st.interpret(global_env()))
+        machine = vm.VirtualMachine(compiler)
+        machine.run(program)
+        instructions = machine.executed
+        compiled = best_of(repeats, lambda: vm.VirtualMachine(compiler).run(program))
+
+        print(f"{name:<12} {tree:>14.4f} {compiled:>10.4f} {tree / compiled:>7.2f}x "
+              f"{instructions:>13} {instructions / compiled:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+import operator
+
+from data_types import Tuple, TRUE, FALSE
+from environment import Closure
+from nodes import (IDENTIFIER_NODE, RN_NODE, ST_LAMBDA_NODE, GAMMA_NODE, TAU_NODE, ARROW_NODE, BOOLEAN_NODE,
+ARITHMETIC_NODE, CONDITION_NODE, AUG_NODE, NOT_NODE, NEG_NODE, applyNonClosure)
+
+# Kinds of control structure items. Every item is a (kind, operand) pair.
+LOAD = 0        # push a literal value
+LOOKUP = 1      # push the value bound to an identifier
+LAMBDA = 2      # push a closure over the current environment
+GAMMA = 3       # apply the rator on top of the stack to the rand below it
+TAU = 4         # collect the top n values into a Tuple
+BETA = 5        # pick one of two deltas depending on the truth value on the stack
+BINARY = 6      # ArithmeticNode / ConditionNode / AugNode applied to two values
+UNARY = 7       # NotNode / NegNode applied to one value
+AND_OR = 8      # short circuiting '&' and 'or'
+ENV = 9         # leave the environment of a closure body
+
+# Integer-only fast paths for BINARY items; anything else falls back to node.apply()
+INTEGER_OPERATIONS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+}
+INTEGER_COMPARISONS = {
+    'eq': operator.eq,
+    'ne': operator.ne,
+    'gr': operator.gt,
+    'ge': operator.ge,
+    'ls': operator.lt,
+    'le': operator.le,
+}
+
+
+class CSEMachine:
+    """
+    Control Stack Environment machine for standardized trees.
+
+    The standardized tree is flattened into control structures (delta lists),
+    one for the program and one per lambda body, and evaluated with an
+    explicit control stack and value stack instead of Python recursion.
+    Deltas are stored reversed so they can be pushed onto the control stack
+    with a single extend().
+    """
+
+    def __init__(self):
+        self.deltas = {}
+
+    def delta(self, node):
+        """
+        Flatten an expression into a reversed control structure. The tree is
+        walked with an explicit stack of (node, items) pairs, so its depth is
+        not bounded by the recursion limit: items is the delta the node is
+        flattened into, and node is None for a finished delta to reverse or
+        a control item to append to items.
+        """
+        items = []
+        pending = [(None, items), (node, items)]
+        while pending:
+            node, items = pending.pop()
+            if node is None:
+                items.reverse()
+            elif type(node) is tuple:
+                items.append(node)
+            else:
+                self.flatten(node, items, pending)
+        return items
+
+    def lambdaDelta(self, lambdaNode):
+        """Control structure of a lambda body, flattened on first application."""
+        delta = self.deltas.get(lambdaNode)
+        if delta is None:
+            delta = self.delta(lambdaNode.E)
+            self.deltas[lambdaNode] = delta
+        return delta
+
+    def flatten(self, node, items, pending):
+        """Append the items of a leaf to items, or push the children of node and its items onto pending."""
+        push = pending.append
+        kind = node.kind
+        if kind == IDENTIFIER_NODE:
+            items.append((LOOKUP, node.value))
+        elif kind == RN_NODE:
+            if node.type == 'identifier':
+                items.append((LOOKUP, node.value))
+            else:
+                items.append((LOAD, node.literal))
+        elif kind == ST_LAMBDA_NODE:
+            items.append((LAMBDA, node))
+        elif kind == GAMMA_NODE:
+            push(((GAMMA, node), items))
+            push((node.N, items))
+            push((node.E, items))
+        elif kind == TAU_NODE:
+            # Elements are evaluated right to left, as in TauNode.interpret
+            push(((TAU, len(node.elements)), items))
+            for element in node.elements:
+                push((element, items))
+        elif kind == ARROW_NODE:
+            ifCase, elseCase = [], []
+            push(((BETA, (ifCase, elseCase)), items))
+            push((node.condition, items))
+            self.pushDelta(node.ifCase, ifCase, pending)
+            self.pushDelta(node.elseCase, elseCase, pending)
+        elif kind == BOOLEAN_NODE:
+            B2 = []
+            push(((AND_OR, (node.value, B2)), items))
+            push((node.B1, items))
+            self.pushDelta(node.B2, B2, pending)
+        elif kind == ARITHMETIC_NODE:
+            push(((BINARY, (INTEGER_OPERATIONS.get(node.value), False, node)), items))
+            push((node.a2, items))
+            push((node.a1, items))
+        elif kind == CONDITION_NODE:
+            push(((BINARY, (INTEGER_COMPARISONS.get(node.value), True, node)), items))
+            push((node.a2, items))
+            push((node.a1, items))
+        elif kind == AUG_NODE:
+            push(((BINARY, (None, False, node)), items))
+            push((node.Tc, items))
+            push((node.Ta, items))
+        elif kind == NOT_NODE:
+            push(((UNARY, node), items))
+            push((node.Bp, items))
+        elif kind == NEG_NODE:
+            push(((UNARY, node), items))
+            push((node.a, items))
+        else:
+            raise NotImplementedError(f"CSE machine cannot evaluate node of type {type(node).__name__}")
+
+    @staticmethod
+    def pushDelta(node, items, pending):
+        """Have node flattened into the separate delta items, reversed once it is complete."""
+        pending.append((None, items))
+        pending.append((node, items))
+
+    def run(self, st, env):
+        """Evaluate a standardized tree in env and return its value."""
+        control = self.delta(st)
+        # Below the program, as below the body of every application, so a call
+        # the program ends with is a tail call as well
+        control.insert(0, (ENV, env))
+        stack = []
+        deltas = self.deltas
+        pop = control.pop
+        push = stack.append
+
+        while control:
+            kind, operand = pop()
+
+            # Ordered by how often each kind is executed
+            if kind is LOOKUP:
+                bindings = env.bindings
+                if operand in bindings:
+                    push(bindings[operand])
+                else:
+                    push(env.lookup(operand))
+            elif kind is LOAD:
+                push(operand)
+            elif kind is GAMMA:
+                rator = stack.pop()
+                rand = stack.pop()
+                if type(rator) is Closure:
+                    lambdaNode = rator.lambdaNode
+                    # In tail position the pending ENV item already restores the caller's
+                    # environment, so the control stack does not grow with tail calls.
+                    if control[-1][0] is ENV:
+                        newEnv = rator.env.child(control[-1][1])
+                    else:
+                        control.append((ENV, env))
+                        newEnv = rator.env.child(env)
+                    lambdaNode.bind(newEnv, rand)
+                    env = newEnv
+                    delta = deltas.get(lambdaNode)
+                    if delta is None:
+                        delta = self.lambdaDelta(lambdaNode)
+                    control.extend(delta)
+                else:
+                    push(applyNonClosure(rator, rand))
+            elif kind is BINARY:
+                function, comparison, node = operand
+                right = stack.pop()
+                left = stack.pop()
+                if function is not None and type(left) is int and type(right) is int:
+                    if comparison:
+                        push(TRUE if function(left, right) else FALSE)
+                    else:
+                        push(function(left, right))
+                else:
+                    result = node.apply(left, right)
+                    limits = env.limits
+                    if limits is not None and limits.countsTuples and type(result) is Tuple:
+                        limits.allocateTuple(result)  # aug
+                    push(result)
+            elif kind is BETA:
+                condition = stack.pop()
+                if condition is TRUE:
+                    control.extend(operand[0])
+                elif condition is FALSE:
+                    control.extend(operand[1])
+                else:
+                    raise TypeError(f"Expected a truth value for the condition of '->', got {type(condition).__name__}")
+            elif kind is ENV:
+                env = operand
+            elif kind is LAMBDA:
+                push(Closure(operand, env))
+            elif kind is UNARY:
+                push(operand.apply(stack.pop()))
+            elif kind is TAU:
+                result = Tuple([stack.pop() for _ in range(operand)])
+                limits = env.limits
+                if limits is not None and limits.countsTuples:
+                    limits.allocateTuple(result)
+                push(result)
+            elif kind is AND_OR:
+                operator, rightDelta = operand
+                left_val = stack[-1]
+                if (operator == '&' and left_val is not FALSE) or (operator == 'or' and left_val is not TRUE):
+                    stack.pop()
+                    control.extend(rightDelta)
+            else:
+                raise RuntimeError(f"Unknown control structure item: {kind}")
+
+        return stack.pop()
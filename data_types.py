@@ -1,43 +1,154 @@
+CHUNK_BITS = 5
+CHUNK_SIZE = 1 << CHUNK_BITS
+CHUNK_MASK = CHUNK_SIZE - 1
+
+
 class Tuple:
+    """
+    Immutable RPAL tuple stored as a persistent vector.
+
+    Full chunks of 32 elements live in a trie of 32-way nodes that is shared
+    between a tuple and every tuple built from it by `aug`; the last, partial
+    chunk is kept in a tail list. Appending copies at most one path of the
+    trie, so `aug` is amortized O(1), indexing is O(log32 n) and Order is O(1).
+
+    The tail list itself is shared too: a tuple only reads the first
+    (count - tailOffset) entries of it, so the first append to a tuple extends
+    the list in place and only later appends to the same tuple copy it.
+    """
+
     def __init__(self, elements=None):
         if elements is None:
             elements = []
         elif not isinstance(elements, list):
             raise TypeError("Elements passed to must be a list.")
-        
-        self.elements = elements
+
+        self.count = 0
+        self.shift = CHUNK_BITS
+        self.root = []
+        self.tailOffset = 0
+        if len(elements) <= CHUNK_SIZE:
+            self.tail = elements
+            self.count = len(elements)
+        else:
+            self.tail = []
+            for element in elements:
+                self._append(element)
+
+    @property
+    def elements(self):
+        return list(self)
 
     def __str__(self):
-        return f"({', '.join(str(e) for e in self.elements)})"
+        return f"({', '.join(str(e) for e in self)})"
 
     def __repr__(self):
         return self.__str__()
 
     def __len__(self):
-        return len(self.elements)
+        return self.count
 
     def __getitem__(self, index):
-        return self.elements[index]
+        if index < 0:
+            index += self.count
+        if index < 0 or index >= self.count:
+            raise IndexError("Tuple index out of range")
+        if index >= self.tailOffset:
+            return self.tail[index - self.tailOffset]
+        node = self.root
+        level = self.shift
+        while level > 0:
+            node = node[(index >> level) & CHUNK_MASK]
+            level -= CHUNK_BITS
+        return node[index & CHUNK_MASK]
 
     def __iter__(self):
-        return iter(self.elements)
-    
+        for chunkStart in range(0, self.tailOffset, CHUNK_SIZE):
+            yield from self._chunkFor(chunkStart)
+        tail = self.tail
+        for i in range(self.count - self.tailOffset):
+            yield tail[i]
+
+    def _chunkFor(self, index):
+        node = self.root
+        level = self.shift
+        while level > 0:
+            node = node[(index >> level) & CHUNK_MASK]
+            level -= CHUNK_BITS
+        return node
+
+    def _append(self, element):
+        """Append in place; only used while this tuple is being built."""
+        tailLength = self.count - self.tailOffset
+        if tailLength == CHUNK_SIZE:
+            self._pushTail()
+        self.tail.append(element)
+        self.count += 1
+
+    def _pushTail(self):
+        """Move the full tail chunk into the trie and start an empty tail."""
+        chunk = self.tail[:CHUNK_SIZE]
+        chunkCount = self.tailOffset >> CHUNK_BITS
+        if chunkCount == 1 << self.shift:
+            # The trie is full at this height: grow a new root above it
+            self.root = [self.root, self._newPath(self.shift, chunk)]
+            self.shift += CHUNK_BITS
+        else:
+            self.root = self._pushChunk(self.shift, self.root, chunk)
+        self.tailOffset += CHUNK_SIZE
+        self.tail = []
+
+    def _pushChunk(self, level, parent, chunk):
+        # Copies the path from the root to the new chunk; everything else is shared
+        node = list(parent)
+        index = (self.tailOffset >> level) & CHUNK_MASK
+        if level == CHUNK_BITS:
+            node.append(chunk)
+        elif index < len(node):
+            node[index] = self._pushChunk(level - CHUNK_BITS, node[index], chunk)
+        else:
+            node.append(self._newPath(level - CHUNK_BITS, chunk))
+        return node
+
+    def _newPath(self, level, chunk):
+        node = chunk
+        while level > 0:
+            node = [node]
+            level -= CHUNK_BITS
+        return node
+
     def add(self, other):
         from environment import Closure
-        if isinstance(other, (int, str, bool, Tuple, Nil, TruthValue, Closure)):
-            return Tuple(self.elements + [other])
+        if isinstance(other, (int, str, bool, Tuple, Nil, TruthValue, Dummy, Closure)):
+            result = Tuple.__new__(Tuple)
+            result.count = self.count
+            result.shift = self.shift
+            result.root = self.root
+            result.tailOffset = self.tailOffset
+            tailLength = self.count - self.tailOffset
+            if len(self.tail) == tailLength and tailLength < CHUNK_SIZE:
+                result.tail = self.tail  # nobody has appended to this tail yet, so extend it in place
+            else:
+                result.tail = self.tail[:tailLength]
+            result._append(other)
+            return result
         else:
             raise TypeError(f"Cannot add {type(other).__name__} to Tuple.")
         
     def isEmpty(self):
-        return len(self.elements) == 0
+        return self.count == 0
     
 
 class TruthValue:
-    def __init__(self, value):
+    """
+    RPAL truth value. There are only two, TRUE and FALSE: TruthValue(flag)
+    returns one of them, so truth values can be compared with `is`.
+    """
+
+    def __new__(cls, value):
         if not isinstance(value, bool):
             raise TypeError("TruthValue must be a boolean.")
-        self.value = value
+        return TRUE if value else FALSE
 
     def __str__(self):
         return "true" if self.value else "false"
@@ -47,8 +158,24 @@ class TruthValue:
 
     def __bool__(self):
         return self.value
+
+
+def newTruthValue(value):
+    truthValue = object.__new__(TruthValue)
+    truthValue.value = value
+    return truthValue
+
+
+TRUE = newTruthValue(True)
+FALSE = newTruthValue(False)
+
     
 class Nil:
+    """The empty tuple, NIL; Nil() returns it."""
+
+    def __new__(cls):
+        return NIL
+
     def __str__(self):
         return "nil"
 
@@ -62,4 +189,21 @@ class Nil:
         return True
 
     def __eq__(self, other):
-        return isinstance(other, Nil)
\ No newline at end of file
+        return isinstance(other, Nil)
+
+
+class Dummy:
+    """The value of dummy, DUMMY; Dummy() returns it."""
+
+    def __new__(cls):
+        return DUMMY
+
+    def __str__(self):
+        return "dummy"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+NIL = object.__new__(Nil)
+DUMMY = object.__new__(Dummy)
@@ -1,36 +1,27 @@
-from data_types import Tuple, TruthValue, Nil
+from data_types import Tuple, TRUE, FALSE, DUMMY
+import output_sink
 
 class Environment:
 
-    builtInFunctions = [
-        ("Print", 1),
-        ("Isinteger", 1),
-        ("Istruthvalue", 1),
-        ("Isstring", 1),
-        ("Istuple", 1),
-        ("Isfunction", 1),
-        ("Isdummy", 1),
-        ("ItoS", 1),
-        ("Stem", 1),
-        ("Stern", 1),
-        ("Conc", 2),
-        ("Order", 1),
-        ("Null", 1),
-        ("Y*", 1)
-    ]
+    limits = None  # set by limits.MeteredEnvironment
+    depth = 0  # applications in progress, counted under limits only
 
     def __init__(self, parent=None):
         self.parent = parent
         self.bindings = {}
 
+    def child(self, caller=None):
+        """New environment for a closure application, enclosed by this one; caller is the environment the application returns to."""
+        return Environment(self)
+
     def define(self, name, value):
         """Define a new variable in the current environment."""
         self.bindings[name] = value
 
     def defineBuiltInFunctions(self):
-        """Define all built-in functions in the current environment."""
-        for name, arity in self.builtInFunctions:
-            self.define(name, BuiltInFunction(name, arity))
+        """Define all registered built-in functions in the current environment."""
+        for name in BUILTINS:
+            self.define(name, BuiltInFunction(name))
 
     def lookup(self, name):
         """Look up a variable in the current environment or its parent."""
@@ -64,160 +55,182 @@ class Closure:
     def __repr__(self):
         return self.__str__()
     
+# Registered builtins by name: (arity, function taking the arity's arguments)
+BUILTINS = {}
+
+
+def builtin(name, arity=1):
+    """
+    Register a Python function as the RPAL builtin name, e.g.
+
+        @builtin('Conc', 2)
+        def conc(first, second): ...
+
+    Environments created afterwards define it; applications with fewer than
+    arity arguments give a PartialBuiltin.
+    """
+    def register(function):
+        BUILTINS[name] = (arity, function)
+        return function
+    return register
+
+
 class BuiltInFunction:
-    def __init__(self, name, arity=1, args_received=None):
+    def __init__(self, name, arity=None):
+        if name not in BUILTINS:
+            raise NotImplementedError(f"Built-in function '{name}' not yet implemented.")
+        registeredArity, function = BUILTINS[name]
         self.name = name
-        self.arity = arity
-        self.args_received = args_received if args_received is not None else []
+        self.arity = registeredArity if arity is None else arity
+        self.function = function  # looked up once, not on every application
 
     def execute(self, arg_value):
-        # Implement the logic for each built-in function here
-        current_args = self.args_received + [arg_value]
-        if len(current_args) < self.arity:
-            return BuiltInFunction(self.name, self.arity, current_args)
-        else:
-            if self.name == "Print":
-                # print("Executing Print built-in function with argument:")
-                if type(current_args[0]) == str:
-                    escape_char = False
-                    for char in current_args[0]:
-                        if escape_char:
-                            if char == "n":
-                                print("\n", end="")
-                            elif char == "t":
-                                print("\t", end="")
-                            elif char == "\\":
-                                print("\\", end="")
-                            else:
-                                print("\\"+char, end="")
-                            escape_char = False
-                        elif char == "\\":
-                            escape_char = True
-                        else:
-                            print(char, end="")
-
-                else:
-                    print(current_args[0], end="")
-                return "dummy"
-            
-            elif self.name == "Isinteger":
-                if type(current_args[0]) == int:
-                    return TruthValue(True)
-                else:
-                    return TruthValue(False)
-                
-            elif self.name == "Istruthvalue":
-                if isinstance(current_args[0], TruthValue):
-                    return TruthValue(True)
-                else:
-                    return TruthValue(False)
-                
-            elif self.name == "Isstring":
-                if type(current_args[0]) == str:
-                    return TruthValue(True)
-                else:
-                    return TruthValue(False)
-                
-            elif self.name == "Istuple":
-                if isinstance(current_args[0], Tuple):
-                    return TruthValue(True)
-                else:
-                    return TruthValue(False)
-            
-            elif self.name == "Isfunction":
-                if isinstance(current_args[0], BuiltInFunction) or isinstance(current_args[0], Closure):
-                    return TruthValue(True)
-                else:
-                    return TruthValue(False)
-                
-            elif self.name == "Isdummy":
-                if current_args[0] == "dummy":
-                    return TruthValue(True)
-                else:
-                    return TruthValue(False)
-                
-            elif self.name == "ItoS":
-                if type(current_args[0]) == int:
-                    return str(current_args[0])
-                else:
-                    raise TypeError("ItoS built-in function expects an integer argument.")
-                
-            elif self.name == "Stem":
-                if type(current_args[0]) == str:
-                    if len(current_args[0]) == 0:
-                        raise ValueError("Stem built-in function expects a non-empty string argument.")
-                    return current_args[0][0]
-                else:
-                    raise TypeError("Stem built-in function expects a string argument.")
-            
-            elif self.name == "Stern":
-                if type(current_args[0]) == str:
-                    if len(current_args[0]) == 0:
-                        raise ValueError("Stern built-in function expects a non-empty string argument.")
-                    return current_args[0][1:]
-                else:
-                    raise TypeError("Stern built-in function expects a string argument.")
-                
-            elif self.name == "Conc":
-                if len(current_args) != 2:
-                    raise TypeError("Conc function expects exactly two string arguments.")
-                
-                str1 = current_args[0]
-                str2 = current_args[1]
-                
-                if not isinstance(str1, str) or not isinstance(str2, str):
-                    raise TypeError("Conc function expects two string arguments.")
-                
-                return str1 + str2
-            
-            elif self.name == "Order":
-                if isinstance(current_args[0],Tuple):
-                    return len(current_args[0])
-                else:
-                    raise TypeError("Order built-in function expects a tuple argument.")
-                
-            elif self.name == "Null":
-                if isinstance(current_args[0],tuple) and len(current_args[0]) == 0:
-                    return TruthValue(True)
-                else:   
-                    return TruthValue(False)
-
-            elif self.name == 'Y*':
-                from nodes import IdentifierNode # Local import to resolve circular dependency
-                if len(current_args) != 1:
-                    raise TypeError("Y* combinator expects exactly one argument.")
-                
-                if not isinstance(current_args[0], Closure):
-                    raise TypeError("Y* combinator expects a function (closure) as its argument.")
-                
-                rec_lambda_node = current_args[0].lambdaNode 
-                
-                if not isinstance(rec_lambda_node.Vb, IdentifierNode):
-                    raise TypeError("Recursive function name for Y* must be a single identifier.")
-                
-                func_name = rec_lambda_node.Vb.value
-                actual_function_body_node = rec_lambda_node.E
-
-                rec_def_env = current_args[0].env
-
-                recursive_call_env = Environment(parent=rec_def_env)
-                recursive_call_env.define(func_name, None)
-                
-                actual_recursive_closure = Closure(actual_function_body_node, recursive_call_env)
-                recursive_call_env.define(func_name, actual_recursive_closure)
-                return actual_recursive_closure
-            
-            else:
-                raise NotImplementedError(f"Built-in function '{self.name}' not yet implemented.")
-
+        if self.arity == 1:
+            return self.function(arg_value)
+        return PartialBuiltin(self, arg_value, self.arity - 1)
 
     def __call__(self, *args):
         """Call the built-in function with the provided arguments."""
-        return self.func(*args)
+        return self.function(*args)
 
     def __str__(self):
         return f"BuiltInFunction(name={self.name})"
 
     def __repr__(self):
         return self.__str__()
-     
+
+
+class PartialBuiltin(BuiltInFunction):
+    """
+    A builtin applied to some of its arguments: the last argument and the
+    partial application (or builtin) before it, so every application adds
+    one small object and no argument list is copied.
+    """
+
+    def __init__(self, previous, argument, arity):
+        # The builtin was looked up when it was defined: name and function are those of previous
+        self.name = previous.name
+        self.arity = arity  # the arguments still to come
+        self.function = previous.function
+        self.previous = previous
+        self.argument = argument
+
+    def execute(self, arg_value):
+        if self.arity > 1:
+            return PartialBuiltin(self, arg_value, self.arity - 1)
+        return self(arg_value)
+
+    def __call__(self, *args):
+        """Call the built-in function with the arguments applied so far followed by args."""
+        arguments = list(reversed(args))
+        partial = self
+        while type(partial) is PartialBuiltin:
+            arguments.append(partial.argument)
+            partial = partial.previous
+        arguments.reverse()
+        return self.function(*arguments)
+
+    def __str__(self):
+        return f"PartialBuiltin(name={self.name}, arity={self.arity})"
+
+
+@builtin('Print')
+def printValue(value):
+    # String literals were decoded when they were parsed, escapes included
+    output_sink.write(value if type(value) is str else str(value))
+    return DUMMY
+
+
+@builtin('Isinteger')
+def isInteger(value):
+    return TRUE if type(value) is int else FALSE
+
+
+@builtin('Istruthvalue')
+def isTruthValue(value):
+    return TRUE if value is TRUE or value is FALSE else FALSE
+
+
+@builtin('Isstring')
+def isString(value):
+    return TRUE if type(value) is str else FALSE
+
+
+@builtin('Istuple')
+def isTuple(value):
+    return TRUE if isinstance(value, Tuple) else FALSE
+
+
+@builtin('Isfunction')
+def isFunction(value):
+    return TRUE if isinstance(value, (BuiltInFunction, Closure)) else FALSE
+
+
+@builtin('Isdummy')
+def isDummy(value):
+    return TRUE if value is DUMMY else FALSE
+
+
+@builtin('ItoS')
+def itos(value):
+    if type(value) == int:
+        return str(value)
+    raise TypeError("ItoS built-in function expects an integer argument.")
+
+
+@builtin('Stem')
+def stem(value):
+    if type(value) == str:
+        if len(value) == 0:
+            raise ValueError("Stem built-in function expects a non-empty string argument.")
+        return value[0]
+    raise TypeError("Stem built-in function expects a string argument.")
+
+
+@builtin('Stern')
+def stern(value):
+    if type(value) == str:
+        if len(value) == 0:
+            raise ValueError("Stern built-in function expects a non-empty string argument.")
+        return value[1:]
+    raise TypeError("Stern built-in function expects a string argument.")
+
+
+@builtin('Conc', 2)
+def conc(str1, str2):
+    if not isinstance(str1, str) or not isinstance(str2, str):
+        raise TypeError("Conc function expects two string arguments.")
+    return str1 + str2
+
+
+@builtin('Order')
+def order(value):
+    if isinstance(value, Tuple):
+        return len(value)
+    raise TypeError("Order built-in function expects a tuple argument.")
+
+
+@builtin('Null')
+def null(value):
+    return TRUE if isinstance(value, tuple) and len(value) == 0 else FALSE
+
+
+@builtin('Y*')
+def fixpoint(closure):
+    from nodes import IdentifierNode # Local import to resolve circular dependency
+    if not isinstance(closure, Closure):
+        raise TypeError("Y* combinator expects a function (closure) as its argument.")
+
+    rec_lambda_node = closure.lambdaNode
+    if not isinstance(rec_lambda_node.Vb, IdentifierNode):
+        raise TypeError("Recursive function name for Y* must be a single identifier.")
+
+    func_name = rec_lambda_node.Vb.value
+    actual_function_body_node = rec_lambda_node.E
+
+    recursive_call_env = closure.env.child()
+    recursive_call_env.define(func_name, None)
+
+    actual_recursive_closure = Closure(actual_function_body_node, recursive_call_env)
+    recursive_call_env.define(func_name, actual_recursive_closure)
+    return actual_recursive_closure
@@ -0,0 +1,79 @@
+from nodes import STLambdaNode
+
+
+class HashConser:
+    """
+    Interns standardized trees into a DAG in which structurally identical
+    subtrees are one node: two subtrees of interned trees are equal exactly
+    when they are the same object.
+
+        conser = HashConser()
+        dag = conser.intern(st)
+
+    Nodes are compared by class, type, value, tail flag, lambda name and
+    their (already interned) children, so a subtree is only shared where
+    every evaluator treats the occurrences alike. The nodes of the input
+    are reused and their children re-pointed at the interned copies; the
+    tree must not be rewritten in place afterwards, since a change to a
+    shared node shows through every occurrence (-O runs before interning).
+    """
+
+    def __init__(self):
+        self.table = {}  # key of a node -> the interned node
+        # id of every node visited -> the node and its interned node; holding the node keeps its
+        # id from being reused by a deferred child standardized later in the traversal
+        self.interned = {}
+        self.visited = 0  # node occurrences visited, counting shared ones once per occurrence
+
+    def key(self, node):
+        children = []
+        for field in node.fields:
+            child = getattr(node, field)
+            if type(child) is list:
+                children.append(tuple(id(element) for element in child))
+            else:
+                children.append(id(child))
+        name = node.name if type(node) is STLambdaNode else None
+        return (type(node), node.type, node.value, node.tail, name, tuple(children))
+
+    def intern(self, root):
+        """The interned version of root; children of root's nodes are replaced by their interned versions."""
+        interned = self.interned
+        pending = [(root, False)]
+        while pending:
+            node, childrenDone = pending.pop()
+            if not childrenDone:
+                self.visited += 1
+                if id(node) in interned:
+                    continue
+                pending.append((node, True))
+                for field in reversed(node.fields):
+                    child = getattr(node, field)
+                    for element in reversed(child) if type(child) is list else (child,):
+                        pending.append((element, False))
+                continue
+            if id(node) in interned:
+                continue  # reached twice below one parent, as in (X, X)
+            for field in node.fields:
+                child = getattr(node, field)
+                if type(child) is list:
+                    internedChild = [interned[id(element)][1] for element in child]
+                    if any(a is not b for a, b in zip(child, internedChild)):
+                        setattr(node, field, internedChild)
+                else:
+                    internedChild = interned[id(child)][1]
+                    if internedChild is not child:
+                        setattr(node, field, internedChild)
+            interned[id(node)] = (node, self.table.setdefault(self.key(node), node))
+        return interned[id(root)][1]
+
+    def distinct(self):
+        """Number of distinct subtrees interned so far."""
+        return len(self.table)
+
+
+def hashCons(st):
+    """Intern st into a DAG. Returns the DAG, the number of nodes in st and the number of distinct nodes."""
+    conser = HashConser()
+    dag = conser.intern(st)
+    return dag, conser.visited, conser.distinct()
@@ -0,0 +1,224 @@
+from bisect import bisect_left
+
+from Lexer import scanSpans, reportUnknown
+from parser import Parser
+from nodes import Node, LetNode, WhereNode
+
+
+class Document:
+    """
+    Incremental front end for a source that is re-run after small edits.
+
+    The program is split along its top-level spine, `let D1 in let D2 in ...
+    in Body` where Body may be `T where Dr`, into segments. Each segment is
+    parsed and standardized on its own and cached by its token values, so
+    update() re-lexes only the edited region of the text and re-parses and
+    re-standardizes only the segments whose tokens changed. Anything the
+    segmenting does not cover (or a syntax error) falls back to a full parse
+    of the token stream, so the resulting trees are always the same as
+    Parser(tokens).parse_E() and its standardize().
+    """
+
+    def __init__(self, source):
+        self.source = ''
+        self.spans = []     # (token, end offset) for every token of source
+        self.segments = {}  # (kind, token values) -> [ast, st, ast node count]
+        self.ast = None
+        self.st = None
+        self.stats = {}
+        self.update(source)
+
+    @property
+    def tokens(self):
+        return [token for token, _ in self.spans if token.type != 'unknown']
+
+    def update(self, source):
+        """Bring the document up to date with source and return reuse statistics."""
+        self.stats = {
+            'tokensReused': 0, 'tokensLexed': 0,
+            'segments': 0, 'segmentsReused': 0,
+            'nodesReused': 0, 'nodesBuilt': 0,
+        }
+        self.relex(source)
+        self.source = source
+
+        tokens = self.tokens
+        segments = {}
+        try:
+            self.ast, self.st = self.assemble(tokens, segments)
+        except SyntaxError:
+            self.ast, self.st = None, None
+        if self.ast is None:
+            # Parse errors and programs that do not split cleanly are left to the full parser
+            segments = {}
+            self.ast = Parser(tokens).parse_E()
+            self.st = self.ast.standardize()
+            self.stats['nodesBuilt'] = countNodes(self.ast)
+        self.segments = segments
+        return self.stats
+
+    def relex(self, source):
+        """Re-lex only the part of source between the unchanged prefix and suffix."""
+        old, spans = self.source, self.spans
+        if source == old and spans:
+            self.stats['tokensReused'] = len(spans)
+            return
+        if not spans or any(token.type == 'unknown' for token, _ in spans):
+            # An unterminated string lexes as an unknown quote, which can be
+            # changed by an edit anywhere after it
+            self.spans = self.lexFrom(source, 0)
+            self.stats['tokensLexed'] = len(self.spans)
+            return
+
+        limit = min(len(old), len(source))
+        prefix = 0
+        while prefix < limit and old[prefix] == source[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and old[-1 - suffix] == source[-1 - suffix]:
+            suffix += 1
+
+        ends = [end for _, end in spans]
+        # Tokens ending before the first changed character are unaffected
+        keep = bisect_left(ends, prefix)
+        start = ends[keep - 1] if keep else 0
+        delta = len(source) - len(old)
+        synced = len(source) - suffix
+
+        newSpans = spans[:keep]
+        reused = keep
+        for token, end in scanSpans(source, start):
+            newSpans.append((token, end))
+            if token.type == 'unknown':
+                reportUnknown(token.value)
+            if end >= synced:
+                # Past the edit: once a token ends where an old one ended, the rest
+                # of the text is the same as before and so is the rest of the tokens
+                i = bisect_left(ends, end - delta)
+                if i < len(ends) and ends[i] == end - delta:
+                    newSpans.extend((token, oldEnd + delta) for token, oldEnd in spans[i + 1:])
+                    reused += len(spans) - i - 1
+                    break
+
+        self.spans = newSpans
+        self.stats['tokensReused'] = reused
+        self.stats['tokensLexed'] = len(newSpans) - reused
+
+    def lexFrom(self, source, start):
+        spans = list(scanSpans(source, start))
+        for token, _ in spans:
+            if token.type == 'unknown':
+                reportUnknown(token.value)
+        return spans
+
+    def assemble(self, tokens, segments):
+        """Build the AST and ST from cached or freshly parsed segments; None if they do not split cleanly."""
+        definitions = []
+        i = 0
+        while i < len(tokens) and tokens[i].type == 'let':
+            end = matchingIn(tokens, i)
+            if end is None:
+                return None, None
+            definition = self.segment('D', tokens[i + 1:end], segments)
+            if definition is None:
+                return None, None
+            definitions.append(definition)
+            i = end + 1
+
+        body = tokens[i:]
+        split = topLevelWhere(body)
+        if split is None:
+            # The body of the innermost let is a lambda body, so its tail calls are marked
+            parts = [self.segment('E' if definitions else 'program', body, segments)]
+        else:
+            parts = [self.segment('T', body[:split], segments), self.segment('Dr', body[split + 1:], segments)]
+        if None in parts:
+            return None, None
+
+        # Standardize only once the whole program has parsed, in the order
+        # Node.standardize would, so errors surface exactly as without reuse
+        for entry in definitions + parts:
+            if entry[1] is None:
+                entry[1] = entry[0].standardize()
+
+        if split is None:
+            ast, st = parts[0][0], parts[0][1]
+        else:
+            ast = WhereNode(parts[0][0], parts[1][0])
+            st = WhereNode.combine(parts[0][1], parts[1][1])
+            self.stats['nodesBuilt'] += 1
+        for defAst, defSt, _ in reversed(definitions):
+            ast = LetNode(defAst, ast)
+            st = LetNode.combine(defSt, st)
+            self.stats['nodesBuilt'] += 1
+        return ast, st
+
+    def segment(self, kind, tokens, segments):
+        """[ast, st, size] of one segment, reused from the previous version if its tokens are unchanged."""
+        key = (kind, tuple((token.type, token.value) for token in tokens))
+        self.stats['segments'] += 1
+        entry = segments.get(key) or self.segments.get(key)
+        if entry is not None:
+            self.stats['segmentsReused'] += 1
+            self.stats['nodesReused'] += entry[2]
+        else:
+            parser = Parser(tokens)
+            if kind == 'D':
+                ast = parser.parse_D()
+            elif kind == 'T':
+                ast = parser.parse_T()
+            elif kind == 'Dr':
+                ast = parser.parse_Dr()
+            else:
+                ast = parser.parse_E()
+            if parser.position != len(tokens):
+                return None
+            entry = [ast, None, countNodes(ast)]  # standardized by assemble()
+            self.stats['nodesBuilt'] += entry[2]
+        segments[key] = entry
+        return entry
+
+
+def matchingIn(tokens, start):
+    """Index of the 'in' that closes the 'let' at tokens[start]."""
+    depth = 0
+    for i in range(start, len(tokens)):
+        if tokens[i].type == 'let':
+            depth += 1
+        elif tokens[i].type == 'in':
+            depth -= 1
+            if depth == 0:
+                return i
+    return None
+
+
+def topLevelWhere(tokens):
+    """Index of the 'where' that splits an Ew body into T and Dr, if any."""
+    if tokens and tokens[0].type == 'fn':
+        return None  # fn Vb+ . E extends as far as possible and takes any where with it
+    depth = 0
+    for i, token in enumerate(tokens):
+        if token.type == 'punction':
+            if token.value == '(':
+                depth += 1
+            elif token.value == ')':
+                depth -= 1
+        elif token.type == 'where' and depth == 0:
+            return i
+    return None
+
+
+def countNodes(root):
+    """Number of AST nodes under root, including root."""
+    count = 0
+    pending = [root]
+    while pending:
+        node = pending.pop()
+        count += 1
+        for field in node.fields:
+            child = getattr(node, field)
+            if type(child) is list:
+                pending.extend(child)
+            elif isinstance(child, Node):  # unary plus parses to ArithmeticNode('+', 0, operand)
+                pending.append(child)
+    return count
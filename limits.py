@@ -0,0 +1,123 @@
+import weakref
+
+from environment import Environment
+
+UNLIMITED = float('inf')
+
+
+class ResourceExhausted(RuntimeError):
+    """A program went over one of the budgets of its Limits."""
+    def __init__(self, message, counters):
+        details = ", ".join(f"{name}={value}" for name, value in counters.items())
+        super().__init__(f"{message} ({details})")
+        self.counters = counters
+
+
+class Limits:
+    """
+    Budgets for evaluating an untrusted program with the tree walker or the
+    CSE machine:
+
+    fuel               closure applications (including Y*) the program may make
+    maxDepth           closure applications in progress at the same time,
+                       i.e. recursion depth
+    maxTupleElements   tuple elements alive at the same time
+
+    Depth bounds the Python stack and the environments of applications in
+    progress, not every environment alive: one kept alive by a closure after
+    its application has returned is not counted, and a tail call does not
+    nest. The tuple cap is soft: freed tuples are only discounted when the
+    cap is reached. Tuples are not counted at all without a tuple cap.
+    """
+
+    def __init__(self, fuel=None, maxDepth=None, maxTupleElements=None):
+        self.fuel = UNLIMITED if fuel is None else fuel
+        self.maxDepth = UNLIMITED if maxDepth is None else maxDepth
+        self.maxTupleElements = UNLIMITED if maxTupleElements is None else maxTupleElements
+        self.countsTuples = maxTupleElements is not None  # checked before every call of allocateTuple
+        self.applications = 0
+        self.depth = 0  # deepest nesting of applications reached
+        self.tupleElements = 0
+        self.tuples = []  # weak references to the tuples counted in tupleElements
+        self.recountAt = 0
+
+    def environment(self):
+        """A global environment with the built-in functions that meters every environment built from it."""
+        env = MeteredEnvironment(self)
+        env.defineBuiltInFunctions()
+        return env
+
+    def counters(self):
+        return {
+            'applications': self.applications,
+            'depth': self.depth,
+            'tupleElements': self.tupleElements,
+        }
+
+    def exhausted(self):
+        if self.applications > self.fuel:
+            raise ResourceExhausted(f"Out of fuel after {self.fuel} applications", self.counters())
+        elif self.depth > self.maxDepth:
+            raise ResourceExhausted(f"More than {self.maxDepth} nested applications", self.counters())
+        else:
+            raise ResourceExhausted(f"More than {self.maxTupleElements} live tuple elements", self.counters())
+
+    def allocateTuple(self, tuple):
+        """Account for a new tuple until it is freed; only called when countsTuples is set."""
+        # Tuples built by aug share their elements with the tuple they extend, so
+        # charging every tuple its full length counts shared elements once per
+        # live version: an over-estimate, but right for the usual chain of augs
+        # where only the newest version stays alive.
+        elements = self.tupleElements + tuple.count
+        self.tupleElements = elements
+        tuples = self.tuples
+        tuples.append(weakref.ref(tuple))
+        # Freed tuples are only discounted when the cap is reached, and at most
+        # once per doubling of the tuples tracked so far, which keeps the
+        # accounting amortized O(1) per tuple.
+        if elements > self.maxTupleElements and len(tuples) >= self.recountAt:
+            self.recountTuples()
+
+    def recountTuples(self):
+        live = []
+        elements = 0
+        for ref in self.tuples:
+            tuple = ref()
+            if tuple is not None:
+                live.append(ref)
+                elements += tuple.count
+        self.tuples = live
+        self.tupleElements = elements
+        self.recountAt = 2 * len(live)
+        if elements > self.maxTupleElements:
+            self.exhausted()
+
+
+class MeteredEnvironment(Environment):
+    """Environment that charges its Limits for every closure application and tracks how deeply they nest."""
+
+    def __init__(self, limits, parent=None):
+        super().__init__(parent)
+        self.limits = limits
+
+    def child(self, caller=None):
+        # Every closure application (and Y*) builds exactly one child
+        # environment, so this is where applications are metered. The depth
+        # is carried by the environments themselves, so nothing has to be
+        # undone when an application returns.
+        limits = self.limits
+        applications = limits.applications + 1
+        limits.applications = applications
+        depth = (self if caller is None else caller).depth + 1
+        if depth > limits.depth:  # deeper than ever before, which is rare
+            limits.depth = depth
+            if depth > limits.maxDepth:
+                limits.exhausted()
+        if applications > limits.fuel:
+            limits.exhausted()
+        env = MeteredEnvironment.__new__(MeteredEnvironment)
+        env.parent = self
+        env.bindings = {}
+        env.limits = limits
+        env.depth = depth
+        return env
@@ -1,57 +1,154 @@
+import os
 import sys
-from Lexer import Lexer
-from parser import Parser
+import traceback
+from Lexer import StreamingLexer
+from parser import StreamParser
 from environment import Environment, BuiltInFunction
+from cse_machine import CSEMachine
+import vm
+from st_cache import STCache
+from limits import Limits, ResourceExhausted
+from profiler import Profiler
+from optimizer import optimize
+from hashcons import hashCons
+from output_sink import currentSink, outputTo
+
+# Options that take a value, and the Limits argument each one sets
+LIMIT_OPTIONS = {'--fuel': 'fuel', '--max-depth': 'maxDepth', '--max-tuple-elements': 'maxTupleElements'}
+
+# Errors a program can raise that are reported as "Error: ..." rather than as unexpected
+PROGRAM_ERRORS = (SyntaxError, NameError, TypeError, ZeroDivisionError, NotImplementedError, ValueError, RuntimeError, IndexError)
+
+
+def optionValue(flags, name, default=None):
+    """Value following name in flags, e.g. optionValue(argv, '--workers')."""
+    if name in flags:
+        index = flags.index(name)
+        if index + 1 < len(flags):
+            return flags[index + 1]
+        raise SyntaxError(f"Missing value for {name}")
+    return default
+
+
+def limitsFromFlags(flags):
+    """Limits set with --fuel, --max-depth and --max-tuple-elements, or None if there are none."""
+    budgets = {argument: int(optionValue(flags, option)) for option, argument in LIMIT_OPTIONS.items() if option in flags}
+    return Limits(**budgets) if budgets else None
+
+
+def standardizedTree(filename, flags):
+    """Standardized tree of a program, printing the AST/ST if asked for by flags."""
+    # A warm run loads the AST and skips lexing and parsing. The AST is cached rather
+    # than the standardized tree so that standardizing stays lazy on warm runs too.
+    cache = None if "--no-cache" in flags else STCache()
+    key = cache.key(filename) if cache else None
+    ast = cache.get(key) if cache else None
+
+    if ast is None:
+        # Tokens are produced lazily from the memory-mapped file as the parser consumes them
+        lexer = StreamingLexer(filename)
+        parser = StreamParser(lexer.tokenize())
+        ast = parser.parse_E()
+        if cache:
+            cache.put(key, ast)
+
+    if "-ast" in flags:
+        ast.print()
+
+    st = ast.standardize()
+
+    if "-O" in flags:
+        # Lambda bodies and branches are folded when they are first standardized,
+        # so the count covers what standardize() has reached so far
+        st, folder = optimize(st)
+        print(f"Constant folding: {folder.folded} nodes folded before running", file=sys.stderr)
+
+    if "-dag" in flags:
+        # After -O, so that the folded tree is what gets interned
+        st, nodes, distinct = hashCons(st)
+        print(f"Hash-consing: {nodes} nodes -> {distinct} distinct", file=sys.stderr)
+
+    if "-st" in flags:
+        st.print()
+    return st
+
+
+def evaluate(st, flags, global_env=None):
+    """
+    Run a standardized tree on the evaluator selected by flags. What it
+    prints goes to the output sink of the caller's context, or through a
+    buffer to sys.stdout, flushed when the program ends or fails.
+    """
+    if currentSink() is None:
+        with outputTo(sys.stdout):
+            return evaluate(st, flags, global_env)
+    if global_env is None:
+        limits = limitsFromFlags(flags)
+        if limits is not None:
+            global_env = limits.environment()
+        else:
+            global_env = Environment()
+            global_env.defineBuiltInFunctions()
+    if global_env.limits is not None and "-vm" in flags:
+        raise NotImplementedError("Resource limits are enforced by the tree walker and the CSE machine, not the VM")
 
-def read_file(filename):
-    with open(filename,'r') as f:
-        return f.read()
+    try:
+        if "-cse" in flags:
+            return CSEMachine().run(st, global_env)
+        elif "-vm" in flags:
+            return vm.execute(st, global_env)
+        else:
+            return st.interpret(global_env)
+    except RecursionError:
+        if global_env.limits is None:
+            raise
+        # Under limits a stack overflow is one more exhausted resource
+        raise ResourceExhausted("Python stack exhausted", global_env.limits.counters()) from None
 
 
 def main():
     if len(sys.argv) < 2 :
-        print("Usage: python myrpal.py [-ast] <filename>")
+        print("Usage: python myrpal.py [-ast] [-st] [-O] [-dag] [-cse | -vm] [--no-cache] [--fuel N] [--max-depth N] [--max-tuple-elements N] <filename>")
+        print("       python myrpal.py -profile [--stacks FILE] <filename>")
+        print("       python myrpal.py --batch <dir-or-glob> [--workers N] [--report FILE] [-O] [-dag] [-cse | -vm] [--no-cache]")
         return
 
-
-    filename = sys.argv[2] if len(sys.argv) > 2 else sys.argv[1]
-    code = read_file(filename)
     flags = sys.argv
-    
-
 
-    lexer = Lexer(code)
-    lexer.tokenize()
-    # print("Tokens: "+str(lexer.tokens))
+    if "--batch" in flags:
+        import batch
+        batch.main(flags)
+        return
 
-    parser = Parser(lexer.tokens)
+    filename = sys.argv[-1]
 
     try:
-        ast = parser.parse_E()
-
-        if "-ast" in flags:
-            ast.print()
-
-        st = ast.standardize()
+        st = standardizedTree(filename, flags)
 
-        if "-st" in flags:
-            st.print()
-        
-        global_env = Environment()
-        global_env.defineBuiltInFunctions()
-            
         print("Output of the above program is:")
-        final_result = st.interpret(global_env)
-        print()
+        if "-profile" in flags:
+            if "-cse" in flags or "-vm" in flags:
+                raise NotImplementedError("-profile profiles the tree walker, not -cse or -vm")
+            profiler = Profiler()
+            with profiler:
+                final_result = evaluate(st, flags)
+            print("\n")
+            profiler.report()
+            stacksFile = optionValue(flags, '--stacks', os.path.splitext(filename)[0] + '.folded')
+            profiler.writeCollapsed(stacksFile)
+            print(f"Collapsed stacks written to {stacksFile}")
+        else:
+            final_result = evaluate(st, flags)
+            print()
         #print("\nFinal Program Result:", final_result)
 
 
-    except (SyntaxError, NameError, TypeError, ZeroDivisionError, NotImplementedError, ValueError, RuntimeError, IndexError) as e:
+    except PROGRAM_ERRORS as e:
         print(f"Error: {e}")
         #e.print_exc()
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
-        e.print_exc()
+        traceback.print_exc()
 
 
 if __name__ == "__main__":
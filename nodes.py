@@ -1,26 +1,144 @@
+import sys
 from abc import ABC, abstractmethod
-from data_types import Tuple, TruthValue, Nil
-from environment import Closure, Environment, BuiltInFunction
+from operator import is_
+from data_types import Tuple, TruthValue, Nil, Dummy, TRUE, FALSE, NIL, DUMMY
+from environment import Closure, BuiltInFunction
+from output_sink import OutputSink
+
+# Kind tags: one small integer per node class, for dispatch on node.kind
+# instead of chains of isinstance checks
+(IDENTIFIER_NODE, RN_NODE, ST_LAMBDA_NODE, GAMMA_NODE, TAU_NODE, COMMA_NODE, ARROW_NODE, AUG_NODE,
+ NOT_NODE, NEG_NODE, BOOLEAN_NODE, CONDITION_NODE, ARITHMETIC_NODE, LAMBDA_NODE, LET_NODE,
+ ASSIGNMENT_NODE, FCN_FORM_NODE, REC_NODE, AND_NODE, WITHIN_NODE, WHERE_NODE, AT_NODE) = range(22)
+
 
 class Node(ABC):
+    # Nodes have no __dict__: every class lists its attributes in __slots__.
+    # A type and value that are the same for every node of a class are class
+    # attributes.
+    __slots__ = ('standardized',)  # True once the node is known to be standard, else the node it standardized to
     indentationSymbol = '.'
-    standardized = False
+    tail = False  # set on applications (and '->') in tail position of a lambda body
+    fields = ()  # attributes holding the children, in standardization order
+    deferredFields = ()  # children transform() leaves unstandardized, to be standardized when first read
+    kind = None  # one of the *_NODE tags above, set by every class
 
-    def __init__(self, type_, value):
-        super().__init__()
-        self.type = type_
-        self.value = value
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.slotNames = tuple(name for klass in reversed(cls.__mro__) for name in klass.__dict__.get('__slots__', ()))
+        cls.eagerFields = tuple(name for name in cls.fields if name not in cls.deferredFields)
+
+    def __init__(self):
+        self.standardized = False
 
-    @abstractmethod
     def standardize(self):
-        # This method should be implemented by subclasses to standardize the node
-        pass
+        """
+        Standardized tree of this node. It is computed once and remembered,
+        and is the node itself when nothing below it changes.
+        """
+        st = self.standardized
+        if st is True:
+            return self
+        if st is False:
+            self.standardizeChildren()
+            st = self.transform()
+            self.standardized = True if st is self else st
+        return st
+
+    def standardizeChildren(self):
+        """
+        Standardize the descendants transform() would, bottom-up and without
+        recursion, so transform() only meets standardized children and the
+        depth of the tree is not bounded by the recursion limit.
+        """
+        # Descendants in preorder, right child first; popped from the end they come
+        # left to right, every node after its children
+        order = []
+        pending = []
+        pop = pending.pop
+        push = pending.append
+        node = self
+        while True:
+            for name in node.eagerFields:
+                child = getattr(node, name)
+                if type(child) is list:
+                    for element in child:
+                        if element.standardized is False:
+                            push(element)
+                elif child.standardized is False:
+                    push(child)
+            if not pending:
+                break
+            node = pop()
+            order.append(node)
+        while order:
+            node = order.pop()
+            if node.standardized is False:
+                st = node.transform()
+                node.standardized = True if st is node else st
 
     @abstractmethod
-    def print(self, indent=0):
-        # This method should be implemented by subclasses to print the node
+    def transform(self):
+        # This method should be implemented by subclasses to standardize the node
         pass
-        
+
+    def standardizeFields(self):
+        """The node itself if standardizing its children changes none of them, else a copy with the standardized children."""
+        copy = None
+        for name in self.fields:
+            child = getattr(self, name)
+            if type(child) is list:
+                stChild = [element.standardize() for element in child]
+                if all(map(is_, child, stChild)):
+                    continue
+            else:
+                stChild = child.standardize()
+                if stChild is child:
+                    continue
+            if copy is None:
+                copy = object.__new__(type(self))
+                for slot in self.slotNames:
+                    setattr(copy, slot, getattr(self, slot))
+                copy.standardized = True
+            setattr(copy, name, stChild)
+        return self if copy is None else copy
+
+    def label(self):
+        """Text of the node in a printed tree."""
+        return self.value
+
+    def print(self, indent=0, out=None):
+        """
+        Print the tree below this node to out (default: sys.stdout), one node
+        per line, indented by its depth. Lines go through one buffered
+        writer, and the tree is walked with an explicit stack, so there is no
+        limit on its depth.
+        """
+        sink = OutputSink(sys.stdout if out is None else out)
+        write = sink.write
+        symbol = self.indentationSymbol
+        pending = [(self, indent)]
+        pop = pending.pop
+        try:
+            while pending:
+                node, depth = pop()
+                write(f'{symbol * depth}{node.label()}\n')
+                if node.fields:
+                    # Children are read left to right, standardizing deferred ones in that order
+                    children = []
+                    for name in node.fields:
+                        child = getattr(node, name)
+                        if type(child) is list:
+                            children.extend(child)
+                        else:
+                            children.append(child)
+                    depth += 1
+                    for child in reversed(children):
+                        pending.append((child, depth))
+        finally:
+            # Reading a deferred child standardizes it, which can fail: the lines so far are kept
+            sink.flush()
+
     def __str__(self):
         return f"{self.type} Node with value: {self.value}"
 
@@ -28,34 +146,101 @@ class Node(ABC):
         return self.__str__()
     
 class STLambdaNode(Node):
+    # name: of the definition the lambda comes from, for profiles
+    # pendingE: unstandardized body of a lambda made by deferred(), until it is first read
+    __slots__ = ('Vb', 'E', 'pendingE', 'name')
+    type = 'E'
+    value = 'lambda'
+    kind = ST_LAMBDA_NODE
+    fields = ('Vb', 'E')
+
     def __init__(self, Vb, Exp):
-        super().__init__('E', 'lambda')
+        self.standardized = True
         self.Vb = Vb
         self.E = Exp
-    
-    def standardize(self):
+        self.pendingE = None
+        self.name = None
+        markTailCalls(Exp)
+
+    @classmethod
+    def deferred(cls, Vb, Exp):
+        """Lambda whose body, the unstandardized Exp, is standardized when it is first read."""
+        node = cls.__new__(cls)
+        node.standardized = True
+        node.Vb = Vb
+        node.pendingE = Exp
+        node.name = None
+        return node
+
+    def __getattr__(self, name):
+        # Only reached for slots that are not set, such as the body of a deferred lambda
+        if name != 'E' or self.pendingE is None:
+            raise AttributeError(name)
+        body = self.E = self.pendingE.standardize()
+        self.pendingE = None
+        markTailCalls(body)
+        if self.name is not None and body.kind == ST_LAMBDA_NODE:
+            nameLambdas(body, IdentifierNode(self.name))
+        return body
+    
+    def transform(self):
         return self
     
     def interpret(self, env):
         return Closure(self, env)  # Return a closure with the current environment
-    
-    def print(self, indent=0):
-        print(f'{self.indentationSymbol * indent}{self.value}')
-        self.Vb.print(indent + 1)
-        self.E.print(indent + 1)
+
+    def bind(self, env, rand):
+        """Bind the argument of an application to the bound variable(s) in env."""
+        if isinstance(self.Vb, IdentifierNode):
+            env.define(self.Vb.value, rand)
+        else:
+            for name, value in zip(self.parameterNames(), self.arguments(rand)):
+                if name is not None:
+                    env.define(name, value)
+
+    def parameterNames(self):
+        """Names bound by this lambda, in slot order; None marks a dummy position."""
+        if isinstance(self.Vb, IdentifierNode):
+            return [self.Vb.value]
+        elif isinstance(self.Vb, CommaNode):
+            return [param.value if isinstance(param, IdentifierNode) else None for param in self.Vb.params]
+        else:
+            return []
+
+    def arguments(self, rand):
+        """Split the argument of an application into one value per parameter slot."""
+        if isinstance(self.Vb, IdentifierNode):
+            return [rand]
+        elif isinstance(self.Vb, CommaNode):
+            if not isinstance(rand, Tuple) or len(rand) != len(self.Vb.params):
+                raise TypeError(f"Tuple parameter mismatch. Expected {len(self.Vb.params)} arguments, but received {len(rand)}.")
+            for param in self.Vb.params:
+                if not isinstance(param, IdentifierNode) and not (isinstance(param, RnNode) and param.value == 'dummy'):
+                    raise NotImplementedError(f"Unsupported parameter type in CommaNode: {type(param).__name__}")
+            return list(rand)
+        else:
+            if isinstance(self.Vb, RnNode) and self.Vb.value == 'dummy':
+                return []
+            else:
+                raise TypeError(f"Unsupported parameter definition type: {type(self.Vb).__name__}")
 
     def __str__(self):
         return f"STLambda({self.Vb}, {self.E})"
 
 
 class IdentifierNode(Node):
+    __slots__ = ('value', 'address')  # address: frame slot of the name, set by the VM compiler
+    kind = IDENTIFIER_NODE
+
     def __init__(self, name):
-        if name=='()':
-            super().__init__('()', '()')
-        else:
-            super().__init__('Identifier', name)
+        self.standardized = True
+        self.value = sys.intern(name)  # one string per name, however many times it occurs
+
+    @property
+    def type(self):
+        return '()' if self.value == '()' else 'Identifier'
     
-    def standardize(self):
+    def transform(self):
         return self  # Return the node itself, as IdentifierNode is already standardized
     
     def interpret(self, env):
@@ -64,23 +249,27 @@ class IdentifierNode(Node):
     def __str__(self):
         return f"Identifier({self.value})"
     
-    def print(self, indent=0):
-        if self.value == '()':
-            print(f'{self.indentationSymbol * indent}<()>')
-        else:
-            print(f'{self.indentationSymbol * indent}<ID:{self.value}>')
+    def label(self):
+        return '<()>' if self.value == '()' else f'<ID:{self.value}>'
 
 
 class LambdaNode(Node):
+    __slots__ = ('Vb_list', 'E')
+    type = 'E'
+    value = 'lambda'
+    kind = LAMBDA_NODE
+    fields = ('Vb_list', 'E')
+    deferredFields = ('E',)
+
     def __init__(self, Vbs, Exp):
-        super().__init__('E', 'lambda')
+        super().__init__()
         self.Vb_list = Vbs
         self.E = Exp
     
-    def standardize(self):
+    def transform(self):
         stVbs = [vb.standardize() for vb in self.Vb_list]
-        stE = self.E.standardize()
-        for i in range(len(stVbs)-1, -1, -1):
+        stE = STLambdaNode.deferred(stVbs[-1], self.E)  # the body is standardized when first applied
+        for i in range(len(stVbs)-2, -1, -1):
             node = STLambdaNode(stVbs[i], stE)
             stE = node
         return stE  # Return the standardized lambda node
@@ -90,132 +279,190 @@ class LambdaNode(Node):
     
     def __str__(self):
         return f"Lambda({self.Vb_list}, {self.E})"
-    
-    def print(self, indent=0):
-        print(f'{self.indentationSymbol * indent}{self.value}')
-        for vb in self.Vb_list:
-            vb.print(indent + 1)
-        self.E.print(indent + 1)
 
 
 class GammaNode(Node):
+    __slots__ = ('N', 'E', 'tail')
+    type = 'gamma'
+    value = 'gamma'
+    kind = GAMMA_NODE
+    fields = ('N', 'E')
+
     def __init__(self, N, E):
-        super().__init__('gamma', 'gamma')
+        super().__init__()
         self.N = N
         self.E = E
+        self.tail = False
     
-    def standardize(self):
-        stN = self.N.standardize()
-        stE = self.E.standardize()
-        return GammaNode(stN, stE)
+    transform = Node.standardizeFields
 
     def interpret(self, env):
         rand = self.E.interpret(env)
         rator = self.N.interpret(env)
 
         if isinstance(rator, Closure):
-            newEnv = Environment(parent=rator.env) # This uses rator.env as per your code
-
-            param_node = rator.lambdaNode.Vb # This uses rator.lambdaNode.Vb as per your code
-            
-            # --- Parameter Binding Logic ---
-            if isinstance(param_node, IdentifierNode):
-                newEnv.define(param_node.value, rand)
-            elif isinstance(param_node, CommaNode):
-                if not isinstance(rand, Tuple) or len(rand) != len(param_node.params):
-                    raise TypeError(f"Tuple parameter mismatch. Expected {len(param_node.params)} arguments, but received {len(rand)}.")
-                for i, param in enumerate(param_node.params):
-                    if isinstance(param, IdentifierNode):
-                        newEnv.define(param.value, rand[i])
-                    elif isinstance(param, RnNode) and param.value == 'dummy': # Ensure RnNode is imported
-                        pass
-                    else:
-                        raise NotImplementedError(f"Unsupported parameter type in CommaNode: {type(param).__name__}")
-            else:
-                if isinstance(param_node, RnNode) and param_node.value == 'dummy': # Ensure RnNode is imported
-                    pass
-                else:
-                    raise TypeError(f"Unsupported parameter definition type: {type(param_node).__name__}")
-            
-            
-            # --- Interpret the Closure's body ---
-            body_to_interpret = rator.lambdaNode.E # This is the ST node representing the function body
-            return body_to_interpret.interpret(newEnv) # This is the call that should trigger ArrowNode.interpret
-
-        elif isinstance(rator, BuiltInFunction):
-            result = rator.execute(rand)
+            if self.tail:
+                # Let the nearest enclosing non-tail application run the call,
+                # so this Python frame and the caller's environment are released.
+                return TailCall(rator, rand)
+            result = applyClosure(rator, rand, env)
+            while type(result) is TailCall:
+                result = applyClosure(result.closure, result.rand, env)
             return result
-        elif isinstance(rator, Tuple) and isinstance(rand, int):
-            if len(rator)>=rand and rand>0:
-                result = rator[rand-1]
-                return result
-            else:
-                raise IndexError(f"Index {rand} out of range for tuple {rator} with length {len(rator)}.")
         else:
-            raise TypeError(f"Attempted to apply a non-function/non-tuple value: {rator} of type {type(rator)}")
-            
+            return applyNonClosure(rator, rand)
 
-    
     def __str__(self):
         return f"Gamma({self.N}, {self.E})"
 
-    def print(self, indent=0):
-        print(f'{self.indentationSymbol * indent}{self.value}')
-        self.N.print(indent + 1)
-        self.E.print(indent + 1)    
+
+class TailCall:
+    """A closure application in tail position, returned to the trampoline in GammaNode.interpret."""
+    def __init__(self, closure, rand):
+        self.closure = closure
+        self.rand = rand
+
+
+def markTailCalls(body):
+    """Mark the applications in tail position of a lambda body, looking through '->' branches."""
+    pending = [body]
+    while pending:
+        node = pending.pop()
+        kind = node.kind
+        if kind == GAMMA_NODE:
+            node.tail = True
+        elif kind == ARROW_NODE:
+            # Branches not standardized yet are marked when they are
+            node.tail = True
+            if node.pendingIfCase is None:
+                pending.append(node.ifCase)
+            if node.pendingElseCase is None:
+                pending.append(node.elseCase)
+
+
+def nameLambdas(node, name):
+    """Name the lambdas of a definition after its identifier: 'F X Y = E' names both lambdas F."""
+    if name.kind == IDENTIFIER_NODE:
+        while node is not None and node.kind == ST_LAMBDA_NODE and node.name is None:
+            node.name = name.value
+            node = node.E if node.pendingE is None else None  # a body not standardized yet is named when it is
+
+
+def applyClosure(closure, rand, caller):
+    """Evaluate the body of a closure with its bound variable(s) set to rand, called from the environment caller."""
+    newEnv = closure.env.child(caller)
+    closure.lambdaNode.bind(newEnv, rand)
+    return closure.lambdaNode.E.interpret(newEnv)
+
+
+def applyNonClosure(rator, rand):
+    """Apply a built-in function or select from a tuple; closures are applied by the caller."""
+    if isinstance(rator, BuiltInFunction):
+        return rator.execute(rand)
+    elif isinstance(rator, Tuple) and isinstance(rand, int):
+        if len(rator)>=rand and rand>0:
+            return rator[rand-1]
+        else:
+            raise IndexError(f"Index {rand} out of range for tuple {rator} with length {len(rator)}.")
+    else:
+        raise TypeError(f"Attempted to apply a non-function/non-tuple value: {rator} of type {type(rator)}")
+
+
+ESCAPES = {'n': '\n', 't': '\t', '\\': '\\', "'": "'"}
+
+
+def decodeString(literal):
+    """Runtime value of a string literal: the text between the quotes with escapes resolved."""
+    text = literal[1:-1] if len(literal) >= 2 and literal[0] == literal[-1] and literal[0] in '\'"' else literal
+    if '\\' not in text:
+        return text
+    chars = []
+    escape = False
+    for char in text:
+        if escape:
+            chars.append(ESCAPES.get(char, '\\' + char))
+            escape = False
+        elif char == '\\':
+            escape = True
+        else:
+            chars.append(char)
+    return ''.join(chars)
 
 
 class RnNode(Node):
+    __slots__ = ('type', 'value', 'literal', 'address')
+    kind = RN_NODE
+
     def __init__(self, randType, rand):
-        super().__init__(randType, rand)
+        self.standardized = True
+        self.type = randType
+        self.value = rand
+        # Literals are decoded once here, so evaluating one is a single attribute read
+        if randType == 'integer':
+            self.literal = int(rand)
+        elif randType == 'string':
+            self.literal = decodeString(rand)
+        elif randType == 'nil':
+            self.literal = NIL
+        elif randType == 'dummy':
+            self.literal = DUMMY
+        elif randType == 'true':
+            self.literal = TRUE
+        elif randType == 'false':
+            self.literal = FALSE
+        elif randType == 'identifier':
+            self.value = sys.intern(rand)
+            self.literal = None
+        else:
+            raise ValueError(f"Unknown RnNode type: {randType}")
     
-    def standardize(self):
+    def transform(self):
         return self # Return the node itself, as Rn is already standardized
     
     def __str__(self):
         return f"Rn({self.type}, {self.value})"
     
     def interpret(self, env):
-        if self.type == 'integer':
-            return int(self.value)
-        elif self.type == 'string':
-            return str(self.value.strip('"\''))  # Remove quotes from string value
-        elif self.type == 'identifier':
+        if self.type == 'identifier':
             return env.lookup(self.value)
-        elif self.type == 'nil':
-            return Nil()  # Return an instance of Nil
-        elif self.type == 'dummy':
-            return 'dummy'
-        elif self.type == 'true':
-            return TruthValue(True)
-        elif self.type == 'false':
-            return TruthValue(False)
-        else:
-            raise ValueError(f"Unknown RnNode type encountered during interpretation: {self.type}")
+        return self.literal
     
-    def print(self, indent=0):
-        tag = ""
+    def label(self):
         match self.type:
             case 'integer':
-                tag = f"<INT:{self.value}>"
+                return f"<INT:{self.value}>"
             case 'string':
-                tag = f"<STR:{self.value}>"
+                return f"<STR:{self.value}>"
             case 'identifier':
-                tag = f"<ID:{self.value}>"
+                return f"<ID:{self.value}>"
             case _:
-                tag = f"<{self.value}>"
-        print(f'{self.indentationSymbol * indent}{tag}')
+                return f"<{self.value}>"
 
     
 class LetNode(Node):
+    __slots__ = ('D', 'E')
+    type = 'E'
+    value = 'let'
+    kind = LET_NODE
+    fields = ('D', 'E')
+    deferredFields = ('E',)
+
     def __init__(self, Def, Exp):
-        super().__init__('E', 'let')
+        super().__init__()
         self.D = Def
         self.E = Exp
     
-    def standardize(self):
+    def transform(self):
         stD = self.D.standardize()
-        stE = self.E.standardize()
+        if isinstance(stD, AssignmentNode):
+            # The body is standardized when the let is evaluated
+            return GammaNode(STLambdaNode.deferred(stD.v1, self.E), stD.e)
+        else:
+            raise ValueError("Invalid definition in LetNode")
+
+    @staticmethod
+    def combine(stD, stE):
+        """Standardized let from an already standardized definition and body."""
         if isinstance(stD, AssignmentNode):
             lambdaNode = STLambdaNode(stD.v1, stE)
             return GammaNode(lambdaNode, stD.e)
@@ -227,21 +474,20 @@ class LetNode(Node):
     
     def interpret(self, env):
         return self.standardize().interpret(env)  # Interpret the standardized let node in the current environment
-    
-    def print(self, indent=0):
-        print(f'{self.indentationSymbol * indent}{self.value}')
-        self.D.print(indent + 1)
-        self.E.print(indent + 1)
 
 
 class CommaNode(Node):
+    __slots__ = ('params',)
+    type = 'comma'
+    value = ','
+    kind = COMMA_NODE
+    fields = ('params',)
+
     def __init__(self, params):
-        super().__init__('comma', ',')
+        super().__init__()
         self.params = params
     
-    def standardize(self):
-        stParams = [param.standardize() for param in self.params]
-        return CommaNode(stParams)  # Return a new CommaNode with standardized parameters
+    transform = Node.standardizeFields
     
     def __str__(self):
         return f"Comma({self.params})"
@@ -249,23 +495,24 @@ class CommaNode(Node):
     def interpret(self, env):
         elements = [param.interpret(env) for param in self.params]
         return tuple(elements)  # Interpret each parameter and return a tuple of results
-    
-    def print(self, indent=0):
-        print(f'{self.indentationSymbol * indent}{self.value}')
-        for param in self.params:
-            param.print(indent + 1)
 
 
 class AssignmentNode(Node):
+    __slots__ = ('v1', 'e')
+    type = 'assignment'
+    value = '='
+    kind = ASSIGNMENT_NODE
+    fields = ('v1', 'e')
+
     def __init__(self, v1, Exp):
-        super().__init__('assignment', '=')
+        super().__init__()
         self.v1 = v1
         self.e = Exp
     
-    def standardize(self):
-        stV1 = self.v1.standardize()
-        stE = self.e.standardize()
-        return AssignmentNode(stV1, stE)  # Return a new AssignmentNode with standardized components
+    def transform(self):
+        st = self.standardizeFields()
+        nameLambdas(st.e, st.v1)
+        return st
     
     def __str__(self):
         return f"Assignment({self.v1}, {self.e})"
@@ -294,26 +541,28 @@ class AssignmentNode(Node):
             else:
                 raise TypeError(f"Invalid left-hand side for assignment: {type(self.v1).__name__}")
 
-    
-    def print(self, indent=0):
-        print(f'{self.indentationSymbol * indent}{self.value}')
-        self.v1.print(indent + 1)
-        self.e.print(indent + 1)
-
 
 class FcnFormNode(Node):
+    __slots__ = ('name', 'Vbs', 'E')
+    type = 'function_form'
+    value = 'function_form'
+    kind = FCN_FORM_NODE
+    fields = ('name', 'Vbs', 'E')
+    deferredFields = ('E',)
+
     def __init__(self, name, Vbs, Exp):
-        super().__init__('function_form', 'function_form')
+        super().__init__()
         self.name = name
         self.Vbs = Vbs
         self.E = Exp
     
-    def standardize(self):
+    def transform(self):
         stVbs = [vb.standardize() for vb in self.Vbs]
-        stE = self.E.standardize()
-        for i in range(len(stVbs)-1, -1, -1):
+        stE = STLambdaNode.deferred(stVbs[-1], self.E)  # the body is standardized when first applied
+        for i in range(len(stVbs)-2, -1, -1):
             node = STLambdaNode(stVbs[i], stE)
             stE = node
+        nameLambdas(stE, self.name)
         return AssignmentNode(self.name, stE)  # Return an AssignmentNode with the function name and standardized expression
     
     def __str__(self):
@@ -321,21 +570,20 @@ class FcnFormNode(Node):
     
     def interpret(self, env):
         return self.standardize().interpret(env)  # Interpret the standardized function form in the current environment
-    
-    def print(self, indent=0):
-        print(f'{self.indentationSymbol * indent}{self.value}')
-        self.name.print(indent + 1)
-        for vb in self.Vbs:
-            vb.print(indent + 1)
-        self.E.print(indent + 1)
 
 
 class RecNode(Node):
+    __slots__ = ('Db',)
+    type = 'rec'
+    value = 'rec'
+    kind = REC_NODE
+    fields = ('Db',)
+
     def __init__(self, Db):
-        super().__init__('rec', 'rec')
+        super().__init__()
         self.Db = Db
     
-    def standardize(self):
+    def transform(self):
         stDb = self.Db.standardize()
         if isinstance(stDb, AssignmentNode):
             if not isinstance(stDb.e, STLambdaNode):
@@ -352,18 +600,20 @@ class RecNode(Node):
     
     def interpret(self, env):
         return self.standardize().interpret(env)  # Interpret the standardized recursive definition in the current environment
-    
-    def print(self, indent=0):
-        print(f'{self.indentationSymbol * indent}{self.value}')
-        self.Db.print(indent + 1)
 
 
 class AndNode(Node):
+    __slots__ = ('Drs',)
+    type = 'and'
+    value = 'and'
+    kind = AND_NODE
+    fields = ('Drs',)
+
     def __init__(self, Drs):
-        super().__init__('and', 'and')
+        super().__init__()
         self.Drs = Drs
 
-    def standardize(self):
+    def transform(self):
         stDrs = [dr.standardize() for dr in self.Drs]
         params = []
         elements = []
@@ -383,20 +633,21 @@ class AndNode(Node):
     
     def interpret(self, env):
         return self.standardize().interpret(env)  # Interpret the standardized and node in the current environment
-    
-    def print(self, indent=0):
-        print(f'{self.indentationSymbol * indent}{self.value}')
-        for dr in self.Drs:
-            dr.print(indent + 1)
 
 
 class WithinNode(Node):
+    __slots__ = ('Da', 'D')
+    type = 'within'
+    value = 'within'
+    kind = WITHIN_NODE
+    fields = ('Da', 'D')
+
     def __init__(self, Da, D):
-        super().__init__('within', 'within')
+        super().__init__()
         self.Da = Da
         self.D = D
 
-    def standardize(self):
+    def transform(self):
         stDa = self.Da.standardize()
         stD = self.D.standardize()
         if not isinstance(stDa, AssignmentNode) or not isinstance(stD, AssignmentNode):
@@ -412,21 +663,30 @@ class WithinNode(Node):
     def interpret(self, env):
         return self.standardize().interpret(env)  # Interpret the standardized within node in the current environment
 
-    def print(self, indent=0):
-        print(f'{self.indentationSymbol * indent}{self.value}')
-        self.Da.print(indent + 1)
-        self.D.print(indent + 1)   
-
 
 class WhereNode(Node):
+    __slots__ = ('T', 'Dr')
+    type = 'Ew'
+    value = 'where'
+    kind = WHERE_NODE
+    fields = ('T', 'Dr')
+    deferredFields = ('T',)
+
     def __init__(self, T, Dr):
-        super().__init__('Ew', 'where')
+        super().__init__()
         self.T = T
         self.Dr = Dr
     
-    def standardize(self):
-        stT = self.T.standardize()
+    def transform(self):
         stDr = self.Dr.standardize()
+        if not isinstance(stDr, AssignmentNode):
+            raise ValueError("Invalid Node in WhereNode. Expected an AssignmentNode.")
+        # The body is standardized when the where is evaluated
+        return GammaNode(STLambdaNode.deferred(stDr.v1, self.T), stDr.e)
+
+    @staticmethod
+    def combine(stT, stDr):
+        """Standardized where from an already standardized body and definition."""
         if not isinstance(stDr, AssignmentNode):
             raise ValueError("Invalid Node in WhereNode. Expected an AssignmentNode.")
         
@@ -438,21 +698,20 @@ class WhereNode(Node):
     
     def interpret(self, env):   
         return self.standardize().interpret(env)
-    
-    def print(self, indent=0):
-        print(f'{self.indentationSymbol * indent}{self.value}')
-        self.T.print(indent + 1)
-        self.Dr.print(indent + 1)
 
 
 class TauNode(Node):
+    __slots__ = ('elements',)
+    type = 'tau'
+    value = 'tau'
+    kind = TAU_NODE
+    fields = ('elements',)
+
     def __init__(self, elements):
-        super().__init__('tau', 'tau')
+        super().__init__()
         self.elements = elements
 
-    def standardize(self):
-        stElements = [element.standardize() for element in self.elements]
-        return TauNode(stElements)  # Return a new TauNode with standardized elements
+    transform = Node.standardizeFields
     
     def __str__(self):
         return f"Tau({self.elements})"
@@ -462,24 +721,26 @@ class TauNode(Node):
         for i in range(len(self.elements)-1, -1, -1):
             ipElement = self.elements[i].interpret(env)
             interpreted_elements.insert(0, ipElement)  # Insert at the beginning to maintain order
-        return Tuple(interpreted_elements)
-    
-    def print(self, indent=0):
-        print(f'{self.indentationSymbol * indent}{self.value}')
-        for element in self.elements:
-            element.print(indent + 1)
+        result = Tuple(interpreted_elements)
+        limits = env.limits
+        if limits is not None and limits.countsTuples:
+            limits.allocateTuple(result)
+        return result
 
 
 class AugNode(Node):
+    __slots__ = ('Ta', 'Tc')
+    type = 'aug'
+    value = 'aug'
+    kind = AUG_NODE
+    fields = ('Ta', 'Tc')
+
     def __init__(self, Ta, Tc):
-        super().__init__('aug', 'aug')
+        super().__init__()
         self.Ta = Ta
         self.Tc = Tc
     
-    def standardize(self):
-        stTa = self.Ta.standardize()
-        stTc = self.Tc.standardize()
-        return AugNode(stTa, stTc)  # Return a new AugNode with standardized Ta and Tc
+    transform = Node.standardizeFields
 
     def __str__(self):
         return f"Aug({self.Ta}, {self.Tc})"
@@ -487,37 +748,73 @@ class AugNode(Node):
     def interpret(self, env):
         ipTa = self.Ta.interpret(env)
         ipTc = self.Tc.interpret(env)
-        if isinstance(ipTa, Tuple) and isinstance(ipTc, (int, str, TruthValue, Nil, Tuple, Closure)):
+        result = self.apply(ipTa, ipTc)
+        limits = env.limits
+        if limits is not None and limits.countsTuples:
+            limits.allocateTuple(result)
+        return result
+
+    def apply(self, ipTa, ipTc):
+        if isinstance(ipTa, Tuple) and isinstance(ipTc, (int, str, TruthValue, Nil, Dummy, Tuple, Closure)):
             return ipTa.add(ipTc)
-        elif isinstance(ipTa, (int, str, TruthValue)) and isinstance(ipTc, Tuple):
+        elif isinstance(ipTa, (int, str, TruthValue, Dummy)) and isinstance(ipTc, Tuple):
             return Tuple([ipTa]).add(ipTc)
         elif isinstance(ipTa, Nil):
-            if isinstance(ipTc, (int, str, TruthValue, Nil, Tuple, Closure)):
+            if isinstance(ipTc, (int, str, TruthValue, Nil, Dummy, Tuple, Closure)):
                 return Tuple([ipTc])
             else:
                 raise TypeError("aug expects at least one operand to be a tuple or nil.")
         
         else:
             raise TypeError("aug expects left opernad to be a tuple or nil and right opernad to be a String/ Integer/ Truthvalue/ Function/ nil/ dummy/.")
- 
-    def print(self, indent=0):
-        print(f'{self.indentationSymbol * indent}{self.value}')
-        self.Ta.print(indent + 1)
-        self.Tc.print(indent + 1)
 
 
 class ArrowNode(Node):
+    # pendingIfCase, pendingElseCase: unstandardized branches of an arrow made by deferred(), until they are first read
+    __slots__ = ('condition', 'ifCase', 'elseCase', 'pendingIfCase', 'pendingElseCase', 'tail')
+    type = 'arrow'
+    value = '->'
+    kind = ARROW_NODE
+    fields = ('condition', 'ifCase', 'elseCase')
+    deferredFields = ('ifCase', 'elseCase')
+
     def __init__(self, condition, ifCase, elseCase):
-        super().__init__('arrow', '->')
+        super().__init__()
         self.condition = condition
         self.ifCase = ifCase
         self.elseCase = elseCase
-
-    def standardize(self):
-        stCondition = self.condition.standardize()
-        stIfCase = self.ifCase.standardize()
-        stElseCase = self.elseCase.standardize()
-        return ArrowNode(stCondition, stIfCase, stElseCase)  # Return a new ArrowNode with standardized components
+        self.pendingIfCase = None
+        self.pendingElseCase = None
+        self.tail = False
+
+    @classmethod
+    def deferred(cls, condition, ifCase, elseCase):
+        """Arrow whose unstandardized branches are standardized when they are first read."""
+        node = cls.__new__(cls)
+        node.standardized = True
+        node.condition = condition
+        node.pendingIfCase = ifCase
+        node.pendingElseCase = elseCase
+        node.tail = False
+        return node
+
+    def transform(self):
+        # A branch that is never taken is never standardized
+        return ArrowNode.deferred(self.condition.standardize(), self.ifCase, self.elseCase)
+
+    def __getattr__(self, name):
+        # Only reached for slots that are not set, such as a branch of a deferred arrow
+        if name == 'ifCase' and self.pendingIfCase is not None:
+            branch = self.ifCase = self.pendingIfCase.standardize()
+            self.pendingIfCase = None
+        elif name == 'elseCase' and self.pendingElseCase is not None:
+            branch = self.elseCase = self.pendingElseCase.standardize()
+            self.pendingElseCase = None
+        else:
+            raise AttributeError(name)
+        if self.tail:
+            markTailCalls(branch)
+        return branch
     
     def __str__(self):
         return f"Arrow({self.condition}, {self.ifCase}, {self.elseCase})"
@@ -525,54 +822,55 @@ class ArrowNode(Node):
     def interpret(self, env):
         condition_result = self.condition.interpret(env)
 
-        if condition_result.value is True:
-            result = self.ifCase.interpret(env)
-            return result
+        if condition_result is TRUE:
+            return self.ifCase.interpret(env)
+        elif condition_result is FALSE:
+            return self.elseCase.interpret(env)
         else:
-            result = self.elseCase.interpret(env)
-            return result
-    
-    def print(self, indent=0):
-        print(f'{self.indentationSymbol * indent}{self.value}')
-        self.condition.print(indent + 1)
-        self.ifCase.print(indent + 1)
-        self.elseCase.print(indent + 1)
+            raise TypeError(f"Expected a truth value for the condition of '->', got {type(condition_result).__name__}")
 
 
 class NotNode(Node):
+    __slots__ = ('Bp',)
+    type = 'not'
+    value = 'not'
+    kind = NOT_NODE
+    fields = ('Bp',)
+
     def __init__(self, Bp):
-        super().__init__('not', 'not')
+        super().__init__()
         self.Bp = Bp
     
-    def standardize(self):
-        stBp = self.Bp.standardize()
-        return NotNode(stBp)  # Return a new NotNode with standardized Bp
+    transform = Node.standardizeFields
 
     def __str__(self):
         return f"Not({self.Bp})"
     
     def interpret(self, env):
-        ipBp = self.Bp.interpret(env)
-        if isinstance(ipBp, TruthValue):
-            return TruthValue(not ipBp)
+        return self.apply(self.Bp.interpret(env))
+
+    def apply(self, ipBp):
+        if ipBp is TRUE:
+            return FALSE
+        elif ipBp is FALSE:
+            return TRUE
         else:
             raise TypeError(f"Expected a boolean value for NotNode, got {type(ipBp).__name__}")
     
-    def print(self, indent=0):
-        print(f'{self.indentationSymbol * indent}{self.value}')
-        self.Bp.print(indent + 1)
-    
 
 class BAndOrNode(Node):
+    __slots__ = ('value', 'B1', 'B2')
+    type = 'Boolean'
+    kind = BOOLEAN_NODE
+    fields = ('B1', 'B2')
+
     def __init__(self, B1, B2, operator):
-        super().__init__('Boolean', operator)
+        super().__init__()
+        self.value = operator
         self.B1 = B1
         self.B2 = B2
     
-    def standardize(self):
-        stB1 = self.B1.standardize()
-        stB2 = self.B2.standardize()
-        return BAndOrNode(stB1, stB2, self.value)  # Return a new BAndOrNode with standardized B1 and B2
+    transform = Node.standardizeFields
     
     def __str__(self):
         return f"{self.value}({self.B1}, {self.B2})"
@@ -580,33 +878,31 @@ class BAndOrNode(Node):
     def interpret(self, env):
         if self.value == '&': # RPAL 'and'
             left_val = self.B1.interpret(env)
-            if not left_val:
+            if left_val is FALSE:
                 return left_val # Short-circuit
             return self.B2.interpret(env)
         elif self.value == 'or':
             left_val = self.B1.interpret(env)
-            if left_val:
+            if left_val is TRUE:
                 return left_val # Short-circuit
             return self.B2.interpret(env)
         else:
             raise ValueError(f"Unknown boolean operator: {self.value}")
-    
-    def print(self, indent=0):
-        print(f'{self.indentationSymbol * indent}{self.value}')
-        self.B1.print(indent + 1)
-        self.B2.print(indent + 1)
 
 
 class ConditionNode(Node):
+    __slots__ = ('value', 'a1', 'a2')
+    type = 'condition'
+    kind = CONDITION_NODE
+    fields = ('a1', 'a2')
+
     def __init__(self, a1, a2, condition):
-        super().__init__('condition', condition)
+        super().__init__()
+        self.value = condition
         self.a1 = a1
         self.a2 = a2
 
-    def standardize(self):
-        stA1 = self.a1.standardize()
-        stA2 = self.a2.standardize()
-        return ConditionNode(stA1, stA2, self.value)
+    transform = Node.standardizeFields
     
     def __str__(self):
         return f"{self.value}({self.a1}, {self.a2})"
@@ -614,41 +910,42 @@ class ConditionNode(Node):
     def interpret(self, env):
         ipA1 = self.a1.interpret(env)
         ipA2 = self.a2.interpret(env)
+        return self.apply(ipA1, ipA2)
+
+    def apply(self, ipA1, ipA2):
         if isinstance(ipA1, (int, str)) and isinstance(ipA2, (int, str)):
-            if self.value == 'eq': return TruthValue(ipA1 == ipA2)
-            if self.value == 'ne': return TruthValue(ipA1 != ipA2)
-            if self.value == 'gr': return TruthValue(ipA1 > ipA2)
-            if self.value == 'ge': return TruthValue(ipA1 >= ipA2)
-            if self.value == 'ls': return TruthValue(ipA1 < ipA2)
-            if self.value == 'le': return TruthValue(ipA1 <= ipA2)
+            if self.value == 'eq': return TRUE if ipA1 == ipA2 else FALSE
+            if self.value == 'ne': return TRUE if ipA1 != ipA2 else FALSE
+            if self.value == 'gr': return TRUE if ipA1 > ipA2 else FALSE
+            if self.value == 'ge': return TRUE if ipA1 >= ipA2 else FALSE
+            if self.value == 'ls': return TRUE if ipA1 < ipA2 else FALSE
+            if self.value == 'le': return TRUE if ipA1 <= ipA2 else FALSE
             raise ValueError(f"Unknown comparison operator: {self.value}")
         elif isinstance(ipA1, TruthValue) and isinstance(ipA2, TruthValue):
-            if self.value == 'eq': return TruthValue(ipA1.value == ipA2.value)
-            if self.value == 'ne': return TruthValue(ipA1.value != ipA2.value)
+            if self.value == 'eq': return TRUE if ipA1 is ipA2 else FALSE
+            if self.value == 'ne': return FALSE if ipA1 is ipA2 else TRUE
             raise ValueError(f"Unknown comparison operator for TruthValue: {self.value}")
-        elif isinstance(ipA1, Nil) and isinstance(ipA2, Nil):
-            if self.value == 'eq': return TruthValue(True)
-            if self.value == 'ne': return TruthValue(False)
-            raise ValueError(f"Unknown comparison operator for Nil: {self.value}")
+        elif (ipA1 is NIL and ipA2 is NIL) or (ipA1 is DUMMY and ipA2 is DUMMY):
+            if self.value == 'eq': return TRUE
+            if self.value == 'ne': return FALSE
+            raise ValueError(f"Unknown comparison operator for {ipA1}: {self.value}")
         else:
             raise TypeError(f"Expected compareble values for ConditionNode, got {type(ipA1).__name__} and {type(ipA2).__name__}")
-    
-    def print(self, indent=0):
-        print(f'{self.indentationSymbol * indent}{self.value}')
-        self.a1.print(indent + 1)
-        self.a2.print(indent + 1)
 
 
 class ArithmeticNode(Node):
+    __slots__ = ('value', 'a1', 'a2')
+    type = 'arithmetic'
+    kind = ARITHMETIC_NODE
+    fields = ('a1', 'a2')
+
     def __init__(self, operator, a1, a2):
-        super().__init__('arithmetic', operator)
+        super().__init__()
+        self.value = operator
         self.a1 = a1
         self.a2 = a2
 
-    def standardize(self):
-        stA1 = self.a1.standardize()
-        stA2 = self.a2.standardize()
-        return ArithmeticNode(self.value, stA1, stA2)  # Return a new ArithmeticNode with standardized a1 and a2
+    transform = Node.standardizeFields
         
     def __str__(self):
         return f"{self.value}({self.a1}, {self.a2})"
@@ -656,7 +953,9 @@ class ArithmeticNode(Node):
     def interpret(self, env):
         ipA1 = self.a1.interpret(env)
         ipA2 = self.a2.interpret(env)
-        
+        return self.apply(ipA1, ipA2)
+
+    def apply(self, ipA1, ipA2):
         if isinstance(ipA1, int) and isinstance(ipA2, int):
             if self.value == '+':
                 return ipA1 + ipA2
@@ -674,45 +973,48 @@ class ArithmeticNode(Node):
                 raise ValueError(f"Unknown arithmetic operator: {self.value}")
         else:
             raise TypeError(f"Expected numeric values for ArithmeticNode, got {type(ipA1).__name__} and {type(ipA2).__name__}")
-    
-    def print(self, indent=0):
-        print(f'{self.indentationSymbol * indent}{self.value}')
-        self.a1.print(indent + 1)
-        self.a2.print(indent + 1)
 
 
 class NegNode(Node):
+    __slots__ = ('a',)
+    type = 'neg'
+    value = 'neg'
+    kind = NEG_NODE
+    fields = ('a',)
+
     def __init__(self, a):
-        super().__init__('neg', 'neg')
+        super().__init__()
         self.a = a
     
-    def standardize(self):
-        stA = self.a.standardize()
-        return NegNode(stA)  # Return a new NegNode with standardized a
+    transform = Node.standardizeFields
     
     def __str__(self):
         return f"Neg({self.a})"
     
     def interpret(self, env):
-        ipA = self.a.interpret(env)
+        return self.apply(self.a.interpret(env))
+
+    def apply(self, ipA):
         if isinstance(ipA, int):
             return -ipA
         else:
             raise TypeError(f"Expected an integer value for NegNode, got {type(ipA).__name__}")
-    
-    def print(self, indent=0):
-        print(f'{self.indentationSymbol * indent}{self.value}')
-        self.a.print(indent + 1)
 
 
 class AtNode(Node):
+    __slots__ = ('a1', 'Id', 'a2')
+    type = 'at'
+    value = '@'
+    kind = AT_NODE
+    fields = ('a1', 'Id', 'a2')
+
     def __init__(self, a1, Id, a2):
-        super().__init__('at', '@')
+        super().__init__()
         self.a1 = a1
         self.Id = IdentifierNode(Id)
         self.a2 = a2
     
-    def standardize(self):
+    def transform(self):
         stA1 = self.a1.standardize()
         stA2 = self.a2.standardize()
         tempGamma = GammaNode(self.Id, stA1)
@@ -722,10 +1024,4 @@ class AtNode(Node):
         return f"@({self.a1}, {self.Id}, {self.a2})"
     
     def interpret(self, env):
-        self.standardize().interpret(env)
-    
-    def print(self, indent=0):
-        print(f'{self.indentationSymbol * indent}{self.value}')
-        self.a1.print(indent + 1)
-        self.Id.print(indent + 1)
-        self.a2.print(indent + 1)
+        return self.standardize().interpret(env)
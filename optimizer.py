@@ -0,0 +1,269 @@
+from data_types import TruthValue, TRUE, FALSE
+from nodes import (STLambdaNode, IdentifierNode, GammaNode, RnNode, TauNode, AugNode, CommaNode,
+ArrowNode, NotNode, BAndOrNode, ConditionNode, ArithmeticNode, NegNode)
+
+# Integers with more bits than this are left to be computed at run time
+MAX_FOLDED_BITS = 4096
+
+NO_CONSTANTS = {}  # never changed: folding copies a mapping of constants before adding to it
+
+# Steps of ConstantFolder.fold, after the children of a node have been folded
+GAMMA_RAND, GAMMA, INLINED, ARROW_CONDITION, TAU, OPERATOR = range(6)
+
+
+def optimize(st):
+    """
+    Fold constants in a standardized tree. Returns the folded tree and the
+    ConstantFolder, whose folded attribute counts the nodes folded so far:
+    the bodies of lambdas and the branches of '->' are folded when they
+    are first standardized, as standardize() defers them. The tree is not
+    changed; the folded tree shares the nodes that folding leaves alone.
+    """
+    folder = ConstantFolder()
+    return folder.fold(st), folder
+
+
+def isLiteral(node):
+    return type(node) is RnNode and node.type != 'identifier'
+
+
+def isPure(node):
+    """Whether evaluating node can neither fail nor have an effect."""
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        if type(node) is TauNode:
+            pending.extend(node.elements)
+        elif not isLiteral(node) and type(node) is not STLambdaNode:
+            return False
+    return True
+
+
+def literal(value):
+    """RnNode evaluating to an integer or truth value."""
+    if type(value) is TruthValue:
+        return RnNode('true', 'true') if value is TRUE else RnNode('false', 'false')
+    return RnNode('integer', str(value))
+
+
+def copyNode(node, **fields):
+    """Copy of a node that has no deferred children, with fields replaced."""
+    copy = object.__new__(type(node))
+    for slot in node.slotNames:
+        setattr(copy, slot, getattr(node, slot))
+    for name, value in fields.items():
+        setattr(copy, name, value)
+    return copy
+
+
+def withTailCalls(node, tail):
+    """
+    node in a position that is (or is not) the tail of a lambda body. Only
+    the node itself can change: the branches of a folded '->' are deferred,
+    and get the flag of their arrow when they are standardized.
+    """
+    if type(node) is GammaNode and node.tail != tail:
+        return copyNode(node, tail=tail)
+    if type(node) is ArrowNode and node.tail != tail:
+        copy = ArrowNode.deferred(node.condition, node.pendingIfCase.inTail(tail), node.pendingElseCase.inTail(tail))
+        copy.tail = tail
+        return copy
+    return node
+
+
+def constantBindings(lambdaNode, rand):
+    """Names bound by applying lambdaNode to rand, if rand gives every one of them a literal."""
+    Vb = lambdaNode.Vb
+    if type(Vb) is IdentifierNode and Vb.value != '()' and isLiteral(rand):
+        return {Vb.value: rand}
+    if (type(Vb) is CommaNode and type(rand) is TauNode and len(rand.elements) == len(Vb.params)
+            and all(type(param) is IdentifierNode for param in Vb.params)
+            and all(isLiteral(element) for element in rand.elements)):
+        return {param.value: element for param, element in zip(Vb.params, rand.elements)}
+    return None
+
+
+class DeferredFolding:
+    """
+    The body of a lambda or a branch of '->' in a folded tree, until it is
+    first read: standardizing it standardizes the original and folds it
+    with the literals bound around it.
+    """
+    __slots__ = ('folder', 'tree', 'constants', 'orderBound', 'names', 'tail')
+
+    def __init__(self, folder, tree, constants, orderBound, names, tail):
+        self.folder = folder
+        self.tree = tree
+        self.constants = constants
+        self.orderBound = orderBound
+        self.names = names  # bound by the lambda whose body tree is, shadowing constants
+        self.tail = tail
+
+    def inTail(self, tail):
+        return DeferredFolding(self.folder, self.tree, self.constants, self.orderBound, self.names, tail)
+
+    def standardize(self):
+        constants = self.constants
+        if any(name in constants for name in self.names):
+            constants = {name: value for name, value in constants.items() if name not in self.names}
+        orderBound = self.orderBound or 'Order' in self.names
+        body = self.folder.fold(self.tree.standardize(), constants, orderBound)
+        return withTailCalls(body, self.tail)
+
+
+class ConstantFolder:
+    """
+    Folds a standardized tree into a copy, replacing operators applied to
+    literals by their result, '->' with a literal condition by the branch
+    taken, and Order of a literal tuple or indexing into one by the result.
+    Names bound to literals ('let N = 10 in ...') are replaced by the
+    literal, so their uses fold too.
+
+    Nothing that would fail at run time is folded, so errors such as a
+    division by zero are still raised when, and only if, the expression is
+    evaluated.
+    """
+
+    def __init__(self):
+        self.folded = 0
+
+    def fold(self, root, constants=NO_CONSTANTS, orderBound=False):
+        """
+        Folded root, where constants maps names to the literals they are
+        bound to and orderBound tells whether a lambda around root binds
+        Order. The tree is walked with an explicit stack, and the bodies of
+        lambdas and the branches of '->' are left for DeferredFolding.
+        """
+        done = []  # folded subtrees, the last one on top
+        pending = [(None, root)]  # (step, node): a node to fold, or a step to finish once its children are done
+        pop = pending.pop
+        push = pending.append
+        while pending:
+            step, node = pop()
+            kind = type(node)
+            if step is None:
+                if kind is IdentifierNode:
+                    constant = constants.get(node.value)
+                    if constant is not None:
+                        self.folded += 1
+                        node = RnNode(constant.type, constant.value)
+                    done.append(node)
+                elif kind is STLambdaNode:
+                    body = node.E if node.pendingE is None else node.pendingE
+                    names = tuple(name for name in node.parameterNames() if name is not None)
+                    folded = STLambdaNode.deferred(node.Vb, DeferredFolding(self, body, constants, orderBound, names, True))
+                    folded.name = node.name
+                    done.append(folded)
+                elif kind is GammaNode:
+                    push((GAMMA_RAND, node))
+                    push((None, node.E))
+                elif kind is ArrowNode:
+                    push((ARROW_CONDITION, node))
+                    push((None, node.condition))
+                elif kind is TauNode:
+                    push((TAU, node))
+                    for element in reversed(node.elements):
+                        push((None, element))
+                elif kind in (AugNode, BAndOrNode, NotNode, NegNode, ConditionNode, ArithmeticNode):
+                    push((OPERATOR, node))
+                    for name in reversed(node.fields):
+                        push((None, getattr(node, name)))
+                else:
+                    done.append(node)
+            elif step is GAMMA_RAND:
+                if type(node.N) is STLambdaNode:
+                    bindings = constantBindings(node.N, done[-1])
+                    if bindings is not None:
+                        # Fold the body of the 'let' with its names replaced by their literals, dropping the application
+                        done.pop()
+                        push((INLINED, (node, constants)))
+                        constants = {**constants, **bindings}
+                        push((None, node.N.E))
+                        continue
+                push((GAMMA, node))
+                push((None, node.N))
+            elif step is GAMMA:
+                rator = done.pop()
+                rand = done.pop()
+                if rator is not node.N or rand is not node.E:
+                    node = copyNode(node, N=rator, E=rand)
+                done.append(self.foldApplication(node, orderBound))
+            elif step is INLINED:
+                node, constants = node
+                self.folded += 1
+                # The body's tail calls were tail calls of the lambda; now they are in the application's position
+                done.append(withTailCalls(done.pop(), node.tail))
+            elif step is ARROW_CONDITION:
+                condition = done.pop()
+                if isLiteral(condition) and condition.type in ('true', 'false'):
+                    # Only the branch taken is standardized, marked for tail calls as part of the arrow
+                    self.folded += 1
+                    push((None, node.ifCase if condition.type == 'true' else node.elseCase))
+                    continue
+                ifCase = node.ifCase if node.pendingIfCase is None else node.pendingIfCase
+                elseCase = node.elseCase if node.pendingElseCase is None else node.pendingElseCase
+                folded = ArrowNode.deferred(condition,
+                                            DeferredFolding(self, ifCase, constants, orderBound, (), node.tail),
+                                            DeferredFolding(self, elseCase, constants, orderBound, (), node.tail))
+                folded.tail = node.tail
+                done.append(folded)
+            elif step is TAU:
+                count = len(node.elements)
+                elements = done[len(done) - count:]
+                del done[len(done) - count:]
+                if any(a is not b for a, b in zip(elements, node.elements)):
+                    node = copyNode(node, elements=elements)
+                done.append(node)
+            else:
+                operands = done[len(done) - len(node.fields):]
+                del done[len(done) - len(node.fields):]
+                if any(operand is not getattr(node, name) for name, operand in zip(node.fields, operands)):
+                    node = copyNode(node, **dict(zip(node.fields, operands)))
+                done.append(self.foldOperator(node, kind, operands))
+        return done.pop()
+
+    def foldOperator(self, node, kind, operands):
+        if kind is AugNode:
+            return node
+        if kind is BAndOrNode:
+            B1, B2 = operands
+            if not isLiteral(B1):
+                return node
+            # Same short-circuit as BAndOrNode.interpret: B2 is the result unless B1 decides it
+            left = B1.literal
+            self.folded += 1
+            if node.value == '&':
+                return B1 if left is FALSE else B2
+            else:
+                return B1 if left is TRUE else B2
+        if not all(isLiteral(operand) for operand in operands):
+            return node
+        values = [operand.literal for operand in operands]
+        if kind is ArithmeticNode and node.value == '**':
+            base, exponent = values
+            if type(base) is int and type(exponent) is int and exponent * base.bit_length() > MAX_FOLDED_BITS:
+                return node
+        try:
+            value = node.apply(*values)
+        except (TypeError, ValueError, ZeroDivisionError):
+            return node  # raised again at run time, if the expression is evaluated
+        if type(value) is int and value.bit_length() > MAX_FOLDED_BITS:
+            return node
+        if type(value) is not int and type(value) is not TruthValue:
+            return node  # e.g. a negative power, which is not an integer
+        self.folded += 1
+        return literal(value)
+
+    def foldApplication(self, node, orderBound):
+        rator, rand = node.N, node.E
+        if (type(rator) is IdentifierNode and rator.value == 'Order' and not orderBound
+                and type(rand) is TauNode and isPure(rand)):
+            self.folded += 1
+            return literal(len(rand.elements))
+        if type(rator) is TauNode and isLiteral(rand) and rand.type == 'integer':
+            index = int(rand.value)
+            elements = rator.elements
+            if 0 < index <= len(elements) and all(isPure(element) for i, element in enumerate(elements) if i != index - 1):
+                self.folded += 1
+                return withTailCalls(elements[index - 1], node.tail)
+        return node
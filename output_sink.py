@@ -0,0 +1,91 @@
+import contextlib
+import contextvars
+import io
+import sys
+
+DEFAULT_BUFFER_SIZE = 1 << 16  # characters held before they are written to the target
+
+_currentSink = contextvars.ContextVar('rpal_output_sink', default=None)
+
+
+class OutputSink:
+    """
+    Buffered destination of what a program prints: any object with a write
+    method, such as a StringIO, an open file or a pipe. Writes are joined and
+    passed on when bufferSize characters have accumulated and when the sink
+    is flushed.
+    """
+
+    def __init__(self, target, bufferSize=DEFAULT_BUFFER_SIZE):
+        self.target = target
+        self.bufferSize = bufferSize
+        self.parts = []
+        self.size = 0
+
+    def write(self, text):
+        self.parts.append(text)
+        self.size += len(text)
+        if self.size >= self.bufferSize:
+            self.drain()
+
+    def drain(self):
+        """Pass the buffered text on to the target."""
+        if self.parts:
+            self.target.write(''.join(self.parts))
+            self.parts = []
+            self.size = 0
+
+    def flush(self):
+        """Pass the buffered text on and flush the target, if it can be flushed."""
+        self.drain()
+        flush = getattr(self.target, 'flush', None)
+        if flush is not None:
+            flush()
+
+    def getvalue(self):
+        """Everything written so far, for sinks writing to a StringIO."""
+        self.drain()
+        return self.target.getvalue()
+
+
+def currentSink():
+    """The sink Print writes to in this context, or None to write straight to sys.stdout."""
+    return _currentSink.get()
+
+
+def write(text):
+    sink = _currentSink.get()
+    if sink is None:
+        sys.stdout.write(text)
+    else:
+        sink.write(text)
+
+
+@contextlib.contextmanager
+def outputTo(target, bufferSize=DEFAULT_BUFFER_SIZE):
+    """
+    Send what programs print in this context (thread or asyncio task) to
+    target. The sink is flushed when the block ends, whether or not the
+    program failed.
+
+        with outputTo(open('out.txt', 'w')):
+            evaluate(st, flags)
+    """
+    sink = OutputSink(target, bufferSize)
+    token = _currentSink.set(sink)
+    try:
+        yield sink
+    finally:
+        _currentSink.reset(token)
+        sink.flush()
+
+
+def capture(bufferSize=DEFAULT_BUFFER_SIZE):
+    """
+    Collect what programs print in this context in memory.
+
+        with capture() as output:
+            evaluate(st, flags)
+        output.getvalue()
+    """
+    return outputTo(io.StringIO(), bufferSize)
@@ -1,9 +1,14 @@
+from collections import deque
+
 from Lexer import Token
 from nodes import (LetNode, LambdaNode, RnNode, FcnFormNode, RecNode,
 GammaNode, CommaNode, AssignmentNode, AndNode, WithinNode, WhereNode,
 TauNode, AugNode, ArrowNode, NotNode, BAndOrNode, ConditionNode, ArithmeticNode,
 NegNode, AtNode, IdentifierNode,)
 
+# Token types that can start an Rn; a '(' punction can start one as well
+RN_FIRST = {'identifier', 'integer', 'string', 'true', 'false', 'nil', 'dummy'}
+
 
 class Parser:
     def __init__(self,tokens):
@@ -28,6 +33,14 @@ class Parser:
         else:
             return None
 
+    def startsRn(self, token):
+        """True if token is in FIRST(Rn), i.e. can begin another operand of R."""
+        return token is not None and (token.type in RN_FIRST or token.value == '(' and token.type == 'punction')
+
+    def startsVb(self, token):
+        """True if token is in FIRST(Vb): an identifier or '('."""
+        return token is not None and (token.type == 'identifier' or token.value == '(' and token.type == 'punction')
+
     def expect(self, expected):
         token = self.match(expected)
         if token is None:
@@ -52,17 +65,12 @@ class Parser:
 
         elif token and token.type == 'fn':
             self.match('fn')
-            vb_list = []
-
-            while True:
-                vb = self.parse_Vb()
-                vb_list.append(vb)
-                next_token = self.peek()
-                if next_token and next_token.value == '.':
-                    break
-                if not next_token:
-                    raise SyntaxError("Expected '.' after fn arguments")
+            vb_list = [self.parse_Vb()]
+            while self.startsVb(self.peek()):
+                vb_list.append(self.parse_Vb())
 
+            if not self.peek():
+                raise SyntaxError("Expected '.' after fn arguments")
             self.expect('.')
             e = self.parse_E()
             node = LambdaNode(vb_list, e)
@@ -342,26 +350,14 @@ class Parser:
         R   -> R Rn => 'gamma'
             -> Rn ;
         """
-        operands = []
-        while True:
-            try:
-                Rn = self.parse_Rn()
-                operands.append(Rn)
-            except SyntaxError:
-                # If we can't parse another Rn, break the loop
-                break
-        if not operands:
-            print("Postion:" +str(self.position))
-            raise SyntaxError("Expected at least one operand")
-        elif len(operands) == 1:
-            return operands[0]
-        else:
-            node = operands[0] 
-            for i in range(1,len(operands)):
-                Rn = operands[i]
-                # Create a GammaNode for each operand
-                node = GammaNode(node, Rn)
-            return node
+        if not self.startsRn(self.peek()):
+            raise SyntaxError(f"Expected at least one operand but found {self.peek()} at {self.position}")
+
+        node = self.parse_Rn()
+        # The chain ends at the first token that cannot start another Rn
+        while self.startsRn(self.peek()):
+            node = GammaNode(node, self.parse_Rn())
+        return node
         
     def parse_Rn(self):
         """
@@ -485,14 +481,11 @@ class Parser:
                         e = self.parse_E()
                         return AssignmentNode(v1, e)
                     else:
-                        Vbs = []
-                        while True:
-                            vb = self.parse_Vb()
-                            Vbs.append(vb)
-                            if self.peek() and self.peek().value == '=':
-                                break
-                        if len(Vbs) == 0:
+                        if not self.startsVb(next_token):
                             raise SyntaxError("Expected at least one variable binding")
+                        Vbs = [self.parse_Vb()]
+                        while self.startsVb(self.peek()):
+                            Vbs.append(self.parse_Vb())
                         self.expect('=')
                         e = self.parse_E()
                         return FcnFormNode(identifier, Vbs, e)
@@ -551,4 +544,42 @@ class Parser:
             return params[0]
         else:
             return CommaNode(params)
-    
\ No newline at end of file
+    
+
+
+class StreamParser(Parser):
+    """
+    Parser that pulls tokens from an iterator (e.g. StreamingLexer.tokenize())
+    instead of indexing into a token list. Only the next unread token and the
+    last consumed one (for reversePos) are buffered.
+    """
+    def __init__(self, tokens):
+        super().__init__([])
+        self.source = iter(tokens)
+        self.lookahead = deque()
+        self.previous = None
+
+    def peek(self):
+        if not self.lookahead:
+            token = next(self.source, None)
+            if token is None:
+                return None
+            self.lookahead.append(token)
+        return self.lookahead[0]
+
+    def match(self, expected):
+        token = self.peek()
+        if token and (token.type == expected or token.value == expected):
+            self.lookahead.popleft()
+            self.previous = token
+            self.position += 1
+            return token
+        return None
+
+    def reversePos(self):
+        if self.previous is not None:
+            self.lookahead.appendleft(self.previous)
+            self.previous = None
+            self.position -= 1
+        else:
+            return None
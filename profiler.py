@@ -0,0 +1,183 @@
+import time
+
+import nodes
+from environment import BuiltInFunction, PartialBuiltin
+
+PROGRAM = '<program>'  # root of every call stack: time spent outside any function
+
+
+class Entry:
+    """Calls and time of one function or node type."""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.totalTime = 0.0
+        self.selfTime = 0.0
+        self.active = 0  # nested calls in progress, so recursion is not counted twice in totalTime
+
+
+class CallPath:
+    """One call stack, as a node of the tree of stacks seen while profiling."""
+
+    def __init__(self, name):
+        self.name = name
+        self.selfTime = 0.0
+        self.children = {}
+
+    def child(self, name):
+        path = self.children.get(name)
+        if path is None:
+            path = self.children[name] = CallPath(name)
+        return path
+
+
+def nodeClasses():
+    """Node classes that implement interpret."""
+    pending = [nodes.Node]
+    while pending:
+        cls = pending.pop()
+        pending.extend(cls.__subclasses__())
+        if 'interpret' in cls.__dict__:
+            yield cls
+
+
+class Profiler:
+    """
+    Deterministic profiler for the tree walker. While active it wraps
+    applyClosure, the execute methods of builtins and the interpret method of every
+    node class, and records calls, total time and self time per function
+    (closures are named after their definition, builtins after themselves)
+    and per node type, plus the call stacks functions were called from.
+
+        profiler = Profiler()
+        with profiler:
+            st.interpret(env)
+        profiler.report()
+        profiler.writeCollapsed('program.folded')
+
+    A tail call leaves the calling function before the callee starts, so the
+    callee shows up under the caller's caller, as it runs.
+    """
+
+    def __init__(self):
+        self.functions = {}
+        self.nodeTypes = {}
+        self.root = CallPath(PROGRAM)
+        self.paths = [self.root]
+        self.functionChildTimes = [0.0]
+        self.nodeChildTimes = [0.0]
+        self.originals = []
+
+    def __enter__(self):
+        self.patch(nodes, 'applyClosure', self.timedClosure(nodes.applyClosure))
+        self.patch(BuiltInFunction, 'execute', self.timedBuiltin(BuiltInFunction.execute))
+        self.patch(PartialBuiltin, 'execute', self.timedBuiltin(PartialBuiltin.execute))
+        for cls in list(nodeClasses()):
+            self.patch(cls, 'interpret', self.timedNode(cls.__name__, cls.__dict__['interpret']))
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        self.root.selfTime += elapsed - self.functionChildTimes[0]
+        for owner, name, original in reversed(self.originals):
+            setattr(owner, name, original)
+        self.originals = []
+        return False
+
+    def patch(self, owner, name, replacement):
+        self.originals.append((owner, name, owner.__dict__[name]))
+        setattr(owner, name, replacement)
+
+    def timedClosure(self, applyClosure):
+        labels = {}
+
+        def timed(closure, rand, caller):
+            lambdaNode = closure.lambdaNode
+            name = lambdaNode.name
+            if name is None:
+                # Lambdas that are not definitions, such as the body of a let, by what they bind
+                name = labels.get(lambdaNode)
+                if name is None:
+                    parameters = ','.join(parameter or 'dummy' for parameter in lambdaNode.parameterNames())
+                    name = labels[lambdaNode] = f"lambda {parameters or '()'}"
+            return self.call(name, applyClosure, closure, rand, caller)
+        return timed
+
+    def timedBuiltin(self, execute):
+        def timed(builtin, rand):
+            return self.call(builtin.name, execute, builtin, rand)
+        return timed
+
+    def timedNode(self, name, interpret):
+        entry = self.nodeTypes[name] = Entry(name)
+        childTimes = self.nodeChildTimes
+
+        def timed(node, env):
+            entry.calls += 1
+            entry.active += 1
+            childTimes.append(0.0)
+            start = time.perf_counter()
+            try:
+                return interpret(node, env)
+            finally:
+                elapsed = time.perf_counter() - start
+                entry.selfTime += elapsed - childTimes.pop()
+                entry.active -= 1
+                if not entry.active:
+                    entry.totalTime += elapsed
+                childTimes[-1] += elapsed
+        return timed
+
+    def call(self, name, function, *args):
+        entry = self.functions.get(name)
+        if entry is None:
+            entry = self.functions[name] = Entry(name)
+        path = self.paths[-1].child(name)
+        entry.calls += 1
+        entry.active += 1
+        self.paths.append(path)
+        self.functionChildTimes.append(0.0)
+        start = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            selfTime = elapsed - self.functionChildTimes.pop()
+            self.paths.pop()
+            entry.selfTime += selfTime
+            path.selfTime += selfTime
+            entry.active -= 1
+            if not entry.active:
+                entry.totalTime += elapsed
+            self.functionChildTimes[-1] += elapsed
+
+    def report(self, limit=None):
+        """Print the functions and node types, most self time first."""
+        for title, entries in (('function', self.functions), ('node type', self.nodeTypes)):
+            rows = sorted((entry for entry in entries.values() if entry.calls),
+                          key=lambda entry: entry.selfTime, reverse=True)
+            print(f"{title:<24} {'calls':>10} {'total s':>10} {'self s':>10} {'self/call us':>13}")
+            for entry in rows[:limit]:
+                print(f"{entry.name:<24} {entry.calls:>10} {entry.totalTime:>10.4f} {entry.selfTime:>10.4f} "
+                      f"{entry.selfTime / entry.calls * 1e6:>13.2f}")
+            print()
+
+    def collapsedStacks(self):
+        """Lines 'outer;...;inner microseconds' of self time, the input format of flame graph tools."""
+        lines = []
+        pending = [(self.root, self.root.name)]
+        while pending:
+            path, stack = pending.pop()
+            microseconds = round(path.selfTime * 1e6)
+            if microseconds > 0:
+                lines.append(f"{stack} {microseconds}")
+            for child in path.children.values():
+                pending.append((child, f"{stack};{child.name}"))
+        return sorted(lines)
+
+    def writeCollapsed(self, filename):
+        with open(filename, 'w') as f:
+            for line in self.collapsedStacks():
+                f.write(line + '\n')
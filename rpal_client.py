@@ -0,0 +1,40 @@
+"""
+Sends an RPAL program to a running rpal_server.py and prints its output
+the way myrpal.py would.
+
+    python rpal_client.py [--socket PATH] [-cse | -vm] <filename>
+"""
+import socket
+import sys
+
+from rpal_server import DEFAULT_SOCKET, receiveMessage, sendMessage
+
+
+def request(source, path=DEFAULT_SOCKET, evaluator='interpret'):
+    """Run source on the server listening on path and return its response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(path)
+        sendMessage(connection, {'source': source, 'evaluator': evaluator})
+        return receiveMessage(connection)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python rpal_client.py [--socket PATH] [-cse | -vm] <filename>")
+        return
+
+    flags = sys.argv
+    path = flags[flags.index('--socket') + 1] if '--socket' in flags else DEFAULT_SOCKET
+    evaluator = 'cse' if '-cse' in flags else 'vm' if '-vm' in flags else 'interpret'
+    with open(sys.argv[-1]) as f:
+        source = f.read()
+
+    response = request(source, path, evaluator)
+    print("Output of the above program is:")
+    print(response['output'])
+    if response['error'] is not None:
+        print(f"Error: {response['error']}")
+
+
+if __name__ == "__main__":
+    main()
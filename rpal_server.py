@@ -0,0 +1,164 @@
+"""
+Long-running RPAL interpreter. The parent process imports the interpreter,
+builds the builtin environment and forks a pool of workers that accept
+programs on a Unix socket, so a request pays neither interpreter startup
+nor regex compilation.
+
+    python rpal_server.py [--socket PATH] [--workers N] [--max-requests N]
+
+Messages in both directions are a 4-byte big-endian length followed by
+that many bytes of UTF-8 JSON. A request is {"source": ..., "evaluator":
+"interpret" | "cse" | "vm"}, optionally with "fuel", "maxDepth" and
+"maxTupleElements" budgets (see limits.Limits); the response has the
+program's "output", "error" (or null), "seconds" and the "worker" pid that
+ran it.
+"""
+import json
+import os
+import signal
+import socket
+import struct
+import sys
+import time
+
+from Lexer import Lexer
+from parser import Parser
+from environment import Environment
+from myrpal import evaluate
+from limits import Limits
+from output_sink import capture
+
+DEFAULT_SOCKET = '/tmp/rpal.sock'
+EVALUATOR_FLAGS = {'interpret': [], 'cse': ['-cse'], 'vm': ['-vm']}
+
+
+def receiveExactly(connection, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = connection.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Connection closed in the middle of a message")
+        data += chunk
+    return bytes(data)
+
+
+def receiveMessage(connection):
+    (length,) = struct.unpack('>I', receiveExactly(connection, 4))
+    return json.loads(receiveExactly(connection, length).decode('utf-8'))
+
+
+def sendMessage(connection, message):
+    data = json.dumps(message).encode('utf-8')
+    connection.sendall(struct.pack('>I', len(data)) + data)
+
+
+class RPALServer:
+    """
+    Prefork server: every worker blocks in accept() on the shared listening
+    socket and exits after maxRequests requests, bounding its memory growth;
+    the parent replaces workers as they exit.
+    """
+
+    def __init__(self, path=DEFAULT_SOCKET, workers=4, maxRequests=1000):
+        self.path = path
+        self.workers = workers
+        self.maxRequests = maxRequests
+        self.children = set()
+        self.listener = None
+        # Copied for every request, so programs never share bindings
+        self.builtins = Environment()
+        self.builtins.defineBuiltInFunctions()
+
+    def serve(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.listener.bind(self.path)
+        self.listener.listen(128)
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+        try:
+            for _ in range(self.workers):
+                self.spawn()
+            while True:
+                pid, _ = os.wait()
+                self.children.discard(pid)
+                self.spawn()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.shutdown()
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            try:
+                self.work()
+            finally:
+                os._exit(0)
+        self.children.add(pid)
+
+    def shutdown(self):
+        for pid in self.children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        self.children.clear()
+        self.listener.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def work(self):
+        for _ in range(self.maxRequests):
+            connection, _ = self.listener.accept()
+            with connection:
+                try:
+                    sendMessage(connection, self.handle(receiveMessage(connection)))
+                except (OSError, ValueError, struct.error):
+                    pass  # the client went away or did not send a message
+
+    def handle(self, request):
+        """Run the program of one request and describe the result."""
+        error = None
+        start = time.perf_counter()
+        with capture() as output:
+            try:
+                flags = EVALUATOR_FLAGS.get(request.get('evaluator', 'interpret'))
+                if flags is None:
+                    raise ValueError(f"Unknown evaluator: {request['evaluator']}")
+                lexer = Lexer(request['source'])
+                lexer.tokenize()
+                st = Parser(lexer.tokens).parse_E().standardize()
+                budgets = {name: request[name] for name in ('fuel', 'maxDepth', 'maxTupleElements') if name in request}
+                if budgets:
+                    env = Limits(**budgets).environment()
+                else:
+                    env = Environment()
+                    env.bindings = dict(self.builtins.bindings)
+                evaluate(st, flags, env)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+        return {
+            'output': output.getvalue(),
+            'error': error,
+            'seconds': time.perf_counter() - start,
+            'worker': os.getpid(),
+        }
+
+
+def main():
+    flags = sys.argv
+    path = flags[flags.index('--socket') + 1] if '--socket' in flags else DEFAULT_SOCKET
+    workers = int(flags[flags.index('--workers') + 1]) if '--workers' in flags else os.cpu_count()
+    maxRequests = int(flags[flags.index('--max-requests') + 1]) if '--max-requests' in flags else 1000
+    print(f"Serving on {path} with {workers} workers")
+    sys.stdout.flush()
+    RPALServer(path, workers, maxRequests).serve()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,437 @@
+import hashlib
+import mmap
+import os
+import sys
+import tempfile
+
+from nodes import (STLambdaNode, IdentifierNode, GammaNode, RnNode, TauNode, CommaNode,
+AugNode, ArrowNode, NotNode, BAndOrNode, ConditionNode, ArithmeticNode, NegNode,
+LetNode, LambdaNode, AssignmentNode, FcnFormNode, RecNode, AndNode, WithinNode, WhereNode, AtNode,
+IDENTIFIER_NODE, RN_NODE, ST_LAMBDA_NODE, GAMMA_NODE, TAU_NODE, COMMA_NODE, ARROW_NODE, AUG_NODE,
+NOT_NODE, NEG_NODE, BOOLEAN_NODE, CONDITION_NODE, ARITHMETIC_NODE,
+LET_NODE, LAMBDA_NODE, ASSIGNMENT_NODE, FCN_FORM_NODE, REC_NODE, AND_NODE, WITHIN_NODE, WHERE_NODE, AT_NODE)
+
+MAGIC = b'RPST'
+FORMAT_VERSION = 3
+
+# Node tags. Nodes are written in postorder, so a reader can rebuild the tree
+# with a value stack: every tag pops its children and pushes the new node.
+IDENTIFIER = 0      # string
+UNIT = 1            # the '()' identifier
+RN = 2              # type string, value string
+GAMMA = 3           # N, E
+TAIL_GAMMA = 4      # N, E, application in tail position
+LAMBDA = 5          # Vb, E
+TAU = 6             # count, elements
+COMMA = 7           # count, params
+ARROW = 8           # condition, ifCase, elseCase
+AUG = 9             # Ta, Tc
+NOT = 10            # Bp
+NEG = 11            # a
+BOOLEAN = 12        # operator string, B1, B2
+CONDITION = 13      # operator string, a1, a2
+ARITHMETIC = 14     # operator string, a1, a2
+NAMED_LAMBDA = 15   # name string, Vb, E
+# Nodes only found in ASTs
+LET = 16            # D, E
+FN = 17             # count, Vbs, E
+ASSIGNMENT = 18     # v1, e
+FCN_FORM = 19       # count, name, Vbs, E
+REC = 20            # Db
+AND = 21            # count, Drs
+WITHIN = 22         # Da, D
+WHERE = 23          # T, Dr
+AT = 24             # a1, Id, a2
+
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+# Cache directories this process could not use; each is warned about once, then left alone
+UNUSABLE_DIRECTORIES = set()
+
+
+def children(node):
+    """Children of a node of an AST or a standardized tree, left to right."""
+    kind = node.kind
+    if kind == GAMMA_NODE:
+        return (node.N, node.E)
+    elif kind == ST_LAMBDA_NODE:
+        return (node.Vb, node.E)
+    elif kind == TAU_NODE:
+        return node.elements
+    elif kind == COMMA_NODE:
+        return node.params
+    elif kind == ARROW_NODE:
+        return (node.condition, node.ifCase, node.elseCase)
+    elif kind == AUG_NODE:
+        return (node.Ta, node.Tc)
+    elif kind == NOT_NODE:
+        return (node.Bp,)
+    elif kind == NEG_NODE:
+        return (node.a,)
+    elif kind == BOOLEAN_NODE:
+        return (node.B1, node.B2)
+    elif kind in (CONDITION_NODE, ARITHMETIC_NODE):
+        return (node.a1, node.a2)
+    elif kind in (IDENTIFIER_NODE, RN_NODE):
+        return ()
+    elif kind == LET_NODE:
+        return (node.D, node.E)
+    elif kind == LAMBDA_NODE:
+        return node.Vb_list + [node.E]
+    elif kind == ASSIGNMENT_NODE:
+        return (node.v1, node.e)
+    elif kind == FCN_FORM_NODE:
+        return [node.name] + node.Vbs + [node.E]
+    elif kind == REC_NODE:
+        return (node.Db,)
+    elif kind == AND_NODE:
+        return node.Drs
+    elif kind == WITHIN_NODE:
+        return (node.Da, node.D)
+    elif kind == WHERE_NODE:
+        return (node.T, node.Dr)
+    elif kind == AT_NODE:
+        return (node.a1, node.Id, node.a2)
+    else:
+        raise TypeError(f"Cannot serialize node of type {type(node).__name__}")
+
+
+def writeVarint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def dumps(st):
+    """Serialize a tree to bytes: an AST, or a standardized tree, which is standardized fully to write it."""
+    strings = {}
+    body = bytearray()
+
+    def string(text):
+        index = strings.get(text)
+        if index is None:
+            index = strings[text] = len(strings)
+        writeVarint(body, index)
+
+    # root, right ... left reversed is left ... right, root: postorder without recursion
+    order = []
+    pending = [st]
+    while pending:
+        node = pending.pop()
+        order.append(node)
+        pending.extend(children(node))
+
+    for node in reversed(order):
+        kind = node.kind
+        if kind == GAMMA_NODE:
+            body.append(TAIL_GAMMA if node.tail else GAMMA)
+        elif kind == ST_LAMBDA_NODE:
+            if node.name is None:
+                body.append(LAMBDA)
+            else:
+                body.append(NAMED_LAMBDA)
+                string(node.name)
+        elif kind == IDENTIFIER_NODE:
+            if node.value == '()':
+                body.append(UNIT)
+            else:
+                body.append(IDENTIFIER)
+                string(node.value)
+        elif kind == RN_NODE:
+            body.append(RN)
+            string(node.type)
+            string(node.value)
+        elif kind == TAU_NODE:
+            body.append(TAU)
+            writeVarint(body, len(node.elements))
+        elif kind == COMMA_NODE:
+            body.append(COMMA)
+            writeVarint(body, len(node.params))
+        elif kind == ARROW_NODE:
+            body.append(ARROW)
+        elif kind == AUG_NODE:
+            body.append(AUG)
+        elif kind == NOT_NODE:
+            body.append(NOT)
+        elif kind == NEG_NODE:
+            body.append(NEG)
+        elif kind == BOOLEAN_NODE:
+            body.append(BOOLEAN)
+            string(node.value)
+        elif kind == CONDITION_NODE:
+            body.append(CONDITION)
+            string(node.value)
+        elif kind == ARITHMETIC_NODE:
+            body.append(ARITHMETIC)
+            string(node.value)
+        elif kind == LET_NODE:
+            body.append(LET)
+        elif kind == LAMBDA_NODE:
+            body.append(FN)
+            writeVarint(body, len(node.Vb_list))
+        elif kind == ASSIGNMENT_NODE:
+            body.append(ASSIGNMENT)
+        elif kind == FCN_FORM_NODE:
+            body.append(FCN_FORM)
+            writeVarint(body, len(node.Vbs))
+        elif kind == REC_NODE:
+            body.append(REC)
+        elif kind == AND_NODE:
+            body.append(AND)
+            writeVarint(body, len(node.Drs))
+        elif kind == WITHIN_NODE:
+            body.append(WITHIN)
+        elif kind == WHERE_NODE:
+            body.append(WHERE)
+        else:
+            body.append(AT)
+
+    out = bytearray(MAGIC)
+    out.append(FORMAT_VERSION)
+    writeVarint(out, len(strings))
+    for text in strings:
+        encoded = text.encode('utf-8')
+        writeVarint(out, len(encoded))
+        out += encoded
+    out += body
+    return bytes(out)
+
+
+def loads(data):
+    """Rebuild a tree from bytes produced by dumps()."""
+    if data[:4] != MAGIC or data[4] != FORMAT_VERSION:
+        raise ValueError("Not a serialized tree of this format version")
+    position = 5
+
+    def varint():
+        nonlocal position
+        value = shift = 0
+        while True:
+            byte = data[position]
+            position += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+
+    strings = []
+    for _ in range(varint()):
+        length = varint()
+        strings.append(data[position:position + length].decode('utf-8'))
+        position += length
+
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    end = len(data)
+    while position < end:
+        tag = data[position]
+        position += 1
+        if tag == IDENTIFIER:
+            push(IdentifierNode(strings[varint()]))
+        elif tag == GAMMA or tag == TAIL_GAMMA:
+            E = pop()
+            node = GammaNode(pop(), E)
+            node.tail = tag == TAIL_GAMMA
+            push(node)
+        elif tag == RN:
+            randType = strings[varint()]
+            push(RnNode(randType, strings[varint()]))
+        elif tag == LAMBDA:
+            E = pop()
+            push(STLambdaNode(pop(), E))
+        elif tag == NAMED_LAMBDA:
+            name = strings[varint()]
+            E = pop()
+            node = STLambdaNode(pop(), E)
+            node.name = name
+            push(node)
+        elif tag == UNIT:
+            push(IdentifierNode('()'))
+        elif tag == TAU or tag == COMMA:
+            count = varint()
+            items = stack[len(stack) - count:]
+            del stack[len(stack) - count:]
+            push(TauNode(items) if tag == TAU else CommaNode(items))
+        elif tag == ARROW:
+            elseCase = pop()
+            ifCase = pop()
+            push(ArrowNode(pop(), ifCase, elseCase))
+        elif tag == AUG:
+            Tc = pop()
+            push(AugNode(pop(), Tc))
+        elif tag == NOT:
+            push(NotNode(pop()))
+        elif tag == NEG:
+            push(NegNode(pop()))
+        elif tag == BOOLEAN:
+            operator = strings[varint()]
+            B2 = pop()
+            push(BAndOrNode(pop(), B2, operator))
+        elif tag == CONDITION:
+            condition = strings[varint()]
+            a2 = pop()
+            push(ConditionNode(pop(), a2, condition))
+        elif tag == ARITHMETIC:
+            operator = strings[varint()]
+            a2 = pop()
+            push(ArithmeticNode(operator, pop(), a2))
+        elif tag == LET:
+            E = pop()
+            push(LetNode(pop(), E))
+        elif tag == FN or tag == FCN_FORM:
+            count = varint()
+            E = pop()
+            Vbs = stack[len(stack) - count:]
+            del stack[len(stack) - count:]
+            push(LambdaNode(Vbs, E) if tag == FN else FcnFormNode(pop(), Vbs, E))
+        elif tag == ASSIGNMENT:
+            e = pop()
+            push(AssignmentNode(pop(), e))
+        elif tag == REC:
+            push(RecNode(pop()))
+        elif tag == AND:
+            count = varint()
+            Drs = stack[len(stack) - count:]
+            del stack[len(stack) - count:]
+            push(AndNode(Drs))
+        elif tag == WITHIN:
+            D = pop()
+            push(WithinNode(pop(), D))
+        elif tag == WHERE:
+            Dr = pop()
+            push(WhereNode(pop(), Dr))
+        elif tag == AT:
+            a2 = pop()
+            Id = pop()
+            push(AtNode(pop(), Id.value, a2))
+        else:
+            raise ValueError(f"Unknown node tag {tag} in serialized tree")
+
+    if len(stack) != 1:
+        raise ValueError("Serialized tree is truncated or malformed")
+    return stack[0]
+
+
+def interpreterVersion():
+    """Changes whenever the format or the modules that produce standardized trees change."""
+    digest = hashlib.sha256(f'{FORMAT_VERSION}'.encode())
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for module in ('Lexer.py', 'parser.py', 'nodes.py'):
+        with open(os.path.join(directory, module), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class STCache:
+    """
+    Directory of serialized trees keyed by a hash of the source and the
+    interpreter version. Entries are evicted least recently used first once
+    the directory grows past maxSize bytes.
+
+    The interpreter stores ASTs, not standardized trees: writing a
+    standardized tree would standardize every lambda body and branch that
+    standardize() defers, and a loaded AST is standardized as lazily as a
+    freshly parsed one.
+    """
+
+    def __init__(self, directory=None, maxSize=None):
+        if directory is None:
+            directory = os.environ.get('RPAL_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'rpal')
+        if maxSize is None:
+            maxSize = int(os.environ.get('RPAL_CACHE_SIZE', DEFAULT_MAX_SIZE))
+        self.directory = directory
+        self.maxSize = maxSize
+        self.version = interpreterVersion()
+
+    def key(self, filename):
+        """Cache key of a source file."""
+        digest = hashlib.sha256(self.version.encode())
+        with open(filename, 'rb') as f:
+            if os.fstat(f.fileno()).st_size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as source:
+                    digest.update(source)
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + '.st')
+
+    def get(self, key):
+        """The cached tree for key, or None."""
+        if self.directory in UNUSABLE_DIRECTORIES:
+            return None
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            self.unusable(e)
+            return None
+        # Processes sharing the directory (--batch workers) may evict the entry at any
+        # point, so it disappearing is not an error
+        try:
+            st = loads(data)
+        except (ValueError, IndexError, UnicodeDecodeError):
+            try:
+                os.remove(path)  # corrupt or truncated entry
+            except OSError:
+                pass
+            return None
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        return st
+
+    def put(self, key, st):
+        """Store a tree and evict old entries if the cache is too large; a cache that cannot be written is skipped."""
+        if self.directory in UNUSABLE_DIRECTORIES:
+            return
+        data = dumps(st)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(temporary, self.path(key))
+            except BaseException:
+                try:
+                    os.remove(temporary)
+                except OSError:
+                    pass
+                raise
+            self.evict()
+        except OSError as e:
+            self.unusable(e)
+
+    def unusable(self, error):
+        """Stop using the directory for the rest of the process, and say so once."""
+        if self.directory not in UNUSABLE_DIRECTORIES:
+            UNUSABLE_DIRECTORIES.add(self.directory)
+            print(f"Warning: not caching trees in {self.directory}: {error}", file=sys.stderr)
+
+    def evict(self):
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if entry.name.endswith('.st'):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue  # evicted by another process since the directory was listed
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.maxSize:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
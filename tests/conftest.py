@@ -0,0 +1,9 @@
+from Lexer import Lexer
+from parser import Parser
+
+
+def standardized(code):
+    """Standardized tree of an RPAL program."""
+    lexer = Lexer(code)
+    lexer.tokenize()
+    return Parser(lexer.tokens).parse_E().standardize()
@@ -0,0 +1,37 @@
+import asyncio
+
+import pytest
+
+from async_eval import run_async
+
+LOOP = "let rec Loop (N, Acc) = N eq 0 -> Acc | Loop (N - 1, Acc + 1) in Print (Loop ({n}, 0))"
+
+def test_programs_interleave_with_separate_output():
+    async def main():
+        order = []
+
+        async def run(n):
+            output = await run_async(LOOP.format(n=n), slice=100)
+            order.append(n)
+            return output
+
+        outputs = await asyncio.gather(run(5000), run(10))
+        return outputs, order
+
+    outputs, order = asyncio.run(main())
+    assert outputs == ['5000', '10']
+    assert order == [10, 5000]  # the short program is not stuck behind the long one
+
+def test_cancellation_stops_program():
+    async def main():
+        task = asyncio.create_task(run_async(LOOP.format(n=10**9), slice=100))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+
+def test_errors_propagate():
+    with pytest.raises(ZeroDivisionError):
+        asyncio.run(run_async("Print (1 / 0)"))
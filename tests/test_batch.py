@@ -0,0 +1,45 @@
+import json
+
+from batch import programFiles, runBatch, main
+
+PROGRAMS = {
+    'a.rpal': "Print (1 + 2)",
+    'b.rpal': "let rec F N = N eq 0 -> 0 | N + F (N - 1) in Print (F 100)",
+    'c.rpal': "Print (1 / 0)",
+    'd.rpal': "let X = in X",
+}
+
+def write_programs(directory):
+    for name, code in PROGRAMS.items():
+        (directory / name).write_text(code)
+
+def test_results_are_ordered_and_captured(tmp_path):
+    write_programs(tmp_path)
+    files = programFiles(str(tmp_path))
+    results = runBatch(files, ['--no-cache'], workers=2)
+
+    assert [r['file'] for r in results] == sorted(str(tmp_path / name) for name in PROGRAMS)
+    assert [r['output'] for r in results[:2]] == ['3', '5050']
+    assert results[0]['error'] is None and results[1]['error'] is None
+    assert results[2]['error'].startswith('ZeroDivisionError')
+    assert results[3]['error'].startswith('SyntaxError')
+    assert all(r['seconds'] >= 0 for r in results)
+
+def test_glob_and_report_file(tmp_path, capsys):
+    write_programs(tmp_path)
+    report_file = tmp_path / "report.json"
+    main(['myrpal.py', '--batch', str(tmp_path / "[ab].rpal"), '--workers', '1',
+          '--report', str(report_file), '-cse', '--no-cache'])
+
+    report = json.loads(report_file.read_text())
+    assert report['total'] == 2 and report['failed'] == 0
+    assert [r['output'] for r in report['programs']] == ['3', '5050']
+    assert "2 programs, 0 failed" in capsys.readouterr().out
+
+def test_unknown_tokens_stay_out_of_the_report(tmp_path, capsys):
+    (tmp_path / "bad.rpal").write_text("Print (1 $ 2)")
+    main(['myrpal.py', '--batch', str(tmp_path), '--workers', '1', '--no-cache'])
+
+    report = json.loads(capsys.readouterr().out)
+    result, = report['programs']
+    assert result['output'].startswith("Unknown token: $")
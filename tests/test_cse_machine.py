@@ -0,0 +1,51 @@
+import sys
+
+from Lexer import Lexer
+from parser import Parser
+from environment import Environment
+from cse_machine import CSEMachine
+from nodes import ArithmeticNode, ArrowNode, ConditionNode, IdentifierNode, RnNode
+
+def run_cse(code):
+    lexer = Lexer(code)
+    lexer.tokenize()
+    parser = Parser(lexer.tokens)
+    st = parser.parse_E().standardize()
+    env = Environment()
+    env.defineBuiltInFunctions()
+    return CSEMachine().run(st, env)
+
+def test_cse_recursive_sum():
+    code = """
+    let Sum(A) = Psum(A, Order A)
+    where rec Psum(T,N) = N eq 0 -> 0 | Psum(T, N-1) + T N
+    in Sum(1,2,3)
+    """
+    assert run_cse(code) == 6
+
+def test_cse_deep_recursion():
+    # Far deeper than the Python recursion limit allows for the tree walker
+    elements = ",".join(str(i) for i in range(1, 5001))
+    code = f"""
+    let Sum(A) = Psum(A, Order A)
+    where rec Psum(T,N) = N eq 0 -> 0 | Psum(T, N-1) + T N
+    in Sum({elements})
+    """
+    assert run_cse(code) == 5000 * 5001 // 2
+
+def test_cse_tuples_and_conditions():
+    code = "let f (x, y) = x gr y & not (x eq 0) -> ((x, y) aug 3) | nil in Order (f (2, 1))"
+    assert run_cse(code) == 3
+
+def test_cse_expressions_deeper_than_the_recursion_limit():
+    # 1 + (1 + ... (X eq 0 -> 0 | X eq 1 -> 1 | ... -> -1)), flattened without recursion
+    depth = 20 * sys.getrecursionlimit()
+    st = RnNode('integer', '-1')
+    for i in reversed(range(depth)):
+        st = ArrowNode(ConditionNode(IdentifierNode('X'), RnNode('integer', str(i)), 'eq'), RnNode('integer', str(i)), st)
+    for _ in range(depth):
+        st = ArithmeticNode('+', RnNode('integer', '1'), st)
+    env = Environment()
+    env.defineBuiltInFunctions()
+    env.define('X', depth - 1)
+    assert CSEMachine().run(st, env) == 2 * depth - 1
@@ -0,0 +1,49 @@
+import sys
+
+from nodes import GammaNode, IdentifierNode, LetNode, AssignmentNode
+
+# The parser is recursive, so these trees are built directly, as a code generator would
+DEPTH = 1_000_000
+
+class LineCounter:
+    def __init__(self):
+        self.lines = 0
+        self.last = ''
+
+    def write(self, text):
+        self.lines += text.count('\n')
+        self.last = text.rsplit('\n', 2)[-2] if text.endswith('\n') else text
+
+def applications(depth):
+    """F (F ( ... (F X)))."""
+    f = IdentifierNode('F')
+    node = IdentifierNode('X')
+    for _ in range(depth):
+        node = GammaNode(f, node)
+    return node
+
+def test_standardize_a_million_deep_application():
+    assert sys.getrecursionlimit() < DEPTH
+    ast = applications(DEPTH)
+    assert ast.standardize() is ast  # already standard, and every node was visited to find out
+
+def test_standardize_deeply_nested_lets():
+    # let X = X in let X = X in ... in X
+    depth = 100 * sys.getrecursionlimit()
+    x = IdentifierNode('X')
+    ast = x
+    for _ in range(depth):
+        ast = LetNode(AssignmentNode(x, x), ast)
+    node = ast.standardize()
+    levels = 0
+    while type(node) is GammaNode:
+        node = node.N.E  # standardizes the next let
+        levels += 1
+    assert (levels, node) == (depth, x)
+
+def test_print_a_tree_deeper_than_the_recursion_limit():
+    depth = 20 * sys.getrecursionlimit()
+    out = LineCounter()
+    applications(depth).print(out=out)
+    assert out.lines == 2 * depth + 1  # gamma and <ID:F> per level, then <ID:X>
+    assert out.last == '.' * depth + '<ID:X>'
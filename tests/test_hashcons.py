@@ -0,0 +1,48 @@
+import pytest
+
+from myrpal import evaluate
+from hashcons import HashConser, hashCons
+from conftest import standardized
+
+PROGRAMS = [
+    "(1 + 2, 1 + 2, (1 + 2) * (1 + 2))",
+    "let F X = X * 2 in (F 3, F 3, (fn X. X * 2) 3)",
+    "let rec F N = N eq 0 -> 0 | F (N - 1) in (F 100, F 100)",
+    "let rec G N = N eq 0 -> 1 | N * G (N - 1) in let rec H N = N eq 0 -> 1 | N * H (N - 1) in G 5 + H 5",
+    "let X = 1 in ((let X = 2 in X), X, (let X = 3 in X))",
+    "(Conc 'a' 'b', Conc 'a' 'b') aug (Conc 'a' 'b')",
+]
+
+def test_identical_subtrees_are_one_node():
+    dag, nodes, distinct = hashCons(standardized("(1 + 2, 1 + 2, (1 + 2) * (1 + 2))"))
+    first, second, product = dag.elements
+    assert first is second is product.a1 is product.a2
+    assert (nodes, distinct) == (14, 5)  # 1, 2, +, *, and the tuple
+
+def test_lambda_names_and_tail_calls_keep_nodes_apart():
+    dag, _, _ = hashCons(standardized("let F X = X in let G X = X in (F, G)"))
+    f = dag.E
+    g = dag.N.E.E
+    assert (f.name, g.name) == ('F', 'G')
+    assert f is not g
+    assert f.E is g.E
+
+    dag, _, _ = hashCons(standardized("let F X = X in (F 1, (fn Y. F 1))"))
+    call, function = dag.N.E.elements
+    assert not call.tail and function.E.tail
+    assert call is not function.E
+
+def test_interning_is_idempotent():
+    conser = HashConser()
+    dag = conser.intern(standardized(PROGRAMS[3]))
+    distinct = conser.distinct()
+    assert conser.intern(standardized(PROGRAMS[3])) is dag
+    assert conser.distinct() == distinct
+
+@pytest.mark.parametrize("flags", [[], ['-cse'], ['-vm']])
+@pytest.mark.parametrize("code", PROGRAMS)
+def test_interning_preserves_results(code, flags):
+    expected = str(evaluate(standardized(code), flags))
+    dag, nodes, distinct = hashCons(standardized(code))
+    assert distinct < nodes
+    assert str(evaluate(dag, flags)) == expected
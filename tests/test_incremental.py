@@ -0,0 +1,52 @@
+from Lexer import Lexer
+from parser import Parser
+from environment import Environment
+from incremental import Document
+
+def program(n, changed=None):
+    definitions = [f"let F{i} x = x + {100 if i == changed else i} in\n" for i in range(n)]
+    return "".join(definitions) + "Print (F3 1, S) where S = 'done'"
+
+def ast_text(node, capsys):
+    node.print()
+    return capsys.readouterr().out
+
+def test_update_reuses_unchanged_definitions(capsys):
+    doc = Document(program(20))
+    stats = doc.update(program(20, changed=7))
+
+    assert stats['segments'] == 22
+    assert stats['segmentsReused'] == 21
+    assert stats['nodesReused'] > stats['nodesBuilt']
+    assert stats['tokensLexed'] < 5
+
+    lexer = Lexer(program(20, changed=7))
+    lexer.tokenize()
+    expected = Parser(lexer.tokens).parse_E()
+    assert ast_text(doc.ast, capsys) == ast_text(expected, capsys)
+    assert ast_text(doc.st, capsys) == ast_text(expected.standardize(), capsys)
+
+def test_updated_program_runs(capsys):
+    doc = Document(program(5))
+    doc.update(program(5, changed=3))
+    env = Environment()
+    env.defineBuiltInFunctions()
+
+    doc.st.interpret(env)
+    assert capsys.readouterr().out == "(101, done)"
+
+def test_fn_body_is_one_segment():
+    doc = Document("fn x. x where y = 1")
+    assert doc.stats['segments'] == 1
+    doc.update("1 + 2")
+    assert doc.st.interpret(Environment()) == 3
+
+def test_unary_plus_parses_as_with_the_full_parser():
+    # Unary plus parses to ArithmeticNode('+', 0, operand), whose left operand is not a node
+    for source in ("let G x = + x in G 1", "let F x = + x in\nlet G y = y in G 1"):
+        lexer = Lexer(source)
+        lexer.tokenize()
+        expected = Parser(lexer.tokens).parse_E()
+        doc = Document(source)
+        assert type(doc.ast) is type(expected)
+        assert doc.stats['nodesBuilt'] > 0
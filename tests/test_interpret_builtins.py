@@ -1,6 +1,10 @@
+import pytest
+
 from Lexer import Lexer
 from parser import Parser
-from environment import Environment
+from environment import Environment, BuiltInFunction, BUILTINS, builtin
+from data_types import TruthValue, TRUE, FALSE, NIL, DUMMY
+from myrpal import evaluate
 
 def test_print_builtin():
     code = "Print(1)"
@@ -14,7 +18,7 @@ def test_print_builtin():
     env.defineBuiltInFunctions()
 
     result = st.interpret(env)
-    assert result == "dummy"  # Print should return the value in your implementation
+    assert result is DUMMY  # Print returns dummy
 
 def test_order_builtin():
     code = "Order(1,2,3)"
@@ -57,3 +61,64 @@ def test_itos_builtin():
 
     result = st.interpret(env)
     assert result == "123" # ItoS should convert integer to string
+
+def run(code):
+    lexer = Lexer(code)
+    lexer.tokenize()
+    st = Parser(lexer.tokens).parse_E().standardize()
+    env = Environment()
+    env.defineBuiltInFunctions()
+    return st.interpret(env)
+
+def test_partial_application_is_reusable():
+    result = run("let A = Conc 'a' in (A 'b', A 'c', Conc 'x' 'y')")
+    assert list(result) == ["ab", "ac", "xy"]
+
+def test_registered_builtin():
+    @builtin('Clamp', 3)
+    def clamp(low, high, value):
+        return max(low, min(high, value))
+
+    try:
+        assert list(run("let C = Clamp 0 10 in (C 42, C (-3), Clamp 0 10 5)")) == [10, 0, 5]
+        assert str(run("Isfunction (Clamp 1)")) == "true"
+
+        partial = run("Clamp 0")
+        assert isinstance(partial, BuiltInFunction)
+        assert (partial.name, partial.arity) == ('Clamp', 2)
+        assert partial.execute(10).arity == 1
+        assert partial(10, 42) == partial.execute(10).execute(42) == 10
+
+        del BUILTINS['Clamp']  # partial applications use the function looked up when Clamp was defined
+        assert partial.execute(10).execute(42) == 10
+    finally:
+        BUILTINS.pop('Clamp', None)
+
+def test_string_literals_are_decoded_once(capsys):
+    assert run(r"Stem 'a\tb'") == "a"
+    assert run(r"Order ('x', Stern '\nb')") == 2
+    assert run(r"Stem (Stern '\nb')") == "b"
+    run(r"Print ('it\'s\t', 'a\\b', '\q')")
+    assert capsys.readouterr().out == "(it's\t, a\\b, \\q)"
+
+def test_truth_values_nil_and_dummy_are_shared():
+    assert TruthValue(True) is TRUE and TruthValue(False) is FALSE
+    assert run("1 ls 2") is TRUE
+    assert run("not (1 ls 2)") is FALSE
+    assert run("nil") is NIL
+    assert run("dummy") is DUMMY
+
+@pytest.mark.parametrize("flags", [[], ['-cse'], ['-vm']])
+def test_dummy_is_not_the_string_dummy(flags):
+    lexer = Lexer("(Isdummy dummy, Isdummy 'dummy', Isstring dummy, dummy eq dummy, Istruthvalue (1 eq 1))")
+    lexer.tokenize()
+    st = Parser(lexer.tokens).parse_E().standardize()
+    assert [str(value) for value in evaluate(st, flags)] == ['true', 'false', 'false', 'true', 'true']
+
+@pytest.mark.parametrize("flags", [[], ['-cse'], ['-vm']])
+def test_condition_must_be_a_truth_value(flags):
+    lexer = Lexer("1 -> 2 | 3")
+    lexer.tokenize()
+    st = Parser(lexer.tokens).parse_E().standardize()
+    with pytest.raises(TypeError, match="Expected a truth value"):
+        evaluate(st, flags)
@@ -13,3 +13,18 @@ def test_tokenization_sample():
     assert 'identifier' in types
     assert 'integer' in types
     assert '+' in values
+
+def test_words_are_not_split_into_operators():
+    lexer = Lexer("length order note letter eq or")
+    lexer.tokenize()
+
+    assert [(t.type, t.value) for t in lexer.tokens] == [
+        ('identifier', 'length'), ('identifier', 'order'), ('identifier', 'note'),
+        ('identifier', 'letter'), ('operator', 'eq'), ('operator', 'or'),
+    ]
+
+def test_comment_ends_at_newline():
+    lexer = Lexer("let x = 1 // comment\nin x")
+    lexer.tokenize()
+
+    assert [t.value for t in lexer.tokens] == ['let', 'x', '=', '1', 'in', 'x']
@@ -0,0 +1,54 @@
+import pytest
+
+from cse_machine import CSEMachine
+from myrpal import evaluate
+from limits import Limits, ResourceExhausted
+from conftest import standardized
+
+RUNAWAY = "let rec Loop N = Loop (N + 1) in Loop 0"
+DEEP = "let rec D N = N eq 0 -> 0 | 1 + D (N - 1) in D 2000"
+BUILD = "let rec Build (T, N) = N eq 0 -> Order T | Build (T aug N, N - 1) in Build (nil, 2000)"
+
+def test_fuel_stops_runaway_recursion():
+    limits = Limits(fuel=1000)
+    with pytest.raises(ResourceExhausted, match="Out of fuel after 1000 applications") as info:
+        standardized(RUNAWAY).interpret(limits.environment())
+    assert info.value.counters['applications'] == 1001
+    assert isinstance(info.value, RuntimeError)
+
+def test_recursion_depth_is_capped():
+    limits = Limits(maxDepth=500)
+    with pytest.raises(ResourceExhausted, match="More than 500 nested applications"):
+        CSEMachine().run(standardized(DEEP), limits.environment())
+
+def test_tail_calls_do_not_nest():
+    limits = Limits(maxDepth=50)
+    loop = "let rec Loop (N, Acc) = N eq 0 -> Acc | Loop (N - 1, Acc + 1) in Loop (5000, 0)"
+    assert standardized(loop).interpret(limits.environment()) == 5000
+    assert limits.applications > 5000
+
+def test_depth_is_counted_on_both_evaluators():
+    for run in (lambda st, env: st.interpret(env), lambda st, env: CSEMachine().run(st, env)):
+        loop = "let rec Loop (N, Acc) = N eq 0 -> Acc | Loop (N - 1, Acc + 1) in Loop (5000, 0)"
+        limits = Limits(maxDepth=50)
+        assert run(standardized(loop), limits.environment()) == 5000
+        assert limits.counters()['depth'] < 10
+
+        limits = Limits()
+        assert run(standardized("let rec D N = N eq 0 -> 0 | 1 + D (N - 1) in D 100"), limits.environment()) == 100
+        assert 100 < limits.counters()['depth'] < 110
+
+@pytest.mark.parametrize("flags", [['--max-tuple-elements', '500'], ['-cse', '--max-tuple-elements', '500']])
+def test_live_tuple_elements_are_capped(flags):
+    with pytest.raises(ResourceExhausted, match="More than 500 live tuple elements"):
+        evaluate(standardized(BUILD), flags)
+
+def test_freed_tuples_are_not_counted():
+    # 2000 versions of the tuple are built, about two million elements in all,
+    # but at most the argument and the newest version are alive at once
+    assert evaluate(standardized(BUILD), ['--max-tuple-elements', '4100']) == 2000
+
+def test_generous_limits_do_not_change_results():
+    flags = ['--fuel', '1000000', '--max-depth', '10000', '--max-tuple-elements', '100000']
+    assert evaluate(standardized(DEEP), ['-cse'] + flags) == 2000
+    assert evaluate(standardized(BUILD), flags) == 2000
@@ -0,0 +1,49 @@
+import io
+
+import pytest
+
+import nodes
+from Lexer import Lexer
+from parser import Parser
+from nodes import Node, GammaNode, IdentifierNode, RnNode, STLambdaNode, GAMMA_NODE, IDENTIFIER_NODE
+
+def parse(code):
+    lexer = Lexer(code)
+    lexer.tokenize()
+    return Parser(lexer.tokens).parse_E()
+
+def nodeClasses():
+    return [cls for cls in vars(nodes).values() if isinstance(cls, type) and issubclass(cls, Node) and cls is not Node]
+
+def test_nodes_have_slots_and_distinct_kinds():
+    kinds = [cls.kind for cls in nodeClasses()]
+    assert None not in kinds
+    assert len(set(kinds)) == len(kinds)
+    node = GammaNode(IdentifierNode('F'), RnNode('integer', '1'))
+    assert not hasattr(node, '__dict__')
+    assert (node.kind, node.N.kind) == (GAMMA_NODE, IDENTIFIER_NODE)
+    assert (node.type, node.value, node.tail) == ('gamma', 'gamma', False)
+    assert (IdentifierNode('()').type, IdentifierNode('X').type) == ('()', 'Identifier')
+
+def test_identifier_names_are_interned():
+    first = parse("let " + "Name" + "X = 1 in NameX").D.v1.value
+    second = parse("Name" + "X" + " + 1").a1.value
+    assert first is second
+
+def test_standardized_copies_keep_every_attribute():
+    ast = parse("F (let X = 1 in X)")
+    st = ast.standardize()
+    assert st is not ast and type(st) is GammaNode
+    assert st.N is ast.N
+    assert (st.tail, st.standardized, ast.standardized) == (False, True, st)
+
+def test_print_keeps_the_lines_before_a_failing_standardization():
+    class Broken:
+        def standardize(self):
+            raise SyntaxError("cannot standardize")
+
+    out = io.StringIO()
+    tree = GammaNode(STLambdaNode.deferred(IdentifierNode('X'), Broken()), RnNode('integer', '1'))
+    with pytest.raises(SyntaxError):
+        tree.print(out=out)
+    assert out.getvalue() == "gamma\n.lambda\n"  # the children of the lambda are read before they are printed
@@ -0,0 +1,72 @@
+import sys
+
+import pytest
+
+from myrpal import evaluate
+from optimizer import optimize
+from nodes import ArithmeticNode, RnNode
+from conftest import standardized
+
+PROGRAMS = [
+    "2 * 60 * 60",
+    "let N = 10 in N eq 10 -> 'ten' | 'other'",
+    "let A = 1 and B = 2 in (A + B, -(A - B), not (A ls B), A gr B or B gr A)",
+    "true & false -> 1 | 2 ** 5",
+    "Order (1, 'two', true, nil) + (10, 20, 30) 2",
+    "let Order X = 42 in Order (1, 2) + 2 * 3",
+    "let rec Loop (N, Acc) = N eq 0 -> Acc | (let Step = 1 in Loop (N - Step, Acc + Step)) in Loop (3000, 0)",
+    "let F X = X * 3 in (let X = 4 in F X) + 1",
+    "(fn X. X gr 0 -> 1 / 0 | 7) 0",
+    "let X = 1 in (fn X. X + 1) 10",
+]
+
+@pytest.mark.parametrize("flags", [[], ['-cse'], ['-vm']])
+@pytest.mark.parametrize("code", PROGRAMS)
+def test_folding_preserves_results(code, flags):
+    expected = str(evaluate(standardized(code), flags))
+    st, folder = optimize(standardized(code))
+    assert str(evaluate(st, flags)) == expected
+    assert folder.folded > 0
+
+def test_literals_are_folded():
+    st, folder = optimize(standardized("let N = 2 in (N * 60 * 60, Order (1, 2, 3), N eq 2 -> 'a' | 'b')"))
+    assert [str(e) for e in st.elements] == ["Rn(integer, 7200)", "Rn(integer, 3)", "Rn(string, 'a')"]
+    assert folder.folded == 8  # two uses of N, five operators and the let itself
+
+def test_errors_are_left_for_run_time():
+    st, _ = optimize(standardized("let X = 0 in (1 / X, 'a' + 1, (1, 2) 3, 2 ** (0 - 1))"))
+    assert [type(e).__name__ for e in st.elements] == ['ArithmeticNode', 'ArithmeticNode', 'GammaNode', 'ArithmeticNode']
+    with pytest.raises(ZeroDivisionError):
+        evaluate(optimize(standardized("let X = 0 in 1 / X"))[0], [])
+
+def test_shadowed_order_is_not_folded():
+    st, _ = optimize(standardized("let Order = fn T. 0 in Order (1, 2)"))
+    assert evaluate(st, []) == 0
+
+def test_trees_deeper_than_the_recursion_limit():
+    depth = 20 * sys.getrecursionlimit()
+    st = RnNode('integer', '0')
+    for _ in range(depth):
+        st = ArithmeticNode('+', RnNode('integer', '1'), st)
+    folded, folder = optimize(st)
+    assert (str(folded), folder.folded) == (f"Rn(integer, {depth})", depth)
+
+def test_bodies_and_branches_are_folded_when_first_run():
+    st = standardized("let rec F X = X eq 0 -> 1 + 1 | F (X - 1) in F 3")
+    folded, folder = optimize(st)
+    assert (folder.folded, st.N.pendingE is not None) == (0, True)
+    assert evaluate(folded, []) == 2
+    assert folder.folded == 1
+    assert st.N.pendingE is not None  # the original tree is left as it was
+
+def test_the_original_tree_is_not_changed(capsys):
+    code = "let N = 2 in let F X = (X, 0) 1 in (N * 60, (1, F N) 2, true & F N)"
+    standardized(code).print()
+    expected = capsys.readouterr().out
+
+    st = standardized(code)
+    folded, _ = optimize(st)
+    assert list(evaluate(folded, [])) == [120, 2, 2]
+    st.print()
+    assert capsys.readouterr().out == expected
+    assert list(evaluate(st, [])) == [120, 2, 2]
@@ -0,0 +1,59 @@
+import sys
+
+import pytest
+
+from myrpal import evaluate
+from output_sink import OutputSink, capture, currentSink, outputTo
+from conftest import standardized
+
+LINES = "let rec P N = N eq 0 -> dummy | (let D = Print N in let E = Print '\\n' in P (N - 1)) in P 3"
+
+class CountingTarget:
+    def __init__(self):
+        self.writes = []
+        self.flushes = 0
+
+    def write(self, text):
+        self.writes.append(text)
+
+    def flush(self):
+        self.flushes += 1
+
+@pytest.mark.parametrize("flags", [[], ['-cse'], ['-vm']])
+def test_capture_leaves_stdout_alone(flags, capsys):
+    stdout = sys.stdout
+    with capture() as output:
+        evaluate(standardized(LINES), flags)
+        assert sys.stdout is stdout
+    assert output.getvalue() == "3\n2\n1\n"
+    assert capsys.readouterr().out == ""
+    assert currentSink() is None
+
+def test_writes_are_buffered_until_flush():
+    target = CountingTarget()
+    with outputTo(target, bufferSize=1000):
+        evaluate(standardized(LINES), [])
+        assert target.writes == []
+    assert target.writes == ["3\n2\n1\n"]
+    assert target.flushes == 1
+
+def test_full_buffer_is_written_through():
+    target = CountingTarget()
+    sink = OutputSink(target, bufferSize=4)
+    for text in ("ab", "cd", "e"):
+        sink.write(text)
+    assert target.writes == ["abcd"]
+    sink.flush()
+    assert target.writes == ["abcd", "e"]
+
+def test_output_is_flushed_when_the_program_fails(tmp_path):
+    path = tmp_path / "out.txt"
+    with open(path, 'w') as f:
+        with pytest.raises(ZeroDivisionError):
+            with outputTo(f):
+                evaluate(standardized("let D = Print 'before' in Print (1 / 0)"), [])
+        assert path.read_text() == "before"
+
+def test_evaluate_writes_to_stdout_without_a_sink(capsys):
+    evaluate(standardized(LINES), [])
+    assert capsys.readouterr().out == "3\n2\n1\n"
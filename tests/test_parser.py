@@ -1,3 +1,5 @@
+import pytest
+
 from Lexer import Lexer
 from parser import Parser
 
@@ -11,3 +13,19 @@ def test_parser_constructs_ast():
 
     assert ast is not None
     assert hasattr(ast, "standardize")
+
+def test_application_chain_stops_at_first_set():
+    lexer = Lexer("F (G x) y , 1")
+    lexer.tokenize()
+    parser = Parser(lexer.tokens)
+
+    tau = parser.parse_E()
+    assert parser.position == len(lexer.tokens)
+    assert str(tau.elements[0]) == "Gamma(Gamma(Identifier(F), Gamma(Identifier(G), Identifier(x))), Identifier(y))"
+
+def test_error_inside_parentheses_is_reported():
+    lexer = Lexer("F (x + ) y")
+    lexer.tokenize()
+
+    with pytest.raises(SyntaxError):
+        Parser(lexer.tokens).parse_E()
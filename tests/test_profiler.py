@@ -0,0 +1,60 @@
+import nodes
+from Lexer import Lexer
+from parser import Parser
+from environment import Environment, BuiltInFunction
+from profiler import Profiler
+
+CODE = """
+let rec Fib N = N ls 2 -> N | Fib (N-1) + Fib (N-2)
+in let Add X Y = X + Y
+in Print (Fib 10, Add 1 2, Conc 'a' 'b')
+"""
+
+def profile(code):
+    lexer = Lexer(code)
+    lexer.tokenize()
+    st = Parser(lexer.tokens).parse_E().standardize()
+    env = Environment()
+    env.defineBuiltInFunctions()
+    profiler = Profiler()
+    with profiler:
+        st.interpret(env)
+    return profiler
+
+def test_calls_per_function_and_node_type(capsys):
+    profiler = profile(CODE)
+    assert capsys.readouterr().out == "(55, 3, ab)"
+
+    functions = profiler.functions
+    assert functions['Fib'].calls == 177
+    assert functions['Add'].calls == 2  # one application per curried argument
+    assert functions['Print'].calls == 1 and functions['Conc'].calls == 2
+    assert functions['Y*'].calls == 1
+    assert profiler.nodeTypes['ArrowNode'].calls == 177
+    assert profiler.nodeTypes['GammaNode'].calls > 177
+
+    # Recursive calls are not counted twice in total time
+    fib = functions['Fib']
+    assert 0 < fib.selfTime <= fib.totalTime
+    assert fib.totalTime <= profiler.nodeTypes['GammaNode'].totalTime
+
+def test_patches_are_removed():
+    interpret = nodes.GammaNode.interpret
+    applyClosure = nodes.applyClosure
+    execute = BuiltInFunction.execute
+    profile("Print 1")
+    assert nodes.GammaNode.interpret is interpret
+    assert nodes.applyClosure is applyClosure
+    assert BuiltInFunction.execute is execute
+
+def test_collapsed_stacks(tmp_path, capsys):
+    profiler = profile(CODE)
+    profiler.report()
+    table = capsys.readouterr().out
+    assert table.index("Fib") < table.index("Y*")
+
+    stacks = tmp_path / "fib.folded"
+    profiler.writeCollapsed(str(stacks))
+    lines = stacks.read_text().splitlines()
+    assert "<program>;lambda Add;Fib;Fib" in [line.rsplit(' ', 1)[0] for line in lines]
+    assert all(line.startswith("<program>") and int(line.rsplit(' ', 1)[1]) > 0 for line in lines)
@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+import time
+
+from rpal_client import request
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+def start_server(path, workers, max_requests):
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, 'rpal_server.py'), '--socket', path,
+         '--workers', str(workers), '--max-requests', str(max_requests)],
+        stdout=subprocess.DEVNULL)
+    for _ in range(100):
+        if os.path.exists(path):
+            return server
+        time.sleep(0.05)
+    server.kill()
+    raise RuntimeError("server did not start")
+
+def test_requests_are_served_and_workers_recycled(tmp_path):
+    path = str(tmp_path / "rpal.sock")
+    server = start_server(path, workers=2, max_requests=2)
+    try:
+        responses = [request("let rec F N = N eq 0 -> 0 | N + F (N - 1) in Print (F 10)", path, evaluator)
+                     for evaluator in ['interpret', 'cse', 'vm'] * 3]
+        assert all(r['output'] == '55' and r['error'] is None for r in responses)
+        assert len({r['worker'] for r in responses}) > 2  # every worker exits after 2 requests
+
+        failed = request("Print (1", path)
+        assert failed['error'].startswith('SyntaxError')
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+    assert not os.path.exists(path)
@@ -0,0 +1,146 @@
+import os
+
+from Lexer import Lexer
+from parser import Parser
+from environment import Environment
+from nodes import TauNode, RnNode
+from st_cache import STCache, dumps, loads, children
+from myrpal import standardizedTree, evaluate
+from conftest import standardized
+
+CODE = """
+let rec Loop (N, Acc) = N eq 0 -> Acc | Loop (N - 1, Acc + 2)
+and Neg X = not (X gr 0) or X ls -5 & true
+in (Loop (10, 0), Neg 3, nil aug 'a\\'b', (fn () . dummy))
+"""
+
+def lambdaNames(st):
+    names = []
+    pending = [st]
+    while pending:
+        node = pending.pop()
+        names.append(getattr(node, 'name', None))
+        pending.extend(children(node))
+    return names
+
+def test_round_trip_preserves_tree_and_tail_flags(capsys):
+    st = standardized(CODE)
+    loaded = loads(dumps(st))
+    assert lambdaNames(loaded) == lambdaNames(st)
+    assert 'Loop' in lambdaNames(st) and 'Neg' in lambdaNames(st)
+
+    st.print()
+    expected = capsys.readouterr().out
+    loaded.print()
+    assert capsys.readouterr().out == expected
+    assert str(loaded) == str(st)
+
+    env = Environment()
+    env.defineBuiltInFunctions()
+    assert loaded.interpret(env)[0] == 20
+
+def test_deep_tree_round_trip():
+    st = RnNode('integer', '0')
+    for _ in range(100000):
+        st = TauNode([st])
+    loaded = loads(dumps(st))
+
+    depth = 0
+    while isinstance(loaded, TauNode):
+        loaded = loaded.elements[0]
+        depth += 1
+    assert depth == 100000
+
+def test_cache_hit_miss_and_eviction(tmp_path):
+    source = tmp_path / "prog.rpal"
+    source.write_text(CODE)
+    cache = STCache(str(tmp_path / "cache"), maxSize=10**6)
+    key = cache.key(str(source))
+
+    assert cache.get(key) is None
+    cache.put(key, standardized(CODE))
+    assert str(cache.get(key)) == str(standardized(CODE))
+
+    source.write_text(CODE + " ")
+    assert cache.key(str(source)) != key
+
+    cache.maxSize = 0
+    cache.put(cache.key(str(source)), standardized(CODE))
+    assert list((tmp_path / "cache").iterdir()) == []
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    cache = STCache(str(tmp_path))
+    (tmp_path / "bad.st").write_bytes(b"RPST\x01\x05")
+    assert cache.get("bad") is None
+    assert not (tmp_path / "bad.st").exists()
+
+AST_CODE = """
+let rec F (N, Acc) = N eq 0 -> Acc | F (N - 1, Acc + 1)
+and G X Y = X @Conc Y
+within H = fn A B. A aug B
+in H (F (3, 0)) (G 'a' 'b') where Z = -1
+"""
+
+def test_ast_round_trip(capsys):
+    lexer = Lexer(AST_CODE)
+    lexer.tokenize()
+    ast = Parser(lexer.tokens).parse_E()
+    loaded = loads(dumps(ast))
+
+    ast.print()
+    expected = capsys.readouterr().out
+    loaded.print()
+    assert capsys.readouterr().out == expected
+
+    loaded.standardize().print()
+    standardizedOutput = capsys.readouterr().out
+    ast.standardize().print()
+    assert capsys.readouterr().out == standardizedOutput
+
+def test_warm_runs_standardize_lazily(tmp_path, monkeypatch):
+    monkeypatch.setenv('RPAL_CACHE_DIR', str(tmp_path / "cache"))
+    source = tmp_path / "prog.rpal"
+    source.write_text("let F X = X + 1 in F 2")
+    for _ in range(2):  # cold, then warm
+        st = standardizedTree(str(source), [])
+        assert st.N.pendingE is not None  # the body of the let is not standardized yet
+        assert evaluate(st, []) == 3
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+
+def test_entries_evicted_by_another_process_are_not_errors(tmp_path, monkeypatch):
+    cache = STCache(str(tmp_path), maxSize=10**6)
+    cache.put("a", standardized(CODE))
+
+    def evicted(*args):
+        raise FileNotFoundError(2, "No such file or directory")
+
+    monkeypatch.setattr(os, "utime", evicted)
+    assert str(cache.get("a")) == str(standardized(CODE))
+
+    monkeypatch.setattr(os.DirEntry, "stat", evicted)
+    cache.put("b", standardized(CODE))
+    monkeypatch.undo()
+
+    (tmp_path / "bad.st").write_bytes(b"RPST")
+    monkeypatch.setattr(os, "remove", evicted)
+    assert cache.get("bad") is None
+
+def test_failed_put_leaves_no_temporary_file(tmp_path, monkeypatch):
+    cache = STCache(str(tmp_path))
+
+    def full(*args):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(os, "replace", full)
+    cache.put("a", standardized(CODE))
+    assert list(tmp_path.iterdir()) == []
+
+def test_unwritable_cache_is_skipped_with_one_warning(tmp_path, monkeypatch, capsys):
+    (tmp_path / "file").write_text("")
+    monkeypatch.setenv('RPAL_CACHE_DIR', str(tmp_path / "file" / "cache"))
+    source = tmp_path / "prog.rpal"
+    source.write_text("let F X = X + 1 in F 2")
+    for _ in range(2):
+        assert evaluate(standardizedTree(str(source), []), []) == 3
+    warnings = capsys.readouterr().err.splitlines()
+    assert len(warnings) == 1 and warnings[0].startswith("Warning: not caching trees in")
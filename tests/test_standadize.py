@@ -17,3 +17,30 @@ def test_ast_standardize_and_interpret():
 
     result = st.interpret(env)
     assert result == 5  # 3 + 2 = 5
+
+def parse(code):
+    lexer = Lexer(code)
+    lexer.tokenize()
+    return Parser(lexer.tokens).parse_E()
+
+def test_standardize_is_remembered_and_shares_standard_subtrees():
+    ast = parse("(1 + 2, Conc 'a' 'b', not true)")
+    st = ast.standardize()
+    assert st is ast  # nothing to change
+    assert ast.standardize() is st
+
+    ast = parse("let X = 1 in (X + 2, X)")
+    st = ast.standardize()
+    assert ast.standardize() is st
+    assert st.E is ast.D.e  # the definition's value is reused
+    assert st.N.E is ast.E  # and so is the body
+
+def test_unreached_code_is_not_standardized():
+    ast = parse("let F N = (let A = N in A) in true -> 1 | (let B = 2 in B)")
+    env = Environment()
+    env.defineBuiltInFunctions()
+    assert ast.standardize().interpret(env) == 1
+    unusedBody = ast.D.E
+    untakenBranch = ast.E.elseCase
+    assert unusedBody.standardized is False
+    assert untakenBranch.standardized is False
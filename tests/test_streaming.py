@@ -0,0 +1,41 @@
+from Lexer import Lexer, StreamingLexer
+from parser import Parser, StreamParser
+from environment import Environment
+
+CODE = """
+let Sum(A) = Psum (A,Order A )
+where rec Psum (T,N) = N eq 0 -> 0
+| Psum(T,N-1)+T N
+in Print ( Sum (1,2,3,4,5) )  // trailing comment
+"""
+
+def test_streaming_lexer_matches_lexer(tmp_path):
+    source = tmp_path / "sum.rpal"
+    source.write_text(CODE)
+    lexer = Lexer(CODE)
+    lexer.tokenize()
+
+    streamed = list(StreamingLexer(str(source)).tokenize())
+    assert [(t.type, t.value) for t in streamed] == [(t.type, t.value) for t in lexer.tokens]
+
+def test_stream_parser_builds_same_tree(tmp_path, capsys):
+    source = tmp_path / "sum.rpal"
+    source.write_text(CODE)
+    lexer = Lexer(CODE)
+    lexer.tokenize()
+
+    Parser(lexer.tokens).parse_E().print()
+    expected = capsys.readouterr().out
+    ast = StreamParser(StreamingLexer(str(source)).tokenize()).parse_E()
+    ast.print()
+    assert capsys.readouterr().out == expected
+
+    env = Environment()
+    env.defineBuiltInFunctions()
+    ast.standardize().interpret(env)
+    assert capsys.readouterr().out == "15"
+
+def test_empty_file(tmp_path):
+    source = tmp_path / "empty.rpal"
+    source.write_text("")
+    assert list(StreamingLexer(str(source)).tokenize()) == []
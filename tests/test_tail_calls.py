@@ -0,0 +1,27 @@
+from environment import Environment
+import vm
+from conftest import standardized
+
+LOOP = """
+let rec Loop (N, Acc) = N eq 0 -> Acc | Loop (N - 1, Acc + 1)
+in Loop (50000, 0)
+"""
+
+def global_env():
+    env = Environment()
+    env.defineBuiltInFunctions()
+    return env
+
+def test_tail_positions_are_marked():
+    st = standardized("let f x = x eq 0 -> g x | h (g x) in f 1")
+    body = st.E.E  # the '->' inside fn x.
+    assert body.ifCase.tail
+    assert body.elseCase.tail
+    assert not body.elseCase.E.tail  # g x is an argument, not a tail call
+    assert not st.tail
+
+def test_tail_recursive_loop_runs_in_constant_stack():
+    assert standardized(LOOP).interpret(global_env()) == 50000
+
+def test_tail_recursive_loop_on_vm():
+    assert vm.execute(standardized(LOOP), global_env()) == 50000
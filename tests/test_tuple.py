@@ -0,0 +1,27 @@
+from Lexer import Lexer
+from parser import Parser
+from environment import Environment
+from data_types import Tuple
+
+def test_aug_builds_large_tuple():
+    code = """
+    let rec Build (T, N) = N eq 0 -> T | Build (T aug N, N - 1)
+    in let T = Build (nil, 2000) in (Order T, T 1, T 1000, T 2000)
+    """
+    lexer = Lexer(code)
+    lexer.tokenize()
+    st = Parser(lexer.tokens).parse_E().standardize()
+    env = Environment()
+    env.defineBuiltInFunctions()
+
+    result = st.interpret(env)
+    assert list(result) == [2000, 2000, 1001, 1]
+
+def test_add_shares_structure_and_keeps_original():
+    base = Tuple(list(range(100)))
+    first = base.add('a')
+    second = base.add('b')
+
+    assert len(base) == 100 and list(base) == list(range(100))
+    assert first[100] == 'a' and second[100] == 'b'
+    assert first.root is base.root  # full chunks are shared, not copied
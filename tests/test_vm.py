@@ -0,0 +1,60 @@
+from Lexer import Lexer
+from parser import Parser
+from environment import Environment
+import vm
+
+def run_vm(code):
+    lexer = Lexer(code)
+    lexer.tokenize()
+    parser = Parser(lexer.tokens)
+    st = parser.parse_E().standardize()
+    env = Environment()
+    env.defineBuiltInFunctions()
+    return vm.execute(st, env)
+
+def test_vm_recursive_sum():
+    code = """
+    let Sum(A) = Psum(A, Order A)
+    where rec Psum(T,N) = N eq 0 -> 0 | Psum(T, N-1) + T N
+    in Sum(1,2,3)
+    """
+    assert run_vm(code) == 6
+
+def test_vm_strings_and_booleans():
+    code = "let f s = Isstring s & not (s eq '') -> Conc (Stem s) 'x' | 'empty' in (f 'abc', f '')"
+    result = run_vm(code)
+    assert result[0] == 'ax' and result[1] == 'empty'
+
+def test_compiled_code_is_array_backed():
+    lexer = Lexer("let x = 3 in x + 2")
+    lexer.tokenize()
+    st = Parser(lexer.tokens).parse_E().standardize()
+    env = Environment()
+    env.defineBuiltInFunctions()
+    compiler = vm.Compiler(env)
+    code = compiler.compile(st)
+    assert code.opcodes.typecode == 'B'
+    assert len(code.opcodes) == len(code.operands)
+    assert 3 in code.constants
+
+def test_identifiers_resolve_to_frame_slots():
+    lexer = Lexer("let f (a, b) = fn c. a + c in Print (f (1, 2) 3)")
+    lexer.tokenize()
+    st = Parser(lexer.tokens).parse_E().standardize()
+    env = Environment()
+    env.defineBuiltInFunctions()
+    compiler = vm.Compiler(env)
+    compiler.compile(st)
+
+    body = st.E.E.E  # a + c inside fn (a, b). fn c. a + c
+    assert body.a1.address == (1, 1)  # a: first slot of the enclosing frame
+    assert body.a2.address == (0, 1)  # c: first slot of the current frame
+    assert st.N.E.N.address is None   # Print is a built-in, loaded as a constant
+
+def test_unbound_identifier_raises_name_error():
+    try:
+        run_vm("let x = 1 in y")
+    except NameError as e:
+        assert "y" in str(e)
+    else:
+        assert False, "expected NameError"
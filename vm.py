@@ -0,0 +1,394 @@
+import operator
+from array import array
+
+from data_types import Tuple, TRUE, FALSE
+from environment import Closure
+from nodes import (IDENTIFIER_NODE, RN_NODE, ST_LAMBDA_NODE, GAMMA_NODE, TAU_NODE, ARROW_NODE, BOOLEAN_NODE,
+ARITHMETIC_NODE, CONDITION_NODE, AUG_NODE, NOT_NODE, NEG_NODE, applyNonClosure)
+
+# Opcodes
+LOAD_CONST = 0          # push constants[arg]
+LOAD_GLOBAL = 1         # push the value bound to constants[arg] in the global environment
+MAKE_CLOSURE = 2        # push a closure of the Code constants[arg] over the current frame
+CALL = 3                # apply the rator on top of the stack to the rand below it
+BUILD_TUPLE = 4         # collect the top arg values into a Tuple
+JUMP = 5                # continue at arg
+JUMP_IF_FALSE = 6       # pop a truth value, continue at arg unless it is true
+JUMP_IF_FALSE_OR_POP = 7    # '&': keep a falsy left operand and continue at arg, else pop it
+JUMP_IF_TRUE_OR_POP = 8     # 'or': keep a truthy left operand and continue at arg, else pop it
+ADD = 9                 # integer fast paths; constants[arg] is the ArithmeticNode
+SUB = 10
+MUL = 11
+COMPARE = 12            # constants[arg] is (comparison function, ConditionNode)
+BINARY = 13             # constants[arg].apply(left, right)
+UNARY = 14              # constants[arg].apply(value)
+RETURN = 15
+LOAD_LOCAL = 16         # push slot arg of the current frame
+LOAD_FREE = 17          # push slot (arg & 0xFFFF) of the frame (arg >> 16) levels out
+FIX = 18                # Y*: turn the closure on top of the stack into a recursive closure
+TAIL_CALL = 19          # CALL in tail position: the callee replaces the current frame
+
+OPCODES = (LOAD_CONST, LOAD_GLOBAL, MAKE_CLOSURE, CALL, BUILD_TUPLE, JUMP, JUMP_IF_FALSE,
+           JUMP_IF_FALSE_OR_POP, JUMP_IF_TRUE_OR_POP, ADD, SUB, MUL, COMPARE, BINARY, UNARY, RETURN,
+           LOAD_LOCAL, LOAD_FREE, FIX, TAIL_CALL)
+
+OPCODE_NAMES = ['LOAD_CONST', 'LOAD_GLOBAL', 'MAKE_CLOSURE', 'CALL', 'BUILD_TUPLE', 'JUMP',
+                'JUMP_IF_FALSE', 'JUMP_IF_FALSE_OR_POP', 'JUMP_IF_TRUE_OR_POP', 'ADD', 'SUB',
+                'MUL', 'COMPARE', 'BINARY', 'UNARY', 'RETURN', 'LOAD_LOCAL', 'LOAD_FREE', 'FIX',
+                'TAIL_CALL']
+
+ARITHMETIC_OPCODES = {'+': ADD, '-': SUB, '*': MUL}
+
+COMPARISONS = {
+    'eq': operator.eq,
+    'ne': operator.ne,
+    'gr': operator.gt,
+    'ge': operator.ge,
+    'ls': operator.lt,
+    'le': operator.le,
+}
+
+
+class Code:
+    """A compiled expression: parallel opcode/operand arrays and a constant pool."""
+
+    def __init__(self, name, lambdaNode=None):
+        self.name = name
+        self.lambdaNode = lambdaNode
+        self.inner = None   # Code of the lambda this lambda's body consists of, used by FIX
+        self.bindsOne = lambdaNode is not None and lambdaNode.Vb.kind == IDENTIFIER_NODE
+        self.opcodes = array('B')
+        self.operands = array('l')
+        self.constants = []
+        self.constantIndex = {}
+
+    def emit(self, opcode, operand=0):
+        self.opcodes.append(opcode)
+        self.operands.append(operand)
+        return len(self.opcodes) - 1
+
+    def patch(self, position, operand):
+        self.operands[position] = operand
+
+    def constant(self, value):
+        """Index of value in the constant pool, adding it if needed."""
+        key = (type(value), value) if isinstance(value, (int, str)) else id(value)
+        index = self.constantIndex.get(key)
+        if index is None:
+            index = len(self.constants)
+            self.constants.append(value)
+            self.constantIndex[key] = index
+        return index
+
+    def __len__(self):
+        return len(self.opcodes)
+
+    def disassemble(self):
+        lines = []
+        for pc, (opcode, operand) in enumerate(zip(self.opcodes, self.operands)):
+            lines.append(f"{pc:4} {OPCODE_NAMES[opcode]:<22} {operand}")
+        return "\n".join(lines)
+
+    def __str__(self):
+        return f"Code({self.name}, {len(self)} instructions)"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class Scope:
+    """Compile-time view of a runtime frame: the names bound by one lambda."""
+
+    def __init__(self, names, parent):
+        self.slots = {}
+        for slot, name in enumerate(names):
+            if name is not None:
+                self.slots[name] = slot + 1  # slot 0 of a frame holds its parent frame
+        self.parent = parent
+
+
+class CompiledClosure(Closure):
+    """A closure created by the VM; env is a frame rather than an Environment."""
+
+    def __init__(self, code, frame):
+        super().__init__(code.lambdaNode, frame)
+        self.code = code
+
+
+class Compiler:
+    """
+    Compiles a standardized tree to Code objects, one per lambda body.
+
+    Identifiers are resolved while compiling: a name bound by an enclosing
+    lambda becomes a (depth, slot) address into the runtime frames, which are
+    lists holding the parent frame in slot 0 followed by one slot per bound
+    variable. Names bound in the global environment, such as the built-in
+    functions, are loaded as constants.
+    """
+
+    def __init__(self, globalEnv):
+        self.globalEnv = globalEnv
+
+    def compile(self, st):
+        code = Code('<program>')
+        self.compileNode(st, code, None)
+        code.emit(RETURN)
+        return code
+
+    def compileLambda(self, lambdaNode, scope):
+        code = Code(f"lambda {lambdaNode.Vb}", lambdaNode)
+        bodyScope = Scope(lambdaNode.parameterNames(), scope)
+        if lambdaNode.E.kind == ST_LAMBDA_NODE:
+            code.inner = self.compileLambda(lambdaNode.E, bodyScope)
+            code.emit(MAKE_CLOSURE, code.constant(code.inner))
+        else:
+            self.compileNode(lambdaNode.E, code, bodyScope)
+        code.emit(RETURN)
+        return code
+
+    def resolve(self, name, scope):
+        """(depth, slot) of the frame slot holding name, or None if no lambda binds it."""
+        depth = 0
+        while scope is not None:
+            slot = scope.slots.get(name)
+            if slot is not None:
+                return depth, slot
+            scope = scope.parent
+            depth += 1
+        return None
+
+    def compileIdentifier(self, node, code, scope):
+        node.address = self.resolve(node.value, scope)
+        if node.address is None:
+            if node.value in self.globalEnv.bindings:
+                code.emit(LOAD_CONST, code.constant(self.globalEnv.bindings[node.value]))
+            else:
+                code.emit(LOAD_GLOBAL, code.constant(node.value))
+        else:
+            depth, slot = node.address
+            if depth == 0:
+                code.emit(LOAD_LOCAL, slot)
+            else:
+                code.emit(LOAD_FREE, (depth << 16) | slot)
+
+    def compileNode(self, node, code, scope):
+        kind = node.kind
+        if kind == IDENTIFIER_NODE:
+            self.compileIdentifier(node, code, scope)
+        elif kind == RN_NODE:
+            if node.type == 'identifier':
+                self.compileIdentifier(node, code, scope)
+            else:
+                code.emit(LOAD_CONST, code.constant(node.literal))
+        elif kind == ST_LAMBDA_NODE:
+            code.emit(MAKE_CLOSURE, code.constant(self.compileLambda(node, scope)))
+        elif kind == GAMMA_NODE:
+            self.compileNode(node.E, code, scope)
+            if node.N.kind == IDENTIFIER_NODE and node.N.value == 'Y*':
+                code.emit(FIX)
+            else:
+                self.compileNode(node.N, code, scope)
+                code.emit(TAIL_CALL if node.tail else CALL)
+        elif kind == TAU_NODE:
+            # Elements are evaluated right to left, as in TauNode.interpret
+            for element in reversed(node.elements):
+                self.compileNode(element, code, scope)
+            code.emit(BUILD_TUPLE, len(node.elements))
+        elif kind == ARROW_NODE:
+            self.compileNode(node.condition, code, scope)
+            toElse = code.emit(JUMP_IF_FALSE)
+            self.compileNode(node.ifCase, code, scope)
+            toEnd = code.emit(JUMP)
+            code.patch(toElse, len(code))
+            self.compileNode(node.elseCase, code, scope)
+            code.patch(toEnd, len(code))
+        elif kind == BOOLEAN_NODE:
+            self.compileNode(node.B1, code, scope)
+            jump = code.emit(JUMP_IF_FALSE_OR_POP if node.value == '&' else JUMP_IF_TRUE_OR_POP)
+            self.compileNode(node.B2, code, scope)
+            code.patch(jump, len(code))
+        elif kind == ARITHMETIC_NODE:
+            self.compileNode(node.a1, code, scope)
+            self.compileNode(node.a2, code, scope)
+            code.emit(ARITHMETIC_OPCODES.get(node.value, BINARY), code.constant(node))
+        elif kind == CONDITION_NODE:
+            self.compileNode(node.a1, code, scope)
+            self.compileNode(node.a2, code, scope)
+            code.emit(COMPARE, code.constant((COMPARISONS.get(node.value), node)))
+        elif kind == AUG_NODE:
+            self.compileNode(node.Ta, code, scope)
+            self.compileNode(node.Tc, code, scope)
+            code.emit(BINARY, code.constant(node))
+        elif kind == NOT_NODE:
+            self.compileNode(node.Bp, code, scope)
+            code.emit(UNARY, code.constant(node))
+        elif kind == NEG_NODE:
+            self.compileNode(node.a, code, scope)
+            code.emit(UNARY, code.constant(node))
+        else:
+            raise NotImplementedError(f"VM cannot compile node of type {type(node).__name__}")
+
+
+class VirtualMachine:
+    """Dispatch loop executing Code objects produced by Compiler."""
+
+    def __init__(self, compiler):
+        self.compiler = compiler
+        self.executed = 0
+
+    def run(self, code):
+        steps = self.steps(code)
+        try:
+            while True:
+                next(steps)
+        except StopIteration as finished:
+            return finished.value
+
+    def steps(self, code, slice=None):
+        """
+        Generator running code that yields after every slice instructions (never
+        if slice is None) and returns the program's value, so evaluation can be
+        interleaved with other work (see async_eval.run_async).
+        """
+        globalEnv = self.compiler.globalEnv
+        frames = []
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        opcodes = code.opcodes
+        operands = code.operands
+        constants = code.constants
+        frame = None
+        pc = 0
+        executed = 0
+        pause = slice if slice else -1
+
+        # Rebinding the opcodes as locals makes every comparison in the dispatch
+        # chain a local load instead of a global lookup.
+        (LOAD_CONST, LOAD_GLOBAL, MAKE_CLOSURE, CALL, BUILD_TUPLE, JUMP, JUMP_IF_FALSE,
+         JUMP_IF_FALSE_OR_POP, JUMP_IF_TRUE_OR_POP, ADD, SUB, MUL, COMPARE, BINARY, UNARY, RETURN,
+         LOAD_LOCAL, LOAD_FREE, FIX, TAIL_CALL) = OPCODES
+
+        while True:
+            opcode = opcodes[pc]
+            arg = operands[pc]
+            pc += 1
+            executed += 1
+            if executed == pause:
+                pause += slice
+                yield
+
+            if opcode == LOAD_LOCAL:
+                push(frame[arg])
+            elif opcode == LOAD_CONST:
+                push(constants[arg])
+            elif opcode == LOAD_FREE:
+                scope = frame
+                for _ in range(arg >> 16):
+                    scope = scope[0]
+                push(scope[arg & 0xFFFF])
+            elif opcode == CALL or opcode == TAIL_CALL:
+                rator = pop()
+                rand = pop()
+                if type(rator) is CompiledClosure:
+                    if opcode == CALL:
+                        frames.append((code, pc, frame))
+                    code = rator.code
+                    if code.bindsOne:
+                        frame = [rator.env, rand]
+                    else:
+                        frame = [rator.env]
+                        frame.extend(rator.lambdaNode.arguments(rand))
+                    opcodes = code.opcodes
+                    operands = code.operands
+                    constants = code.constants
+                    pc = 0
+                else:
+                    push(applyNonClosure(rator, rand))
+            elif opcode == COMPARE:
+                right = pop()
+                left = pop()
+                comparison, node = constants[arg]
+                if comparison is not None and type(left) is int and type(right) is int:
+                    push(TRUE if comparison(left, right) else FALSE)
+                else:
+                    push(node.apply(left, right))
+            elif opcode == JUMP_IF_FALSE:
+                condition = pop()
+                if condition is not TRUE:
+                    if condition is not FALSE:
+                        raise TypeError(f"Expected a truth value for the condition of '->', got {type(condition).__name__}")
+                    pc = arg
+            elif opcode == JUMP:
+                pc = arg
+            elif opcode == RETURN:
+                if not frames:
+                    self.executed += executed
+                    return pop()
+                code, pc, frame = frames.pop()
+                opcodes = code.opcodes
+                operands = code.operands
+                constants = code.constants
+            elif opcode == ADD:
+                right = pop()
+                left = pop()
+                if type(left) is int and type(right) is int:
+                    push(left + right)
+                else:
+                    push(constants[arg].apply(left, right))
+            elif opcode == SUB:
+                right = pop()
+                left = pop()
+                if type(left) is int and type(right) is int:
+                    push(left - right)
+                else:
+                    push(constants[arg].apply(left, right))
+            elif opcode == MUL:
+                right = pop()
+                left = pop()
+                if type(left) is int and type(right) is int:
+                    push(left * right)
+                else:
+                    push(constants[arg].apply(left, right))
+            elif opcode == MAKE_CLOSURE:
+                push(CompiledClosure(constants[arg], frame))
+            elif opcode == BUILD_TUPLE:
+                push(Tuple([pop() for _ in range(arg)]))
+            elif opcode == BINARY:
+                right = pop()
+                push(constants[arg].apply(pop(), right))
+            elif opcode == UNARY:
+                push(constants[arg].apply(pop()))
+            elif opcode == JUMP_IF_FALSE_OR_POP:
+                if stack[-1] is not FALSE:
+                    pop()
+                else:
+                    pc = arg
+            elif opcode == JUMP_IF_TRUE_OR_POP:
+                if stack[-1] is TRUE:
+                    pc = arg
+                else:
+                    pop()
+            elif opcode == LOAD_GLOBAL:
+                push(globalEnv.lookup(constants[arg]))
+            elif opcode == FIX:
+                push(self.fix(pop()))
+            else:
+                raise RuntimeError(f"Unknown opcode {opcode} at {pc - 1} in {code}")
+
+    def fix(self, closure):
+        """Y* applied to the closure of 'lambda f. lambda ...': bind f to the result itself."""
+        if not isinstance(closure, CompiledClosure):
+            raise TypeError("Y* combinator expects a function (closure) as its argument.")
+        if closure.code.inner is None or not closure.code.bindsOne:
+            raise TypeError("Recursive function name for Y* must be a single identifier.")
+        frame = [closure.env, None]
+        recursive = CompiledClosure(closure.code.inner, frame)
+        frame[1] = recursive
+        return recursive
+
+
+def execute(st, env):
+    """Compile a standardized tree against the global environment env and run it on the VM."""
+    compiler = Compiler(env)
+    return VirtualMachine(compiler).run(compiler.compile(st))